@@ -4,16 +4,21 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
+import time
 import logging
 
 # Load environment variables
 load_dotenv()
 
 # --- Import Blueprints ---
-from features.jobs import jobs_bp
-from features.score_predict import resume_tools_bp, load_sbert_model
-from features.predict_courses import courses_bp
+from features.jobs import jobs_bp, init_job_store
+from features.score_predict import resume_tools_bp, register_sbert_model
+from features.predict_courses import courses_bp, register_course_model
 from features.interview_eval import interview_eval_bp
+from features.model_registry import init_model_registry
+from features.metrics import init_metrics
+from features.admission import init_admission_control
+from features.responses import init_responses
 
 def create_app():
     """
@@ -33,6 +38,78 @@ def create_app():
     # ---------------------- CONFIG ----------------------
     app.config['ADZUNA_API_ID'] = os.getenv("ADZUNA_API_ID")
     app.config['ADZUNA_API_KEY'] = os.getenv("ADZUNA_API_KEY")
+    app.config['ADZUNA_BASE_URL'] = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api/jobs")
+    app.config['ADZUNA_CONNECT_TIMEOUT'] = float(os.getenv("ADZUNA_CONNECT_TIMEOUT", 3.05))
+    app.config['ADZUNA_READ_TIMEOUT'] = float(os.getenv("ADZUNA_READ_TIMEOUT", 10))
+    app.config['ADZUNA_CACHE_TTL'] = float(os.getenv("ADZUNA_CACHE_TTL", 300))  # seconds served fresh
+    app.config['ADZUNA_STALE_TTL'] = float(os.getenv("ADZUNA_STALE_TTL", 3600))  # stale-while-revalidate window
+    app.config['ADZUNA_FANOUT_WORKERS'] = int(os.getenv("ADZUNA_FANOUT_WORKERS", 8))
+    app.config['PDF_MAX_BYTES'] = int(os.getenv("PDF_MAX_BYTES", 5 * 1024 * 1024))
+    app.config['PDF_MAX_PAGES'] = int(os.getenv("PDF_MAX_PAGES", 20))
+    app.config['PDF_EXTRACT_TIMEOUT'] = float(os.getenv("PDF_EXTRACT_TIMEOUT", 10))
+    app.config['PDF_EXTRACT_WORKERS'] = int(os.getenv("PDF_EXTRACT_WORKERS", 2))  # 0 parses inline
+    app.config['PDF_TEXT_CACHE_ENTRIES'] = int(os.getenv("PDF_TEXT_CACHE_ENTRIES", 256))
+    app.config['INTERVIEW_EVAL_BACKEND'] = os.getenv("INTERVIEW_EVAL_BACKEND", "placeholder")  # placeholder | simulated
+    app.config['INTERVIEW_EVAL_CONCURRENCY'] = int(os.getenv("INTERVIEW_EVAL_CONCURRENCY", 8))
+    app.config['INTERVIEW_EVAL_ITEM_TIMEOUT'] = float(os.getenv("INTERVIEW_EVAL_ITEM_TIMEOUT", 30))
+    app.config['INTERVIEW_EVAL_BATCH_SIZE'] = int(os.getenv("INTERVIEW_EVAL_BATCH_SIZE", 1))  # Q&A items per prompt
+    app.config['INTERVIEW_QUESTION_CACHE_TTL'] = float(os.getenv("INTERVIEW_QUESTION_CACHE_TTL", 6 * 3600))
+    app.config['INTERVIEW_QUESTION_CACHE_SIZE'] = int(os.getenv("INTERVIEW_QUESTION_CACHE_SIZE", 1024))
+    if os.getenv("INTERVIEW_QUESTION_BANK_PATH") is not None:  # empty string disables the bank
+        app.config['INTERVIEW_QUESTION_BANK_PATH'] = os.getenv("INTERVIEW_QUESTION_BANK_PATH")
+    app.config['JOB_STORE_PATH'] = os.getenv("JOB_STORE_PATH")  # SQLite file; unset disables the local store
+    app.config['JOB_STORE_MAX_AGE'] = float(os.getenv("JOB_STORE_MAX_AGE", 900))
+    app.config['JOB_INDEX_DIR'] = os.getenv("JOB_INDEX_DIR")  # job embedding index; unset disables semantic search
+    app.config['JOB_INDEX_ANN_THRESHOLD'] = int(os.getenv("JOB_INDEX_ANN_THRESHOLD", 20000))
+    app.config['JOB_INDEX_NPROBE'] = int(os.getenv("JOB_INDEX_NPROBE", 8))
+    app.config['JOB_SYNC_INTERVAL'] = float(os.getenv("JOB_SYNC_INTERVAL", 600))  # 0 disables background sync
+    app.config['EMBEDDING_CACHE_MAX_BYTES'] = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    app.config['EMBEDDING_CACHE_DIR'] = os.getenv("EMBEDDING_CACHE_DIR")  # optional shared disk tier
+    app.config['SBERT_BATCH_WINDOW_MS'] = float(os.getenv("SBERT_BATCH_WINDOW_MS", 5))  # 0 disables micro-batching
+    app.config['SBERT_MAX_BATCH_SIZE'] = int(os.getenv("SBERT_MAX_BATCH_SIZE", 32))
+    app.config['SBERT_BACKEND'] = os.getenv("SBERT_BACKEND", "fp32")  # fp32 | int8 | onnx
+    app.config['SBERT_MODEL_PATH'] = os.getenv("SBERT_MODEL_PATH")  # local model directory
+    app.config['SBERT_PARITY_CHECK'] = os.getenv("SBERT_PARITY_CHECK", "0") == "1"
+    app.config['SBERT_PARITY_TOLERANCE'] = float(os.getenv("SBERT_PARITY_TOLERANCE", 2.0))
+    app.config['COURSE_INDEX_DIR'] = os.getenv("COURSE_INDEX_DIR")  # default: "ML prediction/course_index"
+    app.config['COURSE_INDEX_RELOAD_INTERVAL'] = float(os.getenv("COURSE_INDEX_RELOAD_INTERVAL", 30))  # 0 disables polling
+    app.config['COURSE_SEARCH_MODE'] = os.getenv("COURSE_SEARCH_MODE", "tfidf")  # tfidf | dense | hybrid
+    app.config['COURSE_HYBRID_ALPHA'] = float(os.getenv("COURSE_HYBRID_ALPHA", 0.5))
+    app.config['COURSE_INDEX_VERIFY'] = os.getenv("COURSE_INDEX_VERIFY", "1") == "1"  # sha256 check on load
+    # background: serve immediately, load models on a thread (default)
+    # eager: load before create_app() returns (use with `gunicorn --preload`)
+    # lazy: load each model on its first request
+    app.config['MODEL_WARMUP'] = os.getenv("MODEL_WARMUP", "background")
+    app.config['MODEL_RETRY_COOLDOWN'] = float(os.getenv("MODEL_RETRY_COOLDOWN", 60))  # seconds between retries of a failed load
+    app.config['STARTED_AT'] = time.time()
+    # Background prefetch of embeddings + course recommendations for fetched jobs
+    app.config['PREFETCH_ENABLED'] = os.getenv("PREFETCH_ENABLED", "0") == "1"
+    app.config['PREFETCH_TOP_K'] = int(os.getenv("PREFETCH_TOP_K", 10))
+    app.config['PREFETCH_QUEUE_PAGES'] = int(os.getenv("PREFETCH_QUEUE_PAGES", 32))
+    app.config['PREFETCH_WORKERS'] = int(os.getenv("PREFETCH_WORKERS", 1))
+    app.config['RECOMMENDATION_CACHE_SIZE'] = int(os.getenv("RECOMMENDATION_CACHE_SIZE", 4096))
+    app.config['RECOMMENDATION_CACHE_TTL'] = float(os.getenv("RECOMMENDATION_CACHE_TTL", 3600))
+    # Admission control for the ML blueprints (see features/admission.py for defaults).
+    # ADMISSION_LIMITS is JSON keyed by blueprint or endpoint, e.g.
+    # {"resume_tools": {"concurrency": 1, "queue": 2}, "courses": null}
+    app.config['ADMISSION_CONTROL'] = os.getenv("ADMISSION_CONTROL", "1") == "1"
+    app.config['ADMISSION_LIMITS'] = os.getenv("ADMISSION_LIMITS")
+    # Opt-in sampling profiler: stack-sample this fraction of requests and log
+    # the hottest stacks of those slower than PROFILE_SLOW_MS.
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+    app.config['PROFILE_SLOW_MS'] = float(os.getenv("PROFILE_SLOW_MS", 1000))
+    app.config['PROFILE_DIR'] = os.getenv("PROFILE_DIR")  # optional: write .folded stacks here
+    # Under multi-worker gunicorn, a shared directory where workers leave metric
+    # snapshots so /metrics reports all of them (unset: only the answering worker).
+    app.config['METRICS_MULTIPROC_DIR'] = os.getenv("METRICS_MULTIPROC_DIR")
+    app.config['METRICS_FLUSH_INTERVAL'] = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+    # Response layer: fast JSON encoding (orjson if installed), gzip/brotli
+    # above a size threshold, ETag/304 for GET job pages.
+    app.config['RESPONSE_COMPRESSION'] = os.getenv("RESPONSE_COMPRESSION", "1") == "1"
+    app.config['RESPONSE_COMPRESS_MIN_BYTES'] = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", 1024))
+    app.config['RESPONSE_GZIP_LEVEL'] = int(os.getenv("RESPONSE_GZIP_LEVEL", 5))
+    app.config['RESPONSE_BROTLI_QUALITY'] = int(os.getenv("RESPONSE_BROTLI_QUALITY", 4))
+    app.config['RESPONSE_COMPRESSED_CACHE'] = int(os.getenv("RESPONSE_COMPRESSED_CACHE", 256))
 
     # ---------------------- CORS ----------------------
     CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
@@ -43,12 +120,28 @@ def create_app():
     app.register_blueprint(courses_bp)
     app.register_blueprint(interview_eval_bp)
 
+    # ---------------------- METRICS ----------------------
+    init_metrics(app)
+    init_admission_control(app)
+    init_responses(app)
+
+    # ---------------------- JOB STORE ----------------------
+    init_job_store(app)
+
     # ---------------------- MODELS ----------------------
-    try:
-        load_sbert_model(app)
-        app.logger.info("✅ SBERT model loaded successfully.")
-    except Exception as e:
-        app.logger.error(f"⚠️ Failed to load SBERT model: {e}")
+    # Models are registered here but their heavy imports (torch, sklearn,
+    # scipy) only happen when the registry runs each loader. The TF-IDF
+    # matrix is memory-mapped so forked workers share its pages.
+    registry = init_model_registry(app)
+    register_course_model(app)
+    register_sbert_model(app)
+
+    warmup = app.config['MODEL_WARMUP']
+    if warmup == "eager":
+        registry.load_all()
+    elif warmup == "background":
+        registry.warm_up_async()
+    app.logger.info(f"✅ Model warm-up mode: {warmup}")
 
     app.logger.info("✅ Interview Evaluation feature active.")
 
@@ -59,13 +152,52 @@ def create_app():
             "message": "🚀 AI Featured Job Portal Backend Active!",
             "available_endpoints": [
                 "/api/fetch_jobs",
+                "/api/fetch_jobs_stream",
                 "/api/match_score",
+                "/api/match_scores",
+                "/api/semantic_job_search",
                 "/api/course_recommendations",
+                "/api/predict_courses_batch",
+                "/api/course_index",
                 "/api/generate_interview_questions",
-                "/api/evaluate_answers"
+                "/api/evaluate_answers",
+                "/api/models",
+                "/metrics",
+                "/healthz",
+                "/readyz"
             ]
         })
 
+    # ---------------------- HEALTH ----------------------
+    @app.route('/healthz')
+    def liveness():
+        """Liveness: the process is up and serving requests."""
+        return jsonify({
+            "status": "alive",
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - app.config['STARTED_AT'], 3)
+        })
+
+    @app.route('/readyz')
+    def readiness():
+        """Readiness: 200 once every model has finished loading (or failed)."""
+        registry = app.config['MODEL_REGISTRY']
+        models = {name: info["state"] for name, info in registry.stats()["models"].items()}
+        # In lazy mode nothing is loaded up front, so there is nothing to wait for.
+        ready = registry.is_ready() or app.config['MODEL_WARMUP'] == "lazy"
+        body = {
+            "status": "ready" if ready else "warming_up",
+            "degraded": any(state == "failed" for state in models.values()),
+            "models": models
+        }
+        return jsonify(body), (200 if ready else 503)
+
+    # ---------------------- MODEL STATS ----------------------
+    @app.route('/api/models')
+    def model_stats():
+        """Report load time, RSS delta and state for each registered model."""
+        return jsonify(app.config['MODEL_REGISTRY'].stats())
+
     return app
 
 # =================================================================
@@ -74,7 +206,10 @@ def create_app():
 # This line calls the function above and creates the Flask application
 # instance in the global scope. The variable MUST be named 'app' so that
 # Gunicorn's command `gunicorn app:app` can find it.
-app = create_app()
+# Under `python app.py`, multiprocessing children (the PDF parsers) re-import
+# this file as __mp_main__; they must not build the app and warm its models.
+if __name__ != '__mp_main__':
+    app = create_app()
 # =================================================================
 
 
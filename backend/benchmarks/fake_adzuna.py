@@ -0,0 +1,193 @@
+# backend/benchmarks/fake_adzuna.py
+"""
+Local stand-in for the Adzuna search API, for offline benchmarks.
+
+Serves GET /{country}/search/{page} with deterministic synthetic jobs (same
+country/page/what/where -> same jobs) after a configurable delay, and fails a
+configurable fraction of requests with HTTP 500. Point the backend at it with
+ADZUNA_BASE_URL=http://127.0.0.1:<port> (any ADZUNA_API_ID/KEY will do).
+
+Usage (from backend/):
+    python -m benchmarks.fake_adzuna [--port 8099] [--latency-ms 80] [--jitter-ms 20] [--error-rate 0.02]
+"""
+
+import re
+import json
+import time
+import hashlib
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+DEFAULT_TOTAL_RESULTS = 2000
+MAX_RESULTS_PER_PAGE = 50
+
+TITLES = [
+    "Software Engineer", "Data Scientist", "Backend Developer", "Frontend Developer", "DevOps Engineer",
+    "Machine Learning Engineer", "Data Analyst", "Cloud Architect", "QA Engineer", "Product Manager",
+]
+SKILLS = [
+    "python", "java", "javascript", "react", "django", "flask", "sql", "postgresql", "aws", "azure",
+    "docker", "kubernetes", "terraform", "spark", "pandas", "tensorflow", "pytorch", "statistics",
+    "machine learning", "nlp", "rest apis", "microservices", "ci/cd", "linux", "git", "excel", "tableau",
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+CITIES = {"in": ["Bengaluru", "Hyderabad", "Pune", "Chennai"], "us": ["New York", "Austin", "Seattle", "Boston"],
+          "gb": ["London", "Manchester", "Leeds"]}
+_PATH = re.compile(r"^/(?P<country>[a-z]{2})/search/(?P<page>\d+)$")
+
+
+def job_description(rng, title, words=120):
+    """A job-ad-like paragraph: the title, a handful of skills and filler."""
+    skills = rng.sample(SKILLS, 6)
+    sentences = [
+        f"We are hiring a {title.lower()} to join our growing team.",
+        f"You will work with {', '.join(skills[:3])} and {skills[3]} every day.",
+        f"Experience with {skills[4]} and {skills[5]} is a strong plus.",
+    ]
+    filler = [rng.choice(SKILLS + ["design", "deliver", "scale", "customers", "quality", "ownership"])
+              for _ in range(max(0, words - 40))]
+    return " ".join(sentences) + " " + " ".join(filler) + "."
+
+
+def make_job(country, page, position, what="", where=""):
+    key = f"{country}/{page}/{position}/{what}/{where}"
+    rng = random.Random(key)
+    title = rng.choice(TITLES)
+    return {
+        "id": str(int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:10], 16)),
+        "title": title,
+        "company": {"display_name": rng.choice(COMPANIES)},
+        "location": {"display_name": rng.choice(CITIES.get(country, ["Remote"]))},
+        "salary_is_predicted": rng.choice(["0", "1"]),
+        "description": job_description(rng, title),
+        "redirect_url": f"https://example.invalid/{country}/jobs/{page}/{position}",
+        "created": "2025-01-01T00:00:00Z",
+        "contract_type": rng.choice(["permanent", "contract"]),
+        "contract_time": rng.choice(["full_time", "part_time"]),
+        "category": {"label": "IT Jobs"},
+    }
+
+
+class FakeAdzuna:
+    """
+    Threaded fake Adzuna server. Use as a context manager or call
+    start()/stop(); `base_url` is what ADZUNA_BASE_URL should be set to.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=50.0, jitter_ms=0.0, error_rate=0.0,
+                 total_results=DEFAULT_TOTAL_RESULTS, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.total_results = total_results
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self):
+        """Delay (seconds) and failure decision for one request."""
+        with self._rng_lock:
+            self.requests += 1
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                match = _PATH.match(url.path)
+                if match is None:
+                    return self._send(404, {"error": "not found"})
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if not query.get("app_id") or not query.get("app_key"):
+                    return self._send(401, {"error": "missing credentials"})
+
+                delay, fail = fake._draw()
+                time.sleep(delay)
+                if fail:
+                    return self._send(500, {"error": "injected failure"})
+
+                country, page = match.group("country"), int(match.group("page"))
+                per_page = min(int(query.get("results_per_page", 20)), MAX_RESULTS_PER_PAGE)
+                first = (page - 1) * per_page
+                count = max(0, min(per_page, fake.total_results - first))
+                what, where = query.get("what", ""), query.get("where", "")
+                self._send(200, {
+                    "results": [make_job(country, page, first + i, what, where) for i in range(count)],
+                    "count": fake.total_results,
+                })
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-adzuna", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        with self._rng_lock:
+            return {"requests": self.requests, "errors": self.errors}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--total-results", type=int, default=DEFAULT_TOTAL_RESULTS)
+    args = parser.parse_args(argv)
+
+    fake = FakeAdzuna(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.total_results)
+    print(f"Fake Adzuna listening on {fake.base_url} (set ADZUNA_BASE_URL to this)")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(fake.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# backend/benchmarks/fixtures.py
+"""
+Synthetic, seeded fixtures shared by the benchmarks: resume PDFs, job texts,
+a Coursera-style course CSV built into a versioned course index, and a tiny
+randomly initialised sentence-embedding model (no downloads).
+"""
+
+import os
+import re
+import csv
+import random
+
+from .fake_adzuna import SKILLS, TITLES, job_description
+
+TINY_MODEL_DIM = 32
+TINY_MODEL_LAYERS = 2
+TINY_MODEL_MAX_SEQ_LENGTH = 128
+COURSE_TOPICS = [
+    "introduction to", "advanced", "applied", "foundations of", "hands-on", "professional certificate in",
+]
+FILLER = ["learn", "build", "projects", "practice", "concepts", "real world", "beginner", "assignments", "quiz"]
+
+
+# -----------------------------
+# Texts
+# -----------------------------
+def job_texts(count, seed=0):
+    """(title, description) pairs that look like serialized Adzuna jobs."""
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        title = rng.choice(TITLES)
+        pairs.append((title, job_description(rng, title)))
+    return pairs
+
+
+def resume_lines(rng, lines=40):
+    skills = rng.sample(SKILLS, 10)
+    out = [f"{rng.choice(TITLES)} with {rng.randint(2, 12)} years of experience.",
+           "Skills: " + ", ".join(skills)]
+    for i in range(lines - 2):
+        out.append(f"- Delivered project {i + 1} using {rng.choice(skills)} and {rng.choice(skills)} "
+                   f"for {rng.choice(['customers', 'analytics', 'payments', 'search', 'platform'])}.")
+    return out
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages):
+    """Minimal uncompressed PDF with one Helvetica text block per page (`pages` is a list of line lists)."""
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>",
+               3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids, next_id = [], 4
+    for lines in pages:
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 770 Td"] + [f"({_pdf_escape(line)}) Tj T*" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        objects[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("ascii")
+        kids.append(page_id)
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode("ascii")
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += f"{number} 0 obj\n".encode("ascii") + objects[number] + b"\nendobj\n"
+    xref_at, size = len(out), max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode("ascii")
+    out += b"".join(f"{offsets[n]:010d} 00000 n \n".encode("ascii") for n in range(1, size))
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode("ascii")
+    return bytes(out)
+
+
+def resume_pdf(pages=2, lines_per_page=40, seed=0):
+    rng = random.Random(seed)
+    return make_pdf([resume_lines(rng, lines_per_page) for _ in range(pages)])
+
+
+# -----------------------------
+# Course index
+# -----------------------------
+def write_courses_csv(path, count, seed=0):
+    """Coursera-format CSV (Course Name, Course Description, Skills, Course URL)."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["Course Name", "Course Description", "Skills", "Course URL"])
+        for i in range(count):
+            skills = rng.sample(SKILLS, 4)
+            name = f"{rng.choice(COURSE_TOPICS).title()} {skills[0].title()} {i}"
+            description = " ".join(
+                [f"This course covers {skills[0]}, {skills[1]} and {skills[2]}."]
+                + [rng.choice(SKILLS + FILLER) for _ in range(rng.randint(30, 90))]
+            )
+            writer.writerow([name, description, " ".join(skills), f"https://example.invalid/course/{i}"])
+    return path
+
+
+def _model_key(embed_model):
+    """'<model name>-<dim>' for index version names, so a different model never reuses cached embeddings."""
+    from sentence_transformers import SentenceTransformer
+
+    name = os.path.basename(os.path.normpath(embed_model)) or "model"
+    dim = SentenceTransformer(embed_model, device="cpu").get_sentence_embedding_dimension()
+    return f"{re.sub(r'[^A-Za-z0-9._]+', '_', name)}-{dim}"
+
+
+def build_course_index(workdir, courses=5000, embed_model=None, seed=0):
+    """
+    Build a synthetic index with the production build path and activate it;
+    a version with the same parameters (and embedding model name and
+    dimension) already in `workdir` is reused.
+    Returns (index root, version directory).
+    """
+    from features.course_index import activate, build_from_csv
+
+    root = os.path.join(workdir, "course_index")
+    version = f"bench-{courses}-{_model_key(embed_model) if embed_model else 'tfidf'}-{seed}"
+    if os.path.isdir(os.path.join(root, version)):
+        activate(root, version)
+    else:
+        csv_path = write_courses_csv(os.path.join(workdir, f"courses-{courses}-{seed}.csv"), courses, seed=seed)
+        build_from_csv(csv_path, root, embed_model=embed_model, version=version)
+    return root, os.path.join(root, version)
+
+
+# -----------------------------
+# Tiny embedding model
+# -----------------------------
+def build_tiny_model(out_dir, dim=TINY_MODEL_DIM, layers=TINY_MODEL_LAYERS, seed=0):
+    """
+    Save a small randomly initialised BERT + mean pooling SentenceTransformer
+    to `out_dir` (reused if already there). Its scores are meaningless, but its
+    shape and code path match the production model at a fraction of the cost.
+    """
+    if os.path.exists(os.path.join(out_dir, "modules.json")):
+        return out_dir
+    try:
+        import torch
+        from transformers import BertConfig, BertModel, BertTokenizerFast
+        from sentence_transformers import SentenceTransformer, models
+    except ImportError as e:
+        raise RuntimeError(f"Building the tiny model needs torch, transformers and sentence-transformers ({e}); "
+                           "pass --model-dir to use an existing SentenceTransformer directory instead.")
+
+    transformer_dir = os.path.join(out_dir, "transformer")
+    os.makedirs(transformer_dir, exist_ok=True)
+    words = sorted({token for text in SKILLS + TITLES + FILLER + COURSE_TOPICS for token in text.lower().split()})
+    specials = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    vocab = list(dict.fromkeys(specials + words + list("abcdefghijklmnopqrstuvwxyz0123456789.,:-/")))
+    vocab_path = os.path.join(transformer_dir, "vocab.txt")
+    with open(vocab_path, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(vocab) + "\n")
+
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=len(vocab), hidden_size=dim, num_hidden_layers=layers,
+        num_attention_heads=2, intermediate_size=dim * 2, max_position_embeddings=TINY_MODEL_MAX_SEQ_LENGTH,
+    )
+    BertModel(config).save_pretrained(transformer_dir)
+    BertTokenizerFast(vocab_file=vocab_path, do_lower_case=True).save_pretrained(transformer_dir)
+
+    word = models.Transformer(transformer_dir, max_seq_length=TINY_MODEL_MAX_SEQ_LENGTH)
+    pooling = models.Pooling(word.get_word_embedding_dimension(), pooling_mode="mean")
+    SentenceTransformer(modules=[word, pooling], device="cpu").save(out_dir)
+    return out_dir
+
+
+def embedding_model(workdir, model_dir=None):
+    """`model_dir` if given, else the tiny model built (once) under `workdir`."""
+    return model_dir or build_tiny_model(os.path.join(workdir, "tiny-sbert"))
@@ -0,0 +1,288 @@
+# backend/benchmarks/load_test.py
+"""
+End-to-end load test of every endpoint in app.py, fully offline.
+
+Builds the fixtures (tiny SBERT model, synthetic course index), starts the
+fake Adzuna server, launches the app in a subprocess pointed at both, waits
+for /readyz and then drives each endpoint with `--concurrency` closed-loop
+clients for `--requests` requests. Reports p50/p95/p99 latency, throughput
+and the status mix per endpoint; 503s from admission control are expected
+when the concurrency exceeds an endpoint's limits.
+
+Usage (from backend/):
+    python -m benchmarks.load_test [--requests 200] [--concurrency 4] [--only predict_courses fetch_jobs]
+                                   [--server werkzeug|gunicorn] [--env SBERT_BATCH_WINDOW_MS=0]
+                                   [--adzuna-latency-ms 80] [--adzuna-error-rate 0.02]
+                                   [--out results/load.json] [--compare results/baseline.json]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import itertools
+import threading
+import subprocess
+from collections import Counter
+
+from . import fixtures
+from .fake_adzuna import FakeAdzuna
+from .results import BACKEND_DIR, DEFAULT_REGRESSION_THRESHOLD, compare, print_table, save_results, summarize
+
+READY_TIMEOUT = 180.0
+REQUEST_TIMEOUT = 60.0
+KEYWORDS = ["software engineer", "data scientist", "python developer", "devops", "machine learning"]
+
+_SERVER = r"""
+import sys
+import app as app_module
+from werkzeug.serving import make_server
+make_server("127.0.0.1", int(sys.argv[1]), app_module.app, threaded=True).serve_forever()
+"""
+
+
+class Scenario:
+    """One endpoint under load; `build(i)` returns the requests kwargs for call i."""
+
+    def __init__(self, method, path, build=None):
+        self.method = method
+        self.path = path
+        self.build = build or (lambda i: {})
+
+    @property
+    def name(self):
+        return f"{self.method} {self.path}"
+
+
+def scenarios(pdf, jobs):
+    def resume(form):
+        return lambda i: {"files": {"resume_file": ("resume.pdf", pdf, "application/pdf")}, "data": form(i)}
+
+    job_list = json.dumps([{"id": str(i), "description": description} for i, (_, description) in enumerate(jobs[:20])])
+    course_query = lambda i: {"json": {"job_title": jobs[i % len(jobs)][0],
+                                       "job_description": jobs[i % len(jobs)][1], "top_n": 5}}
+    batch_query = lambda i: {"json": {"top_n": 5, "jobs": [
+        {"id": str(j), "job_title": title, "job_description": description}
+        for j, (title, description) in enumerate(jobs[(i * 8) % len(jobs):(i * 8) % len(jobs) + 8])
+    ]}}
+    questions = lambda i: {"json": {"job_role": jobs[i % len(jobs)][0], "context_keywords": jobs[i % len(jobs)][1]}}
+    answers = lambda i: {"json": {"job_details": {"title": jobs[i % len(jobs)][0]}, "questions_and_answers": [
+        {"id": f"t{j}", "question": f"Question {j}?", "answer": jobs[(i + j) % len(jobs)][1][:300]} for j in range(5)
+    ]}}
+
+    return [
+        Scenario("GET", "/"),
+        Scenario("GET", "/healthz"),
+        Scenario("GET", "/readyz"),
+        Scenario("GET", "/api/models"),
+        Scenario("GET", "/metrics"),
+        Scenario("GET", "/api/fetch_jobs",
+                 lambda i: {"params": {"keywords": KEYWORDS[i % len(KEYWORDS)], "page": 1 + (i // len(KEYWORDS)) % 5}}),
+        Scenario("GET", "/api/fetch_jobs_stream",
+                 lambda i: {"params": {"keywords": KEYWORDS[i % len(KEYWORDS)], "pages": 2, "countries": "in,us"}}),
+        Scenario("GET", "/api/fetch_jobs/cache_stats"),
+        Scenario("GET", "/api/job_store/stats"),
+        Scenario("POST", "/api/match_score", resume(lambda i: {"job_description_text": jobs[i % len(jobs)][1]})),
+        Scenario("POST", "/api/match_scores", resume(lambda i: {"jobs": job_list})),
+        Scenario("POST", "/api/semantic_job_search", resume(lambda i: {"top_k": 10})),
+        Scenario("GET", "/api/embedding_cache/stats"),
+        Scenario("GET", "/api/pdf_extract/stats"),
+        Scenario("GET", "/api/sbert_scheduler/stats"),
+        Scenario("POST", "/api/predict_courses", course_query),
+        Scenario("POST", "/api/predict_courses_batch", batch_query),
+        Scenario("GET", "/api/course_index"),
+        Scenario("POST", "/api/course_index/reload"),
+        Scenario("GET", "/api/prefetch/stats"),
+        Scenario("POST", "/api/generate_interview_questions", questions),
+        Scenario("POST", "/api/evaluate_answers", answers),
+        Scenario("GET", "/api/interview_questions/stats"),
+    ]
+
+
+# -----------------------------
+# Load generation
+# -----------------------------
+def run_scenario(base_url, scenario, total, concurrency, warmup=5):
+    """Closed loop: `concurrency` clients issue `total` requests between them."""
+    import requests
+
+    local = threading.local()
+
+    def call(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = session.request(scenario.method, base_url + scenario.path, timeout=REQUEST_TIMEOUT,
+                                       **scenario.build(i))
+            status = response.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        return time.perf_counter() - start, status
+
+    for i in range(warmup):
+        call(i)
+
+    counter = itertools.count()
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            latency, status = call(warmup + i)
+            with lock:
+                latencies.append(latency)
+                statuses[status] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started, statuses)
+
+
+# -----------------------------
+# Server process
+# -----------------------------
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, env, log_path):
+    port = _free_port()
+    if kind == "gunicorn":
+        env = dict(env, GUNICORN_BIND=f"127.0.0.1:{port}")
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"]
+    else:
+        command = [sys.executable, "-c", _SERVER, str(port)]
+    log = open(log_path, "wb")
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return process, f"http://127.0.0.1:{port}", log
+
+
+def wait_ready(process, base_url, timeout=READY_TIMEOUT):
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}.")
+        try:
+            if requests.get(base_url + "/readyz", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server not ready after {timeout:.0f}s.")
+
+
+def server_env(args, workdir, adzuna_url, model_dir, index_root):
+    env = dict(
+        os.environ,
+        ADZUNA_API_ID="bench", ADZUNA_API_KEY="bench", ADZUNA_BASE_URL=adzuna_url,
+        COURSE_INDEX_DIR=index_root,
+        JOB_INDEX_DIR=os.path.join(workdir, "job_index"),
+        MODEL_WARMUP="eager",
+    )
+    if model_dir:
+        env["SBERT_MODEL_PATH"] = model_dir
+    if args.job_store:
+        env["JOB_STORE_PATH"] = os.path.join(workdir, "jobs.db")
+    for item in args.env:
+        name, _, value = item.partition("=")
+        env[name] = value
+    return env
+
+
+def run(args, workdir):
+    model_dir = None
+    try:
+        model_dir = fixtures.embedding_model(workdir, args.model_dir)
+    except RuntimeError as e:
+        print(f"No local embedding model, SBERT endpoints will answer 503: {e}", file=sys.stderr)
+    index_root, _ = fixtures.build_course_index(workdir, args.courses, embed_model=model_dir, seed=args.seed)
+    pdf = fixtures.resume_pdf(pages=args.resume_pages, seed=args.seed)
+    jobs = fixtures.job_texts(256, seed=args.seed)
+
+    selected = [s for s in scenarios(pdf, jobs) if not args.only or any(name in s.path for name in args.only)]
+    results = {}
+    with FakeAdzuna(latency_ms=args.adzuna_latency_ms, jitter_ms=args.adzuna_jitter_ms,
+                    error_rate=args.adzuna_error_rate, seed=args.seed) as adzuna:
+        log_path = os.path.join(workdir, "server.log")
+        env = server_env(args, workdir, adzuna.base_url, model_dir, index_root)
+        process, base_url, log = start_server(args.server, env, log_path)
+        try:
+            wait_ready(process, base_url)
+            for scenario in selected:
+                results[scenario.name] = run_scenario(base_url, scenario, args.requests, args.concurrency, args.warmup)
+                print(f"{scenario.name:<42} p50={results[scenario.name]['p50_ms']} ms "
+                      f"statuses={results[scenario.name]['statuses']}", flush=True)
+        except RuntimeError:
+            log.flush()
+            with open(log_path, encoding="utf-8", errors="replace") as fh:
+                print(fh.read()[-4000:], file=sys.stderr)
+            raise
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            log.close()
+        print(f"Fake Adzuna: {adzuna.stats()}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent clients per endpoint")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed requests per endpoint")
+    parser.add_argument("--only", nargs="+", help="only endpoints whose path contains one of these")
+    parser.add_argument("--server", choices=["werkzeug", "gunicorn"], default="werkzeug")
+    parser.add_argument("--env", nargs="+", default=[], metavar="KEY=VALUE", help="extra app settings")
+    parser.add_argument("--job-store", action="store_true", help="enable the local SQLite job store")
+    parser.add_argument("--adzuna-latency-ms", type=float, default=80.0)
+    parser.add_argument("--adzuna-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--adzuna-error-rate", type=float, default=0.0)
+    parser.add_argument("--courses", type=int, default=5000, help="synthetic courses in the index")
+    parser.add_argument("--resume-pages", type=int, default=2)
+    parser.add_argument("--model-dir", help="SentenceTransformer directory to use instead of the tiny model")
+    parser.add_argument("--workdir", help="keep fixtures (tiny model, index) here between runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="previous result file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench-load-")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        results = run(args, workdir)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print_table(results)
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+    if args.out:
+        config = {k: v for k, v in vars(args).items() if k not in ("out", "compare", "threshold")}
+        print(f"Saved {save_results(args.out, 'load_test', results, config)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
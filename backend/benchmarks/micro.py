@@ -0,0 +1,142 @@
+# backend/benchmarks/micro.py
+"""
+In-process micro-benchmarks of the request hot paths on synthetic data:
+  clean_text                  query normalisation (course recommendations)
+  extract_text_from_pdf       resume parsing, inline (no process pool, no text cache)
+  calculate_similarity        SBERT encode of resume + job and cosine, uncached and
+                              with embedding-cache hits
+  tfidf_top_k / dense_top_k   course search, one query and a batch of 32
+
+Everything is seeded and offline: the SBERT benchmarks use a tiny randomly
+initialised model (or --model-dir), the course index is built from a
+synthetic CSV.
+
+Usage (from backend/):
+    python -m benchmarks.micro [--repeat 200] [--courses 5000] [--model-dir DIR]
+                               [--out results/micro.json] [--compare results/baseline.json]
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+from . import fixtures
+from .results import DEFAULT_REGRESSION_THRESHOLD, compare, print_table, save_results, summarize
+
+BATCH_QUERIES = 32
+TOP_N = 5
+
+
+def time_calls(fn, repeat, warmup=5):
+    """Per-call latencies of `fn()` after `warmup` untimed calls."""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def _cycle(items):
+    state = {"i": 0}
+
+    def next_item():
+        item = items[state["i"] % len(items)]
+        state["i"] += 1
+        return item
+    return next_item
+
+
+def run(args, workdir):
+    from features.predict_courses import clean_text
+    from features.score_predict import extract_text_from_pdf, calculate_similarity
+    from features.embedding_cache import EmbeddingCache
+    from features.course_index import load_index
+
+    logger = logging.getLogger("benchmarks")
+    results = {}
+    jobs = fixtures.job_texts(256, seed=args.seed)
+    raw_queries = [f"{title} {description}" for title, description in jobs]
+    queries = [clean_text(text) for text in raw_queries]
+
+    next_raw = _cycle(raw_queries)
+    results["clean_text"] = time_calls(lambda: clean_text(next_raw()), args.repeat * 10)
+
+    pdf = fixtures.resume_pdf(pages=args.resume_pages, seed=args.seed)
+    results[f"extract_text_from_pdf[{args.resume_pages}p]"] = time_calls(
+        lambda: extract_text_from_pdf(io.BytesIO(pdf), logger), args.repeat)
+    resume_text = extract_text_from_pdf(io.BytesIO(pdf), logger)
+
+    model_dir = None
+    try:
+        model_dir = fixtures.embedding_model(workdir, args.model_dir)
+    except RuntimeError as e:
+        print(f"Skipping SBERT benchmarks: {e}", file=sys.stderr)
+
+    if model_dir:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_dir, device="cpu")
+        next_job = _cycle([description for _, description in jobs])
+        results["calculate_similarity[uncached]"] = time_calls(
+            lambda: calculate_similarity(resume_text, next_job(), model, logger), args.repeat)
+        cache = EmbeddingCache(f"bench:{model_dir}")
+        results["calculate_similarity[cached]"] = time_calls(
+            lambda: calculate_similarity(resume_text, jobs[0][1], model, logger, cache=cache), args.repeat)
+
+    _, version_dir = fixtures.build_course_index(workdir, args.courses, embed_model=model_dir, seed=args.seed)
+    engine = load_index(version_dir, clean_fn=clean_text)
+    next_query = _cycle(queries)
+    batches = [queries[i:i + BATCH_QUERIES] for i in range(0, len(queries), BATCH_QUERIES)]
+    next_batch = _cycle(batches)
+    results["tfidf_top_k[1]"] = time_calls(lambda: engine.top_k([next_query()], top_n=TOP_N), args.repeat)
+    results[f"tfidf_top_k[{BATCH_QUERIES}]"] = time_calls(lambda: engine.top_k(next_batch(), top_n=TOP_N), args.repeat)
+
+    if engine.has_embeddings:
+        vectors = model.encode(queries, batch_size=BATCH_QUERIES)
+        next_vector = _cycle([vectors[i:i + 1] for i in range(len(vectors))])
+        results["dense_top_k[1]"] = time_calls(
+            lambda: engine.dense_top_k(next_vector(), top_n=TOP_N), args.repeat)
+        results[f"dense_top_k[{BATCH_QUERIES}]"] = time_calls(
+            lambda: engine.dense_top_k(vectors[:BATCH_QUERIES], top_n=TOP_N), args.repeat)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per benchmark")
+    parser.add_argument("--courses", type=int, default=5000, help="synthetic courses in the index")
+    parser.add_argument("--resume-pages", type=int, default=2)
+    parser.add_argument("--model-dir", help="SentenceTransformer directory to use instead of the tiny model")
+    parser.add_argument("--workdir", help="keep fixtures (tiny model, index) here between runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="previous result file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench-micro-")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        results = run(args, workdir)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(results)
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+    if args.out:
+        config = {k: v for k, v in vars(args).items() if k not in ("out", "compare", "threshold")}
+        print(f"Saved {save_results(args.out, 'micro', results, config)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
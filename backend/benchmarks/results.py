@@ -0,0 +1,109 @@
+# backend/benchmarks/results.py
+"""Latency summaries, JSON result files and run-to-run comparison for the benchmarks."""
+
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_REGRESSION_THRESHOLD = 0.10   # flag a >10% worse p50/p95 or throughput
+
+
+def summarize(latencies, wall_seconds=None, statuses=None):
+    """
+    p50/p95/p99/mean/max in milliseconds for a list of per-call latencies in
+    seconds; throughput is calls per second of `wall_seconds` (default: their sum).
+    """
+    values = np.asarray(latencies, dtype=np.float64) * 1000.0
+    wall = wall_seconds if wall_seconds is not None else float(values.sum()) / 1000.0
+    summary = {
+        "count": int(values.size),
+        "p50_ms": round(float(np.percentile(values, 50)), 3) if values.size else None,
+        "p95_ms": round(float(np.percentile(values, 95)), 3) if values.size else None,
+        "p99_ms": round(float(np.percentile(values, 99)), 3) if values.size else None,
+        "mean_ms": round(float(values.mean()), 3) if values.size else None,
+        "max_ms": round(float(values.max()), 3) if values.size else None,
+        "throughput_per_s": round(values.size / wall, 2) if wall > 0 else None,
+    }
+    if statuses is not None:
+        summary["statuses"] = {str(status): count for status, count in sorted(statuses.items(), key=str)}
+    return summary
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def save_results(path, benchmark, results, config):
+    """Write a result file: environment, run config and per-benchmark summaries."""
+    payload = {
+        "benchmark": benchmark,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": config,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True)
+    return path
+
+
+def print_table(results):
+    print(f"{'benchmark':<42}{'n':>7}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}{'per_s':>10}  statuses")
+    for name, r in results.items():
+        statuses = r.get("statuses", "")
+        print(f"{name:<42}{r['count']:>7}{_fmt(r['p50_ms'])}{_fmt(r['p95_ms'])}{_fmt(r['p99_ms'])}"
+              f"{_fmt(r['throughput_per_s'])}  {statuses}")
+
+
+def _fmt(value):
+    return f"{value:>10.2f}" if value is not None else f"{'-':>10}"
+
+
+def compare(results, baseline_path, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """
+    Print per-benchmark changes against a saved result file and return the
+    names whose p50/p95 grew, or throughput fell, by more than `threshold`.
+    """
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('git_commit')}, {baseline.get('created')}):")
+    print(f"{'benchmark':<42}{'p50':>10}{'p95':>10}{'per_s':>10}")
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            print(f"{name:<42}{'(new)':>10}")
+            continue
+        changes = {key: _change(current.get(key), previous.get(key)) for key in ("p50_ms", "p95_ms", "throughput_per_s")}
+        print(f"{name:<42}" + "".join(f"{_fmt_change(changes[k]):>10}" for k in ("p50_ms", "p95_ms", "throughput_per_s")))
+        if any(c is not None and c > threshold for c in (changes["p50_ms"], changes["p95_ms"])) or \
+                (changes["throughput_per_s"] is not None and changes["throughput_per_s"] < -threshold):
+            regressions.append(name)
+    if regressions:
+        print(f"Regressions over {threshold:.0%}: {', '.join(regressions)}")
+    return regressions
+
+
+def _change(current, previous):
+    if current is None or not previous:
+        return None
+    return (current - previous) / previous
+
+
+def _fmt_change(change):
+    return "-" if change is None else f"{change:+.1%}"
@@ -0,0 +1,64 @@
+# backend/benchmarks/startup_time.py
+"""
+Startup-time benchmark for the backend.
+
+For each MODEL_WARMUP mode, starts a fresh interpreter, imports `app` (which
+runs create_app()) and records:
+  - serve_s: time until create_app() returns and cheap routes like
+             /api/fetch_jobs and /healthz can be served
+  - ready_s: time until /readyz would report every model loaded
+
+Usage (from backend/):
+    python -m benchmarks.startup_time [--runs 3] [--modes eager background lazy]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app as app_module
+serve_s = time.perf_counter() - t0
+registry = app_module.app.config['MODEL_REGISTRY']
+mode = app_module.app.config['MODEL_WARMUP']
+if mode != "lazy":
+    while not registry.is_ready():
+        time.sleep(0.01)
+ready_s = time.perf_counter() - t0
+print(json.dumps({"serve_s": serve_s, "ready_s": ready_s,
+                  "models": {k: v["state"] for k, v in registry.stats()["models"].items()}}))
+"""
+
+
+def run_once(mode):
+    env = dict(os.environ, MODEL_WARMUP=mode)
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=["eager", "background", "lazy"])
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':<12}{'serve_s (median)':>18}{'ready_s (median)':>18}  models")
+    for mode in args.modes:
+        results = [run_once(mode) for _ in range(args.runs)]
+        serve = statistics.median(r["serve_s"] for r in results)
+        ready = statistics.median(r["ready_s"] for r in results)
+        print(f"{mode:<12}{serve:>18.3f}{ready:>18.3f}  {results[-1]['models']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# backend/features/admission.py
+
+import json
+import math
+import time
+import threading
+
+from .metrics import METRICS
+
+ADMISSION_WAIT_SECONDS = METRICS.histogram(
+    "admission_wait_seconds", "Time spent queued for an admission slot.", ["endpoint"])
+ADMISSION_REJECTED = METRICS.counter(
+    "admission_rejected_total", "Requests turned away by admission control.", ["endpoint", "reason"])
+ADMISSION_QUEUED = METRICS.gauge(
+    "admission_queued", "Requests currently waiting for an admission slot.", ["endpoint"])
+
+# Per-blueprint defaults. A gthread worker only runs GUNICORN_THREADS requests
+# at once, and queued requests hold a thread too, so `concurrency + queue` for
+# the ML blueprints is kept below the thread count: cheap routes such as
+# /api/fetch_jobs always find a free thread.
+#   concurrency     requests of one endpoint running at once (per worker)
+#   queue           extra requests allowed to wait for a slot
+#   queue_timeout   seconds a queued request waits before giving up
+#   max_body_bytes  request body limit (413 above it)
+#   methods         methods the limits apply to (GET stats routes stay unlimited)
+DEFAULT_LIMITS = {
+    "resume_tools": {"concurrency": 2, "queue": 1, "queue_timeout": 2.0, "max_body_bytes": 6 * 1024 * 1024},
+    "courses": {"concurrency": 2, "queue": 1, "queue_timeout": 1.0, "max_body_bytes": 1024 * 1024},
+    "interview_eval": {"concurrency": 2, "queue": 1, "queue_timeout": 1.0, "max_body_bytes": 256 * 1024},
+}
+DEFAULT_METHODS = ("POST",)
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a bounded wait queue.
+
+    Up to `concurrency` callers hold a slot; up to `queue` more wait at most
+    `queue_timeout` seconds for one. Anyone beyond that is rejected at once,
+    so overload turns into fast 503s instead of growing latency and memory.
+    """
+
+    def __init__(self, name, concurrency, queue=0, queue_timeout=1.0):
+        self.name = name
+        self.concurrency = max(1, int(concurrency))
+        self.queue = max(0, int(queue))
+        self.queue_timeout = float(queue_timeout)
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Return None once admitted, or the rejection reason ("queue_full" / "queue_timeout")."""
+        with self._cond:
+            if self.active < self.concurrency and self.waiting == 0:
+                self.active += 1
+                return None
+            if self.waiting >= self.queue:
+                return "queue_full"
+            self.waiting += 1
+            ADMISSION_QUEUED.inc(endpoint=self.name)
+            started = time.perf_counter()
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.active >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return "queue_timeout"
+                    self._cond.wait(remaining)
+                self.active += 1
+                return None
+            finally:
+                self.waiting -= 1
+                ADMISSION_QUEUED.dec(endpoint=self.name)
+                ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, endpoint=self.name)
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def retry_after(self):
+        """Seconds a rejected client should wait before retrying."""
+        return max(1, math.ceil(self.queue_timeout))
+
+    def stats(self):
+        with self._cond:
+            return {"active": self.active, "waiting": self.waiting,
+                    "concurrency": self.concurrency, "queue": self.queue}
+
+
+def resolve_limits(app):
+    """
+    Merge DEFAULT_LIMITS with ADMISSION_LIMITS (a dict or JSON string keyed by
+    blueprint name or full endpoint name, e.g. "resume_tools.match_score_route_handler").
+    """
+    overrides = app.config.get('ADMISSION_LIMITS') or {}
+    if isinstance(overrides, str):
+        overrides = json.loads(overrides)
+    limits = {name: dict(settings) for name, settings in DEFAULT_LIMITS.items()}
+    if app.config.get('PDF_MAX_BYTES'):
+        # Resume uploads: the PDF limit plus room for the other form fields.
+        limits["resume_tools"]["max_body_bytes"] = int(app.config['PDF_MAX_BYTES']) + 1024 * 1024
+    for name, settings in overrides.items():
+        if settings is None:
+            limits[name] = None          # explicitly unlimited
+        else:
+            limits[name] = {**(limits.get(name) or {}), **settings}
+    return limits
+
+
+def init_admission_control(app):
+    """
+    Enforce per-endpoint concurrency limits and per-blueprint body size limits.
+    Each endpoint gets its own limiter, configured from its entry in the
+    merged limits or, failing that, its blueprint's.
+    """
+    from flask import g, jsonify, request
+
+    if not app.config.get('ADMISSION_CONTROL', True):
+        return {}
+    limits = resolve_limits(app)
+    limiters = {}
+    limiters_lock = threading.Lock()
+
+    def settings_for(endpoint):
+        if endpoint in limits:
+            return limits[endpoint]
+        blueprint = endpoint.rsplit(".", 1)[0] if "." in endpoint else None
+        return limits.get(blueprint)
+
+    def limiter_for(endpoint, settings):
+        limiter = limiters.get(endpoint)
+        if limiter is None:
+            with limiters_lock:
+                limiter = limiters.get(endpoint)
+                if limiter is None:
+                    limiter = limiters[endpoint] = AdmissionLimiter(
+                        endpoint, settings.get("concurrency", 1), settings.get("queue", 0),
+                        settings.get("queue_timeout", 1.0),
+                    )
+        return limiter
+
+    @app.before_request
+    def _admit():
+        endpoint = request.endpoint
+        settings = settings_for(endpoint) if endpoint else None
+        if not settings or request.method not in settings.get("methods", DEFAULT_METHODS):
+            return None
+
+        max_body = settings.get("max_body_bytes")
+        if max_body:
+            if request.content_length is not None and request.content_length > max_body:
+                ADMISSION_REJECTED.inc(endpoint=endpoint, reason="body_too_large")
+                return jsonify({"error": f"Request body exceeds {max_body / 1e6:.1f} MB."}), 413
+            # Also enforced while streaming chunked bodies without Content-Length.
+            request.max_content_length = max_body
+
+        if "concurrency" not in settings:
+            return None
+        limiter = limiter_for(endpoint, settings)
+        reason = limiter.acquire()
+        if reason is not None:
+            ADMISSION_REJECTED.inc(endpoint=endpoint, reason=reason)
+            response = jsonify({"error": "Server is busy. Please retry shortly."})
+            response.status_code = 503
+            response.headers["Retry-After"] = str(limiter.retry_after())
+            return response
+        g.admission_limiter = limiter
+        return None
+
+    @app.teardown_request
+    def _release(error=None):
+        limiter = g.pop("admission_limiter", None)
+        if limiter is not None:
+            limiter.release()
+
+    app.config['ADMISSION_LIMITERS'] = limiters
+    return limiters
@@ -0,0 +1,218 @@
+# backend/features/adzuna_client.py
+
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import ADZUNA_UPSTREAM_SECONDS, ADZUNA_CACHE_LOOKUPS
+
+BASE_URL = "https://api.adzuna.com/v1/api/jobs"
+RESULTS_PER_PAGE = 20
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_FRESH_TTL = 300       # serve from cache without revalidating
+DEFAULT_STALE_TTL = 3600      # serve stale while revalidating / when upstream fails
+DEFAULT_MAX_ENTRIES = 512
+
+
+_SECRET_PARAMS = re.compile(r"(app_id|app_key)=[^&\s)'\"]+")
+
+
+def redact(message):
+    """Strip Adzuna credentials from URLs embedded in error messages."""
+    return _SECRET_PARAMS.sub(r"\1=***", str(message))
+
+
+def _normalise(value):
+    return " ".join(str(value or "").lower().split())
+
+
+def search_key(country_code, page, keywords, location, results_per_page=RESULTS_PER_PAGE):
+    """Cache key for a search; equivalent queries differing only in case/spacing share it."""
+    return (_normalise(country_code), int(page), _normalise(keywords), _normalise(location), int(results_per_page))
+
+
+class AdzunaClient:
+    """
+    Adzuna search client with connection pooling, a TTL cache, single-flight
+    request coalescing and stale-while-revalidate.
+
+    - One `requests.Session` with a pooled HTTPAdapter keeps connections alive.
+    - Responses are cached per normalised search key. Within `fresh_ttl` they
+      are served directly; up to `stale_ttl` they are served immediately while
+      a background refresh runs, and are also used if the upstream call fails.
+    - Concurrent identical misses share one upstream call.
+    """
+
+    def __init__(self, app_id, app_key, logger=None,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 fresh_ttl=DEFAULT_FRESH_TTL, stale_ttl=DEFAULT_STALE_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES, pool_size=10, base_url=BASE_URL):
+        self.app_id = app_id
+        self.app_key = app_key
+        self.logger = logger or logging.getLogger(__name__)
+        self.timeout = (connect_timeout, read_timeout)
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = max(stale_ttl, fresh_ttl)
+        self.max_entries = max_entries
+        self.base_url = base_url.rstrip("/")
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._cache = OrderedDict()   # key -> (fetched_at, results, count)
+        self._inflight = {}           # key -> Future
+        self._lock = threading.Lock()
+        self._refresher = None
+
+        self.stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0,
+                      "coalesced": 0, "upstream_calls": 0, "upstream_errors": 0}
+
+    @property
+    def configured(self):
+        return bool(self.app_id and self.app_key)
+
+    # ---- upstream ----
+    def _request(self, key):
+        country_code, page, keywords, location, results_per_page = key
+        url = f"{self.base_url}/{country_code}/search/{page}"
+        params = {
+            "app_id": self.app_id,
+            "app_key": self.app_key,
+            "results_per_page": results_per_page,
+            "what": keywords,
+            "where": location,
+            "sort_by": "date",
+            "content-type": "application/json"
+        }
+        self.logger.info(f"Fetching Adzuna jobs: country={country_code} page={page} what='{keywords}' where='{location}'")
+        with self._lock:
+            self.stats["upstream_calls"] += 1
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            status = str(response.status_code)
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.JSONDecodeError:
+            raise
+        except requests.exceptions.RequestException as e:
+            # requests puts the full URL (with app_id/app_key) into its messages.
+            raise type(e)(redact(e), response=getattr(e, "response", None)) from None
+        finally:
+            ADZUNA_UPSTREAM_SECONDS.observe(time.perf_counter() - started, country=country_code, status=status)
+        return data.get("results", []), data.get("count", 0)
+
+    def _fetch_single_flight(self, key):
+        """Fetch `key` upstream, sharing the call with any identical in-flight request."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.stats["coalesced"] += 1
+                ADZUNA_CACHE_LOOKUPS.inc(result="coalesced")
+
+        if not leader:
+            return future.result()
+
+        try:
+            results, count = self._request(key)
+        except Exception as e:
+            with self._lock:
+                self.stats["upstream_errors"] += 1
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._store(key, results, count)
+            self._inflight.pop(key, None)
+        future.set_result((results, count))
+        return results, count
+
+    # ---- cache ----
+    def _store(self, key, results, count):
+        self._cache[key] = (time.monotonic(), results, count)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _revalidate(self, key):
+        try:
+            self._fetch_single_flight(key)
+        except Exception as e:
+            self.logger.warning(f"Background Adzuna refresh failed: {e}")
+
+    def _schedule_refresh(self, key):
+        with self._lock:
+            if key in self._inflight:
+                return
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="adzuna-refresh")
+        self._refresher.submit(self._revalidate, key)
+
+    def search(self, country_code="in", page=1, keywords="software engineer", location="india",
+               results_per_page=RESULTS_PER_PAGE):
+        """Return (results, count) for a search, using the cache where possible."""
+        key = search_key(country_code, page, keywords, location, results_per_page)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            age = now - cached[0] if cached else None
+            if cached and age <= self.fresh_ttl:
+                self._cache.move_to_end(key)
+                self.stats["fresh_hits"] += 1
+                ADZUNA_CACHE_LOOKUPS.inc(result="fresh")
+                return cached[1], cached[2]
+            if cached and age <= self.stale_ttl:
+                self.stats["stale_hits"] += 1
+                ADZUNA_CACHE_LOOKUPS.inc(result="stale")
+            else:
+                cached = None
+                self.stats["misses"] += 1
+                ADZUNA_CACHE_LOOKUPS.inc(result="miss")
+
+        if cached:
+            self._schedule_refresh(key)
+            return cached[1], cached[2]
+
+        return self._fetch_single_flight(key)
+
+    def cache_stats(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._cache), inflight=len(self._inflight))
+
+
+def init_adzuna_client(app):
+    """Create the shared Adzuna client from app config and store it in app config."""
+    client = AdzunaClient(
+        app.config.get('ADZUNA_API_ID'),
+        app.config.get('ADZUNA_API_KEY'),
+        logger=app.logger,
+        connect_timeout=float(app.config.get('ADZUNA_CONNECT_TIMEOUT') or DEFAULT_CONNECT_TIMEOUT),
+        read_timeout=float(app.config.get('ADZUNA_READ_TIMEOUT') or DEFAULT_READ_TIMEOUT),
+        fresh_ttl=float(app.config.get('ADZUNA_CACHE_TTL') or DEFAULT_FRESH_TTL),
+        stale_ttl=float(app.config.get('ADZUNA_STALE_TTL') or DEFAULT_STALE_TTL),
+        base_url=app.config.get('ADZUNA_BASE_URL') or BASE_URL,
+    )
+    app.config['ADZUNA_CLIENT'] = client
+    return client
+
+
+def get_adzuna_client(app):
+    client = app.config.get('ADZUNA_CLIENT')
+    if client is None:
+        client = init_adzuna_client(app)
+    return client
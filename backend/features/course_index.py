@@ -0,0 +1,524 @@
+# backend/features/course_index.py
+"""
+Versioned, memory-mappable course index artifacts.
+
+Layout of an index root (COURSE_INDEX_DIR):
+
+    CURRENT                      name of the active version (swapped atomically)
+    20261017-120000/
+        manifest.json            shapes, dtypes, vectorizer params, file checksums
+        matrix.data.f32          CSR data     (raw float32, rows L2-normalised)
+        matrix.indices.i32|i64   CSR indices  (raw int)
+        matrix.indptr.i32|i64    CSR indptr   (raw int)
+        idf.f32                  IDF weights, one per vocabulary term
+        vocabulary.json          terms in column order
+        metadata.json            columnar course metadata with pre-truncated snippets
+        embeddings.f16           optional dense course embeddings (raw float16, L2-normalised)
+
+Versions are built into a temporary directory and renamed into place, then
+CURRENT is replaced with os.replace(), so readers never observe a partially
+written index. Serving memory-maps the raw arrays; nothing is unpickled.
+
+Usage (from backend/):
+    python -m features.course_index build --csv Coursera.csv --out "../ML prediction/course_index"
+    python -m features.course_index build --from-joblib "../ML prediction" --out ...
+    python -m features.course_index build --csv Coursera.csv --out ... --embed-model paraphrase-MiniLM-L6-v2
+    python -m features.course_index list|verify|activate ...
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import threading
+
+import numpy as np
+
+FORMAT_VERSION = 1
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+DEFAULT_KEEP_VERSIONS = 3
+DEFAULT_RELOAD_INTERVAL = 30.0
+
+# Vectorizer settings that are plain data and can be rebuilt without pickle.
+_VECTORIZER_PARAMS = (
+    "analyzer", "binary", "decode_error", "encoding", "input", "lowercase", "max_df",
+    "max_features", "min_df", "ngram_range", "norm", "smooth_idf", "stop_words",
+    "strip_accents", "sublinear_tf", "token_pattern", "use_idf",
+)
+# Metadata columns kept for serving (same names as the training DataFrame).
+METADATA_COLUMNS = ("course_title", "Course URL", "course_skills")
+EMBED_BATCH_SIZE = 64
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json(path, payload):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, ensure_ascii=False)
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def current_version(root):
+    """Return the active version name under `root`, or None."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as fh:
+            version = fh.read().strip()
+    except OSError:
+        return None
+    return version if version and os.path.isdir(os.path.join(root, version)) else None
+
+
+def _build_time(root, version):
+    """When `version` was built: the manifest's created_at, else the directory mtime."""
+    try:
+        with open(os.path.join(root, version, MANIFEST_FILE), encoding="utf-8") as fh:
+            return float(json.load(fh)["created_at"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return os.path.getmtime(os.path.join(root, version))
+
+
+def list_versions(root):
+    """Version names under `root`, oldest build first (names are free-form, e.g. --version)."""
+    if not os.path.isdir(root):
+        return []
+    names = [
+        name for name in os.listdir(root)
+        if not name.startswith(".") and os.path.isfile(os.path.join(root, name, MANIFEST_FILE))
+    ]
+    return sorted(names, key=lambda name: (_build_time(root, name), name))
+
+
+def activate(root, version):
+    """Point CURRENT at `version` with an atomic rename."""
+    if not os.path.isfile(os.path.join(root, version, MANIFEST_FILE)):
+        raise FileNotFoundError(f"No course index version '{version}' under {root}.")
+    tmp_path = os.path.join(root, f".{CURRENT_FILE}.{os.getpid()}")
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        fh.write(version + "\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+    _fsync_dir(root)
+
+
+def prune(root, keep=DEFAULT_KEEP_VERSIONS):
+    """Delete the oldest versions beyond `keep`, never the active one."""
+    active = current_version(root)
+    others = [v for v in list_versions(root) if v != active]
+    stale = others[:max(0, len(others) - max(keep - 1, 0))]
+    for version in stale:
+        shutil.rmtree(os.path.join(root, version), ignore_errors=True)
+    return stale
+
+
+# -----------------------------
+# Build
+# -----------------------------
+def vectorizer_params(vectorizer):
+    params = vectorizer.get_params()
+    for name in ("analyzer", "tokenizer", "preprocessor"):
+        if callable(params.get(name)):
+            raise ValueError(f"Vectorizer has a custom {name}; it cannot be stored without pickle.")
+    params = {name: params[name] for name in _VECTORIZER_PARAMS if name in params}
+    if isinstance(params.get("stop_words"), (set, frozenset)):
+        params["stop_words"] = sorted(params["stop_words"])
+    return params
+
+
+def course_embedding_texts(metadata):
+    """Text embedded for each course: title, skills and full description."""
+    def column(name):
+        values = metadata[name] if name in metadata else []
+        values = values.tolist() if hasattr(values, "tolist") else list(values)
+        return [value if isinstance(value, str) else "" for value in values]
+
+    titles, skills, descriptions = column("course_title"), column("course_skills"), column("course_description")
+    return [
+        ". ".join(part for part in (title, skill, description) if part)
+        for title, skill, description in zip(titles, skills, descriptions)
+    ]
+
+
+def encode_courses(model_name_or_path, texts, batch_size=EMBED_BATCH_SIZE):
+    """Encode course texts with a SentenceTransformer; returns L2-normalised float32 rows."""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name_or_path, device="cpu")
+    embeddings = np.asarray(model.encode(texts, batch_size=batch_size, show_progress_bar=len(texts) > 1000),
+                            dtype=np.float32)
+    return embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+
+def build_index(vectorizer, tfidf_matrix, metadata, out_root, version=None, source=None, activate_version=True,
+                embeddings=None, embedding_model=None):
+    """
+    Write a new index version under `out_root` and (optionally) activate it.
+
+    `metadata` is a DataFrame or dict of columns with METADATA_COLUMNS and
+    `course_description`. `embeddings` (courses x dim) are stored as float16
+    for the dense recommendation mode. Returns the version name.
+    """
+    import scipy.sparse as sp
+    from sklearn.preprocessing import normalize
+    from .course_search import make_snippet
+
+    matrix = normalize(sp.csr_matrix(tfidf_matrix, dtype=np.float32), norm="l2", copy=True)
+    matrix.sort_indices()
+    num_courses, vocab_size = matrix.shape
+    index_dtype = np.int32 if matrix.nnz < np.iinfo(np.int32).max else np.int64
+    index_ext = "i32" if index_dtype == np.int32 else "i64"
+
+    vocabulary = [None] * vocab_size
+    for term, column in vectorizer.vocabulary_.items():
+        vocabulary[column] = term
+
+    def column(name, default=""):
+        if name not in metadata:
+            return [default] * num_courses
+        values = metadata[name]
+        values = values.tolist() if hasattr(values, "tolist") else list(values)
+        return [value if isinstance(value, str) else default for value in values]
+
+    columns = {name: column(name) for name in METADATA_COLUMNS}
+    columns["description_snippet"] = [make_snippet(text) for text in column("course_description")]
+    if any(len(values) != num_courses for values in columns.values()):
+        raise ValueError("Metadata row count does not match the TF-IDF matrix.")
+    if embeddings is not None:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[0] != num_courses:
+            raise ValueError("Embedding row count does not match the TF-IDF matrix.")
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+    os.makedirs(out_root, exist_ok=True)
+    version = version or time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+    final_dir = os.path.join(out_root, version)
+    if os.path.exists(final_dir):
+        raise FileExistsError(f"Course index version '{version}' already exists in {out_root}.")
+    tmp_dir = os.path.join(out_root, f".tmp-{version}-{os.getpid()}")
+    os.makedirs(tmp_dir)
+
+    try:
+        files = {
+            "matrix.data.f32": matrix.data.astype(np.float32, copy=False),
+            f"matrix.indices.{index_ext}": matrix.indices.astype(index_dtype, copy=False),
+            f"matrix.indptr.{index_ext}": matrix.indptr.astype(index_dtype, copy=False),
+            "idf.f32": np.asarray(vectorizer.idf_, dtype=np.float32),
+        }
+        if embeddings is not None:
+            files["embeddings.f16"] = embeddings.astype(np.float16)
+        for name, array in files.items():
+            array.tofile(os.path.join(tmp_dir, name))
+        _write_json(os.path.join(tmp_dir, "vocabulary.json"), vocabulary)
+        _write_json(os.path.join(tmp_dir, "metadata.json"), columns)
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "version": version,
+            "created_at": time.time(),
+            "source": source,
+            "num_courses": num_courses,
+            "vocab_size": vocab_size,
+            "nnz": int(matrix.nnz),
+            "index_dtype": np.dtype(index_dtype).name,
+            "normalised": True,
+            "vectorizer": vectorizer_params(vectorizer),
+            "embedding": None if embeddings is None else {
+                "model": embedding_model,
+                "dim": int(embeddings.shape[1]),
+                "dtype": "float16",
+            },
+            "files": {},
+        }
+        for name in sorted(os.listdir(tmp_dir)):
+            path = os.path.join(tmp_dir, name)
+            with open(path, "rb+") as fh:
+                os.fsync(fh.fileno())
+            manifest["files"][name] = {"bytes": os.path.getsize(path), "sha256": _sha256(path)}
+        _write_json(os.path.join(tmp_dir, MANIFEST_FILE), manifest)
+
+        os.rename(tmp_dir, final_dir)
+        _fsync_dir(out_root)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    if activate_version:
+        activate(out_root, version)
+    return version
+
+
+def prepare_courses_csv(csv_path):
+    """Load and clean the Coursera CSV the same way the training notebook does."""
+    import pandas as pd
+    from .predict_courses import clean_text
+
+    df = pd.read_csv(csv_path).rename(columns={
+        "Course Name": "course_title",
+        "Course Description": "course_description",
+        "Skills": "course_skills",
+    })
+    missing = [c for c in ("course_title", "course_description", "course_skills", "Course URL") if c not in df.columns]
+    if missing:
+        raise ValueError(f"Required columns missing from {csv_path}: {missing}")
+    for name in ("course_title", "course_description", "course_skills"):
+        df[name] = df[name].fillna("")
+    df = df[df["course_title"].str.strip() != ""]
+    df["combined_features"] = (
+        df["course_title"].apply(clean_text) + " "
+        + df["course_description"].apply(clean_text) + " "
+        + (df["course_skills"].apply(clean_text) + " ") * 2  # skills weighted twice
+    )
+    df = df.drop_duplicates(subset=["course_title", "course_description"]).reset_index(drop=True)
+    return df
+
+
+def _embed(metadata, embed_model):
+    if not embed_model:
+        return {}
+    return {"embeddings": encode_courses(embed_model, course_embedding_texts(metadata)), "embedding_model": embed_model}
+
+
+def build_from_csv(csv_path, out_root, embed_model=None, **kwargs):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    df = prepare_courses_csv(csv_path)
+    vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), min_df=2, max_df=0.8, dtype=np.float32)
+    matrix = vectorizer.fit_transform(df["combined_features"])
+    return build_index(vectorizer, matrix, df, out_root, source=os.path.basename(csv_path),
+                       **_embed(df, embed_model), **kwargs)
+
+
+def build_from_joblib(model_dir, out_root, embed_model=None, **kwargs):
+    """Convert the legacy pickled artifacts into a versioned index."""
+    import joblib
+
+    vectorizer = joblib.load(os.path.join(model_dir, "tfidf_vectorizer.joblib"))
+    matrix = joblib.load(os.path.join(model_dir, "course_tfidf_matrix.joblib"))
+    metadata = joblib.load(os.path.join(model_dir, "course_metadata.joblib"))
+    return build_index(vectorizer, matrix, metadata, out_root, source="joblib",
+                       **_embed(metadata, embed_model), **kwargs)
+
+
+# -----------------------------
+# Load
+# -----------------------------
+def verify_version(version_dir, checksums=True):
+    """Raise ValueError if any file is missing, truncated or (optionally) corrupt."""
+    with open(os.path.join(version_dir, MANIFEST_FILE), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported course index format {manifest.get('format_version')}.")
+    for name, info in manifest["files"].items():
+        path = os.path.join(version_dir, name)
+        if not os.path.isfile(path) or os.path.getsize(path) != info["bytes"]:
+            raise ValueError(f"Course index file {name} is missing or truncated.")
+        if checksums and _sha256(path) != info["sha256"]:
+            raise ValueError(f"Checksum mismatch for course index file {name}.")
+    return manifest
+
+
+def _rebuild_vectorizer(params, vocabulary, idf):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    params = dict(params)
+    if isinstance(params.get("ngram_range"), list):
+        params["ngram_range"] = tuple(params["ngram_range"])
+    vectorizer = TfidfVectorizer(dtype=np.float32, **params)
+    vectorizer.vocabulary_ = {term: column for column, term in enumerate(vocabulary)}
+    vectorizer.idf_ = idf
+    return vectorizer
+
+
+def load_index(version_dir, verify=True, clean_fn=None):
+    """Open an index version as a CourseSearchEngine backed by memory-mapped arrays."""
+    import scipy.sparse as sp
+    from .course_search import CourseSearchEngine
+
+    manifest = verify_version(version_dir, checksums=verify)
+    index_dtype = np.dtype(manifest["index_dtype"])
+    index_ext = "i32" if index_dtype == np.int32 else "i64"
+
+    def mapped(name, dtype):
+        path = os.path.join(version_dir, name)
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    matrix = sp.csr_matrix(
+        (mapped("matrix.data.f32", np.float32),
+         mapped(f"matrix.indices.{index_ext}", index_dtype),
+         mapped(f"matrix.indptr.{index_ext}", index_dtype)),
+        shape=(manifest["num_courses"], manifest["vocab_size"]),
+        copy=False,
+    )
+    with open(os.path.join(version_dir, "vocabulary.json"), encoding="utf-8") as fh:
+        vocabulary = json.load(fh)
+    with open(os.path.join(version_dir, "metadata.json"), encoding="utf-8") as fh:
+        metadata = json.load(fh)
+    idf = np.fromfile(os.path.join(version_dir, "idf.f32"), dtype=np.float32)
+    vectorizer = _rebuild_vectorizer(manifest["vectorizer"], vocabulary, idf)
+
+    embedding = manifest.get("embedding")
+    embeddings = None
+    if embedding:
+        embeddings = np.memmap(os.path.join(version_dir, "embeddings.f16"), dtype=np.float16, mode="r",
+                               shape=(manifest["num_courses"], embedding["dim"]))
+
+    return CourseSearchEngine(
+        vectorizer, matrix, metadata, clean_fn=clean_fn,
+        normalised=manifest.get("normalised", False), version=manifest["version"],
+        embeddings=embeddings, embedding_model=embedding["model"] if embedding else None,
+    )
+
+
+# -----------------------------
+# Hot reload
+# -----------------------------
+class IndexWatcher:
+    """
+    Polls CURRENT at most every `interval` seconds. When it names a version
+    other than the one being served, loads it on a background thread and
+    hands the new engine to `on_load`; requests keep using the old engine
+    (whose arrays stay mapped while referenced) until the swap.
+    """
+
+    def __init__(self, root, on_load, interval=DEFAULT_RELOAD_INTERVAL, verify=True, clean_fn=None, logger=None):
+        self.root = root
+        self.on_load = on_load
+        self.interval = interval
+        self.verify = verify
+        self.clean_fn = clean_fn
+        self.logger = logger or logging.getLogger(__name__)
+        self._next_check = 0.0
+        self._loading = threading.Lock()
+        self._failed = set()
+
+    def load_current(self):
+        """Load the version CURRENT names (None if there is none); a version that fails is not retried by check()."""
+        version = current_version(self.root)
+        if version is None:
+            return None
+        try:
+            return load_index(os.path.join(self.root, version), verify=self.verify, clean_fn=self.clean_fn)
+        except Exception:
+            self._failed.add(version)
+            raise
+
+    def check(self, active_version, force=False):
+        """Start a reload if CURRENT moved; returns the pending version or None."""
+        now = time.monotonic()
+        if not force and (self.interval <= 0 or now < self._next_check):
+            return None
+        self._next_check = now + self.interval
+        version = current_version(self.root)
+        if version is None or version == active_version or version in self._failed:
+            return None
+        if not self._loading.acquire(blocking=False):
+            return None
+        if force:
+            try:
+                self._reload(version)
+            finally:
+                self._loading.release()
+            return version
+        threading.Thread(target=self._reload_and_release, args=(version,), name="course-index-reload",
+                         daemon=True).start()
+        return version
+
+    def _reload_and_release(self, version):
+        try:
+            self._reload(version)
+        finally:
+            self._loading.release()
+
+    def _reload(self, version):
+        start = time.perf_counter()
+        try:
+            engine = load_index(os.path.join(self.root, version), verify=self.verify, clean_fn=self.clean_fn)
+        except Exception as e:
+            self._failed.add(version)
+            self.logger.error(f"Course index {version} failed to load; keeping the current index: {e}")
+            return
+        self.on_load(engine)
+        self.logger.info(f"✅ Switched course index to {version} in {time.perf_counter() - start:.2f}s.")
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and manage versioned course index artifacts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build a new index version.")
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="Coursera courses CSV (fits a new TF-IDF vectorizer).")
+    source.add_argument("--from-joblib", metavar="DIR", help="Directory with the legacy .joblib artifacts.")
+    build.add_argument("--out", required=True, help="Index root directory.")
+    build.add_argument("--version", help="Version name (default: UTC timestamp).")
+    build.add_argument("--no-activate", action="store_true", help="Build without switching CURRENT.")
+    build.add_argument("--keep", type=int, default=DEFAULT_KEEP_VERSIONS, help="Versions to keep after pruning.")
+    build.add_argument("--embed-model", help="Sentence model for dense course embeddings; must match the "
+                                             "model used for SBERT scoring at serving time.")
+
+    for name, help_text in (("list", "List versions."), ("verify", "Verify checksums."),
+                            ("activate", "Switch CURRENT to a version.")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("--out", required=True, help="Index root directory.")
+        if name != "list":
+            sub.add_argument("version", nargs="?" if name == "verify" else None)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "build":
+        kwargs = dict(version=args.version, activate_version=not args.no_activate, embed_model=args.embed_model)
+        if args.csv:
+            version = build_from_csv(args.csv, args.out, **kwargs)
+        else:
+            version = build_from_joblib(args.from_joblib, args.out, **kwargs)
+        pruned = prune(args.out, args.keep)
+        print(json.dumps({"version": version, "active": current_version(args.out), "pruned": pruned}))
+    elif args.command == "list":
+        active = current_version(args.out)
+        for version in list_versions(args.out):
+            print(f"{'*' if version == active else ' '} {version}")
+    elif args.command == "verify":
+        version = args.version or current_version(args.out)
+        if version is None:
+            parser.error("No version given and CURRENT is not set.")
+        manifest = verify_version(os.path.join(args.out, version), checksums=True)
+        print(json.dumps({k: manifest[k] for k in ("version", "num_courses", "vocab_size", "nnz")}))
+    elif args.command == "activate":
+        activate(args.out, args.version)
+        print(json.dumps({"active": args.version}))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,177 @@
+# backend/features/course_search.py
+
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from .metrics import COURSE_SEARCH_SECONDS
+
+DEFAULT_MIN_SCORE = 0.01
+SNIPPET_LENGTH = 200
+DEFAULT_HYBRID_ALPHA = 0.5     # weight of the dense score in hybrid mode
+DENSE_BLOCK_ROWS = 8192        # float16 rows upcast per block during dense scoring
+SEARCH_MODES = ("tfidf", "dense", "hybrid")
+
+# -----------------------------
+# Metadata helpers
+# -----------------------------
+def make_snippet(text):
+    return text[:SNIPPET_LENGTH] + "..."
+
+
+def _column(metadata, name, default, num_rows):
+    """
+    Return a metadata column as a plain Python list, filling gaps with `default`.
+    `metadata` is a DataFrame or a dict of column lists.
+    """
+    if name not in metadata:
+        return [default] * num_rows
+    values = metadata[name]
+    values = values.tolist() if hasattr(values, "tolist") else values
+    return [value if isinstance(value, str) else default for value in values]
+
+
+class CourseSearchEngine:
+    """
+    Batched top-k search over the course TF-IDF index.
+
+    Course rows are L2-normalised once, so cosine similarity reduces to a single
+    sparse matrix product for the whole batch. Top-k uses `argpartition` on the
+    non-zero scores of each query row instead of a full sort, and course rows
+    are built from plain Python lists rather than `DataFrame.iloc`.
+    `version` names the index build being served (None for legacy artifacts).
+
+    If `embeddings` (courses x dim, L2-normalised, usually a float16 memmap)
+    are supplied, the engine can also rank by dense cosine similarity against
+    query embeddings, or blend dense and TF-IDF scores ("hybrid").
+    """
+
+    def __init__(self, vectorizer, tfidf_matrix, metadata, clean_fn=None, normalised=False, version=None,
+                 embeddings=None, embedding_model=None):
+        self.vectorizer = vectorizer
+        self.embeddings = embeddings
+        self.embedding_model = embedding_model
+        matrix = sp.csr_matrix(tfidf_matrix, copy=False)
+        self.matrix = matrix if normalised else self._ensure_normalised(matrix)
+        self.clean_fn = clean_fn or (lambda text: text)
+        self.version = version
+
+        rows = self.matrix.shape[0]
+        self.titles = _column(metadata, "course_title", "N/A", rows)
+        self.urls = _column(metadata, "Course URL", "#", rows)
+        self.skills = _column(metadata, "course_skills", "N/A", rows)
+        if "description_snippet" in metadata:
+            self.snippets = _column(metadata, "description_snippet", "...", rows)
+        else:
+            self.snippets = [make_snippet(text) for text in _column(metadata, "course_description", "", rows)]
+
+    @staticmethod
+    def _ensure_normalised(matrix):
+        """Normalise rows only if the stored matrix is not already unit-length."""
+        squared = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+        non_empty = squared > 0
+        if non_empty.any() and np.allclose(squared[non_empty], 1.0, atol=1e-3):
+            return matrix
+        return normalize(matrix, norm="l2", copy=True)
+
+    @property
+    def num_courses(self):
+        return self.matrix.shape[0]
+
+    def score(self, query_texts):
+        """Return a CSR matrix of cosine scores, one row per query."""
+        with COURSE_SEARCH_SECONDS.time(stage="transform"):
+            cleaned = [self.clean_fn(text) for text in query_texts]
+            query_matrix = normalize(self.vectorizer.transform(cleaned), norm="l2", copy=False)
+        # (courses x vocab) @ (vocab x queries) keeps the large matrix in its
+        # stored CSR layout so a memory-mapped index is never copied.
+        with COURSE_SEARCH_SECONDS.time(stage="product"):
+            return sp.csr_matrix((self.matrix @ query_matrix.T).T)
+
+    @property
+    def has_embeddings(self):
+        return self.embeddings is not None
+
+    def dense_scores(self, query_vectors):
+        """Return a (queries x courses) float32 array of cosine scores."""
+        queries = np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.embeddings.shape[1])
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        scores = np.empty((queries.shape[0], self.num_courses), dtype=np.float32)
+        started = time.perf_counter()
+        # Upcast the float16 matrix block by block so BLAS does the product
+        # without materialising a float32 copy of the whole index.
+        for start in range(0, self.num_courses, DENSE_BLOCK_ROWS):
+            block = np.asarray(self.embeddings[start:start + DENSE_BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + block.shape[0]] = queries @ block.T
+        COURSE_SEARCH_SECONDS.observe(time.perf_counter() - started, stage="dense")
+        return scores
+
+    @staticmethod
+    def _select(data, indices, top_n, min_score):
+        """Top `top_n` (index, score) pairs among `data >= min_score`, best first."""
+        keep = data >= min_score
+        data, indices = data[keep], indices[keep]
+        if top_n <= 0 or data.size == 0:
+            return []
+        if data.size > top_n:
+            part = np.argpartition(-data, top_n - 1)[:top_n]
+            data, indices = data[part], indices[part]
+        order = np.argsort(-data, kind="stable")
+        return [(int(indices[i]), float(data[i])) for i in order]
+
+    def top_k(self, query_texts, top_n=5, min_score=DEFAULT_MIN_SCORE):
+        """Return, for each query, a list of (course_index, score) pairs."""
+        scores = self.score(query_texts)
+        results = []
+        with COURSE_SEARCH_SECONDS.time(stage="topk"):
+            for row in range(scores.shape[0]):
+                start, end = scores.indptr[row], scores.indptr[row + 1]
+                results.append(self._select(scores.data[start:end], scores.indices[start:end], top_n, min_score))
+        return results
+
+    def dense_top_k(self, query_vectors, top_n=5, min_score=DEFAULT_MIN_SCORE, query_texts=None,
+                    alpha=1.0):
+        """
+        Top-k by dense cosine score. With `query_texts` and `alpha < 1` the
+        score is `alpha * dense + (1 - alpha) * tfidf` (hybrid mode).
+        """
+        scores = self.dense_scores(query_vectors)
+        if query_texts is not None and alpha < 1.0:
+            scores *= alpha
+            scores += (1.0 - alpha) * self.score(query_texts).toarray()
+        all_indices = np.arange(self.num_courses)
+        with COURSE_SEARCH_SECONDS.time(stage="topk"):
+            return [self._select(row, all_indices, top_n, min_score) for row in scores]
+
+    def course_row(self, idx, score):
+        """Build the JSON row returned by the recommendation endpoints."""
+        return {
+            "id": f"course_{idx}",
+            "name": self.titles[idx],
+            "url": self.urls[idx],
+            "skills_taught": self.skills[idx],
+            "description_snippet": self.snippets[idx],
+            "relevance": f"{round(score * 100, 2)}%",
+            "similarity_score": round(score, 4)
+        }
+
+    def search(self, query_texts, top_n=5, min_score=DEFAULT_MIN_SCORE, mode="tfidf", query_vectors=None,
+               alpha=DEFAULT_HYBRID_ALPHA):
+        """
+        Return a list of recommendation lists, one per query text.
+        Dense and hybrid modes need `query_vectors` from the same sentence
+        model that produced the course embeddings.
+        """
+        if mode == "tfidf":
+            hits = self.top_k(query_texts, top_n=top_n, min_score=min_score)
+        elif mode in ("dense", "hybrid"):
+            if not self.has_embeddings or query_vectors is None:
+                raise ValueError(f"'{mode}' mode needs course embeddings and query vectors.")
+            hits = self.dense_top_k(query_vectors, top_n=top_n, min_score=min_score,
+                                    query_texts=query_texts if mode == "hybrid" else None,
+                                    alpha=alpha if mode == "hybrid" else 1.0)
+        else:
+            raise ValueError(f"Unknown search mode '{mode}'; expected one of {SEARCH_MODES}.")
+        return [[self.course_row(idx, score) for idx, score in row] for row in hits]
@@ -0,0 +1,185 @@
+# backend/features/embedding_cache.py
+
+import os
+import re
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .metrics import EMBEDDING_CACHE_LOOKUPS
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB of float32 vectors per worker
+
+# -----------------------------
+# Keys
+# -----------------------------
+def normalise_text(text):
+    """Collapse whitespace so trivially different copies of a text share a key."""
+    if not isinstance(text, str):
+        return ""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def embedding_key(text, model_name):
+    """Content address for `text` encoded by `model_name`."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalise_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+# -----------------------------
+# Cache
+# -----------------------------
+class EmbeddingCache:
+    """
+    Two-tier cache of sentence embeddings keyed by content hash.
+
+    Tier 1 is an in-process LRU bounded by `max_bytes`. Tier 2 (optional) is a
+    directory of float32 `.npy` files, one per key, shared by every worker on
+    the host: files are written atomically and opened with `mmap_mode="r"`.
+    """
+
+    def __init__(self, model_name, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._lru = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ---- disk tier ----
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.npy")
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.array(np.load(path, mmap_mode="r"), dtype=np.float32)
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, key, vector):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.save(fh, vector)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # ---- memory tier ----
+    def _memory_put(self, key, vector):
+        if vector.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._lru.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._lru[key] = vector
+            self._bytes += vector.nbytes
+            while self._bytes > self.max_bytes and self._lru:
+                _, evicted = self._lru.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def get(self, text):
+        """Return the cached embedding for `text`, or None."""
+        key = embedding_key(text, self.model_name)
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+                EMBEDDING_CACHE_LOOKUPS.inc(result="memory")
+                return vector
+
+        vector = self._disk_get(key)
+        if vector is not None:
+            with self._lock:
+                self.disk_hits += 1
+            EMBEDDING_CACHE_LOOKUPS.inc(result="disk")
+            self._memory_put(key, vector)
+            return vector
+
+        with self._lock:
+            self.misses += 1
+        EMBEDDING_CACHE_LOOKUPS.inc(result="miss")
+        return None
+
+    def put(self, text, vector):
+        key = embedding_key(text, self.model_name)
+        # Copy: a row of an encoded batch is a view that would keep the whole
+        # batch alive while the byte budget only counts the row.
+        vector = np.array(vector, dtype=np.float32, copy=True)
+        self._memory_put(key, vector)
+        self._disk_put(key, vector)
+
+    def encode(self, model, texts, **encode_kwargs):
+        """
+        Return a (len(texts), dim) float32 array of embeddings.
+
+        Only cache misses are sent to `model.encode`, in a single call, so fully
+        cached inputs skip the transformer forward pass entirely. Duplicate texts
+        within one call are encoded once.
+        """
+        vectors = [self.get(text) for text in texts]
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(normalise_text(texts[i]), []).append(i)
+
+        if missing:
+            unique_texts = list(missing)
+            encoded = np.asarray(model.encode(unique_texts, **encode_kwargs), dtype=np.float32)
+            for text, vector in zip(unique_texts, encoded):
+                self.put(text, vector)
+                for i in missing[text]:
+                    vectors[i] = vector
+
+        return np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "model_name": self.model_name,
+                "entries": len(self._lru),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_dir": self.disk_dir,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+def init_embedding_cache(app, model_name):
+    """Create the embedding cache from app config and store it in app config."""
+    cache = EmbeddingCache(
+        model_name,
+        max_bytes=int(app.config.get('EMBEDDING_CACHE_MAX_BYTES') or DEFAULT_MAX_BYTES),
+        disk_dir=app.config.get('EMBEDDING_CACHE_DIR') or None,
+    )
+    app.config['EMBEDDING_CACHE'] = cache
+    return cache
@@ -0,0 +1,187 @@
+# backend/features/inference_scheduler.py
+
+import os
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from .metrics import SBERT_ENCODE_SECONDS, SBERT_BATCH_SIZE
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+STATS_WINDOW = 1024  # recent batches kept for percentile stats
+
+
+class _EncodeRequest:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class TimedEncoder:
+    """Pass-through wrapper that records SBERT forward latency when micro-batching is off."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def encode(self, texts, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self.model.encode(texts, **kwargs)
+        finally:
+            SBERT_ENCODE_SECONDS.observe(time.perf_counter() - started, path="direct")
+            SBERT_BATCH_SIZE.observe(1 if isinstance(texts, str) else len(texts), path="direct")
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class EncodeScheduler:
+    """
+    Cross-request micro-batching front end for a SentenceTransformer.
+
+    Request threads call `encode()` exactly like `model.encode()`. Their texts
+    are queued and a single background thread merges everything that arrives
+    within `max_wait_ms` (or until `max_batch_size` texts are collected) into
+    one forward pass, then hands each caller its slice of the result. Because
+    only that thread touches the model, concurrent requests no longer compete
+    for torch intra-op threads.
+    """
+
+    def __init__(self, model, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS, logger=None):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = deque(maxlen=STATS_WINDOW)
+        self._wait_ms = deque(maxlen=STATS_WINDOW)
+        self._forward_ms = deque(maxlen=STATS_WINDOW)
+        self._forwarding = False
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+
+    def _ensure_worker(self):
+        """Start the batching thread on first use in this process (safe after fork)."""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), name="sbert-encode-scheduler", daemon=True)
+            self._thread.start()
+
+    # ---- public API ----
+    def encode(self, texts, **_ignored):
+        """Queue `texts` and block until their embeddings are ready."""
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return np.empty((0, 0), dtype=np.float32)
+
+        self._ensure_worker()
+        request = _EncodeRequest(batch)
+        self._queue.put(request)
+        result = request.future.result()
+        return result[0] if single else result
+
+    @property
+    def busy(self):
+        """True while texts are queued or a merged forward pass is running."""
+        return self._forwarding or (self._queue is not None and not self._queue.empty())
+
+    # ---- worker ----
+    def _collect(self, work_queue):
+        """Block for one request, then gather more until the window closes or the batch is full."""
+        pending = [work_queue.get()]
+        size = len(pending[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = work_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(request)
+            size += len(request.texts)
+        return pending, size
+
+    def _run(self, work_queue):
+        while True:
+            pending, size = self._collect(work_queue)
+            started = time.perf_counter()
+            texts = [text for request in pending for text in request.texts]
+            self._forwarding = True
+            try:
+                embeddings = np.asarray(
+                    self.model.encode(texts, batch_size=self.max_batch_size),
+                    dtype=np.float32,
+                )
+            except Exception as e:
+                self.logger.error(f"Batched encode of {size} texts failed: {e}", exc_info=True)
+                for request in pending:
+                    request.future.set_exception(e)
+                continue
+            finally:
+                self._forwarding = False
+
+            finished = time.perf_counter()
+            SBERT_ENCODE_SECONDS.observe(finished - started, path="scheduler")
+            SBERT_BATCH_SIZE.observe(size, path="scheduler")
+            offset = 0
+            for request in pending:
+                n = len(request.texts)
+                request.future.set_result(embeddings[offset:offset + n])
+                offset += n
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += size
+                self.requests += len(pending)
+                self._batch_sizes.append(size)
+                self._forward_ms.append((finished - started) * 1000.0)
+                self._wait_ms.extend((started - r.enqueued_at) * 1000.0 for r in pending)
+
+    # ---- stats ----
+    def stats(self):
+        def summary(values):
+            if not values:
+                return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+            arr = np.fromiter(values, dtype=np.float64)
+            return {
+                "avg": round(float(arr.mean()), 3),
+                "p50": round(float(np.percentile(arr, 50)), 3),
+                "p95": round(float(np.percentile(arr, 95)), 3),
+                "max": round(float(arr.max()), 3),
+            }
+
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self.batches,
+                "requests": self.requests,
+                "items": self.items,
+                "batch_size": summary(self._batch_sizes),
+                "queue_wait_ms": summary(self._wait_ms),
+                "forward_ms": summary(self._forward_ms),
+            }
@@ -1,6 +1,15 @@
 # backend/features/interview_eval.py
 
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from flask import Blueprint, request, jsonify, current_app
+
+from .metrics import LLM_CALL_SECONDS, stage_timer
+from .question_cache import (
+    QuestionBank, QuestionCache, QuestionService, validate_counts, DEFAULT_BANK_PATH, DEFAULT_TTL, DEFAULT_MAX_ENTRIES,
+)
 # NOTE: This example uses a placeholder for the actual LLM call.
 # You would replace `call_llm_for_generation` and `call_llm_for_evaluation`
 # with your specific implementation (e.g., using Ollama, OpenAI, or Hugging Face).
@@ -29,13 +38,207 @@ def call_llm_for_generation(prompt):
 def call_llm_for_evaluation(prompt):
     """Placeholder function to simulate an LLM call for evaluating an answer."""
     # This mock response provides a score and feedback.
-    import random
     score = random.randint(60, 95) # Simulate a variable score
     return {
         "score": score,
         "feedback_text": f"This is solid feedback for the answer provided. The key concepts were mentioned clearly. Score: {score}."
     }
 
+# --- Evaluation Backends ---
+class EvaluationBackend:
+    """
+    Interface for answer-evaluation backends.
+    `evaluate` scores one prompt; `evaluate_batch` scores several and may pack
+    them into a single model call (the default just loops).
+    Both return dicts with "score" and "feedback_text".
+    A running call can't be cancelled from outside, so backends must give up
+    after `timeout` seconds themselves (pass it to the HTTP client / SDK) and
+    raise TimeoutError; otherwise a hung call holds a pool slot indefinitely.
+    """
+    name = "base"
+
+    def evaluate(self, prompt, timeout=None):
+        raise NotImplementedError
+
+    def evaluate_batch(self, prompts, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = []
+        for prompt in prompts:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError(f"Evaluation batch exceeded {timeout:.1f}s.")
+            results.append(self.evaluate(prompt, timeout=remaining))
+        return results
+
+
+class PlaceholderEvaluationBackend(EvaluationBackend):
+    """Wraps the placeholder `call_llm_for_evaluation` above."""
+    name = "placeholder"
+
+    def evaluate(self, prompt, timeout=None):
+        return call_llm_for_evaluation(prompt)
+
+
+class SimulatedLatencyBackend(EvaluationBackend):
+    """
+    Local stand-in for a remote model: sleeps for a random latency per call,
+    then returns a placeholder evaluation. A batch costs one call's latency,
+    mimicking several Q&A items packed into one prompt.
+    """
+    name = "simulated"
+
+    def __init__(self, min_latency=0.2, max_latency=1.0):
+        self.min_latency = min_latency
+        self.max_latency = max_latency
+
+    def _sleep(self, timeout):
+        latency = random.uniform(self.min_latency, self.max_latency)
+        if timeout is not None and latency > timeout:
+            time.sleep(max(0.0, timeout))
+            raise TimeoutError(f"Simulated evaluation exceeded {timeout:.1f}s.")
+        time.sleep(latency)
+
+    def evaluate(self, prompt, timeout=None):
+        self._sleep(timeout)
+        return call_llm_for_evaluation(prompt)
+
+    def evaluate_batch(self, prompts, timeout=None):
+        self._sleep(timeout)
+        return [call_llm_for_evaluation(prompt) for prompt in prompts]
+
+
+EVALUATION_BACKENDS = {
+    PlaceholderEvaluationBackend.name: PlaceholderEvaluationBackend,
+    SimulatedLatencyBackend.name: SimulatedLatencyBackend,
+}
+
+DEFAULT_EVAL_CONCURRENCY = 8
+DEFAULT_EVAL_ITEM_TIMEOUT = 30.0
+
+_eval_pool = None
+_eval_pool_lock = threading.Lock()
+
+
+def get_evaluation_backend(app):
+    """Return the configured evaluation backend, creating it on first use."""
+    backend = app.config.get('EVALUATION_BACKEND')
+    if backend is None:
+        name = app.config.get('INTERVIEW_EVAL_BACKEND') or PlaceholderEvaluationBackend.name
+        backend_cls = EVALUATION_BACKENDS.get(name)
+        if backend_cls is None:
+            raise ValueError(f"Unknown interview evaluation backend '{name}'.")
+        backend = backend_cls()
+        app.config['EVALUATION_BACKEND'] = backend
+    return backend
+
+
+def _get_eval_pool(app):
+    """Process-wide pool; its size is the global limit on in-flight evaluations."""
+    global _eval_pool
+    if _eval_pool is None:
+        with _eval_pool_lock:
+            if _eval_pool is None:
+                workers = int(app.config.get('INTERVIEW_EVAL_CONCURRENCY') or DEFAULT_EVAL_CONCURRENCY)
+                _eval_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="interview-eval")
+    return _eval_pool
+
+
+def _question_sort_key(question_id):
+    """Order numeric ids numerically, then everything else as strings."""
+    try:
+        return (0, float(question_id), "")
+    except (TypeError, ValueError):
+        return (1, 0.0, str(question_id))
+
+
+def evaluate_concurrently(backend, pool, items, timeout, logger, batch_size=1):
+    """
+    Evaluate `items` ([(question_id, prompt), ...]) on `pool`.
+    Items are grouped into batches of `batch_size` (one backend call each).
+    Each batch gets `timeout` seconds from when it starts running (the backend
+    is given the same timeout), and a batch still queued `timeout` seconds
+    after submission is cancelled; either way its items come back as None.
+    Returns {question_id: result_or_None}.
+    """
+    started = {}
+
+    def timed_batch(number, prompts):
+        started[number] = time.monotonic()
+        with stage_timer(LLM_CALL_SECONDS, operation="evaluate"):
+            return backend.evaluate_batch(prompts, timeout=timeout)
+
+    batches = [items[i:i + batch_size] for i in range(0, len(items), max(1, batch_size))]
+    submitted = time.monotonic()
+    futures = {
+        pool.submit(timed_batch, number, [prompt for _, prompt in batch]): (number, batch)
+        for number, batch in enumerate(batches)
+    }
+
+    pending, expired = set(futures), set()
+    while pending:
+        now = time.monotonic()
+        next_deadline = None
+        for future in list(pending):
+            if future.done():
+                pending.discard(future)
+                continue
+            number = futures[future][0]
+            deadline = started.get(number, submitted) + timeout
+            if now < deadline:
+                next_deadline = deadline if next_deadline is None else min(next_deadline, deadline)
+                continue
+            if future.cancel() or number in started:
+                # Still queued (now cancelled) or running past its own deadline:
+                # give up on it; the backend's timeout ends the call itself.
+                pending.discard(future)
+                expired.add(future)
+            else:
+                # Picked up by a worker between the checks; it gets its own deadline.
+                next_deadline = now
+        if pending:
+            done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            pending -= done
+
+    results = {}
+    for future, (_, batch) in futures.items():
+        if future in expired:
+            # Not observed here: a running call is recorded by its own stage_timer
+            # when the backend returns or times out; a cancelled one never ran.
+            outcome = [None] * len(batch)
+        else:
+            try:
+                outcome = future.result()
+            except TimeoutError as e:
+                logger.warning(f"Evaluation backend timed out: {e}")
+                outcome = [None] * len(batch)
+            except Exception as e:
+                logger.error(f"Evaluation backend error: {e}", exc_info=True)
+                outcome = [None] * len(batch)
+        for (question_id, _), result in zip(batch, outcome):
+            results[question_id] = result
+    return results
+
+def _timed_generation(prompt):
+    with stage_timer(LLM_CALL_SECONDS, operation="generate"):
+        return call_llm_for_generation(prompt)
+
+
+def get_question_service(app):
+    """Return the shared bank/cache/generator service, creating it on first use."""
+    service = app.config.get('QUESTION_SERVICE')
+    if service is None:
+        bank_path = app.config.get('INTERVIEW_QUESTION_BANK_PATH', DEFAULT_BANK_PATH)
+        service = QuestionService(
+            generator=_timed_generation,
+            cache=QuestionCache(
+                ttl=float(app.config.get('INTERVIEW_QUESTION_CACHE_TTL') or DEFAULT_TTL),
+                max_entries=int(app.config.get('INTERVIEW_QUESTION_CACHE_SIZE') or DEFAULT_MAX_ENTRIES),
+            ),
+            bank=QuestionBank(bank_path, logger=app.logger),
+        )
+        app.config['QUESTION_SERVICE'] = service
+    return service
+
 # --- Blueprint Setup ---
 interview_eval_bp = Blueprint('interview_eval', __name__, url_prefix='/api')
 
@@ -55,6 +258,12 @@ def generate_questions_route():
     num_behav = data.get('num_behavioral', 2)
     num_sit = data.get('num_situational', 2)
 
+    try:
+        counts = validate_counts((num_tech, num_behav, num_sit))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    num_tech, num_behav, num_sit = counts
+
     # --- Prompt Engineering ---
     prompt = f"""
     Generate a set of interview questions for a '{job_role}' position.
@@ -69,9 +278,9 @@ def generate_questions_route():
     current_app.logger.info(f"Generating questions for role: {job_role}")
     
     try:
-        # Replace this with your actual LLM call
-        questions = call_llm_for_generation(prompt)
-        return jsonify({"questions": questions})
+        # Precomputed bank first, then the cache; the LLM is only called on a miss.
+        questions, source = get_question_service(current_app).get_questions(job_role, context, counts, prompt)
+        return jsonify({"questions": questions, "source": source})
     except Exception as e:
         current_app.logger.error(f"Error during question generation: {e}", exc_info=True)
         return jsonify({"error": "Failed to generate questions due to an internal error."}), 500
@@ -95,7 +304,8 @@ def evaluate_answers_route():
     current_app.logger.info(f"Evaluating {len(q_and_a_list)} answers for role: {job_title}")
 
     try:
-        for item in q_and_a_list:
+        pending = []
+        for index, item in enumerate(q_and_a_list):
             question = item.get("question")
             answer = item.get("answer")
 
@@ -115,10 +325,30 @@ def evaluate_answers_route():
             
             Please evaluate the answer. Provide constructive feedback and a score from 0 to 100.
             """
+            pending.append((index, eval_prompt))
+
+        # Fan out to the evaluation backend with a per-item timeout and a
+        # process-wide concurrency limit.
+        results = evaluate_concurrently(
+            get_evaluation_backend(current_app),
+            _get_eval_pool(current_app),
+            pending,
+            timeout=float(current_app.config.get('INTERVIEW_EVAL_ITEM_TIMEOUT') or DEFAULT_EVAL_ITEM_TIMEOUT),
+            logger=current_app.logger,
+            batch_size=int(current_app.config.get('INTERVIEW_EVAL_BATCH_SIZE') or 1),
+        )
+
+        for index, _ in pending:
+            item = q_and_a_list[index]
+            result = results.get(index)
+            if result is None:
+                detailed_feedback.append({
+                    "question_id": item.get("id"),
+                    "score": 0,
+                    "feedback_text": "This answer could not be evaluated in time. Please try again."
+                })
+                continue
 
-            # Replace this with your actual LLM call
-            result = call_llm_for_evaluation(eval_prompt)
-            
             detailed_feedback.append({
                 "question_id": item.get("id"),
                 "score": result.get("score", 0),
@@ -126,7 +356,9 @@ def evaluate_answers_route():
             })
             total_score += result.get("score", 0)
             evaluated_count += 1
-            
+
+        detailed_feedback.sort(key=lambda f: _question_sort_key(f["question_id"]))
+
         avg_score = (total_score / evaluated_count) if evaluated_count > 0 else 0
 
         # --- Overall Feedback Logic ---
@@ -146,4 +378,9 @@ def evaluate_answers_route():
 
     except Exception as e:
         current_app.logger.error(f"Error during answer evaluation: {e}", exc_info=True)
-        return jsonify({"error": "Failed to evaluate answers due to an internal error."}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to evaluate answers due to an internal error."}), 500
+
+@interview_eval_bp.route('/interview_questions/stats', methods=['GET'])
+def question_stats_route():
+    """Bank/cache hit rate and generator latency for question generation."""
+    return jsonify(get_question_service(current_app).stats())
@@ -0,0 +1,283 @@
+# backend/features/job_store.py
+
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+
+JOB_COLUMNS = [
+    "id", "title", "company", "location", "salary_is_predicted", "description",
+    "redirect_url", "created", "contract_type", "contract_time", "category",
+]
+
+DEFAULT_MAX_AGE = 900          # seconds before a synced page counts as stale
+DEFAULT_SYNC_INTERVAL = 600    # seconds between background sync passes
+DEFAULT_SYNC_PAGES = 5         # max pages walked per tracked search per pass
+DEFAULT_COUNTRY_LOCATIONS = {"in": "india", "us": "usa", "gb": "uk"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    country TEXT NOT NULL,
+    title TEXT, company TEXT, location TEXT, salary_is_predicted,
+    description TEXT, redirect_url TEXT, created TEXT,
+    contract_type TEXT, contract_time TEXT, category TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_country_created ON jobs(country, created DESC);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, company, description, category,
+    content='jobs', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, title, company, description, category)
+    VALUES (new.rowid, new.title, new.company, new.description, new.category);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description, category)
+    VALUES ('delete', old.rowid, old.title, old.company, old.description, old.category);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description, category)
+    VALUES ('delete', old.rowid, old.title, old.company, old.description, old.category);
+    INSERT INTO jobs_fts(rowid, title, company, description, category)
+    VALUES (new.rowid, new.title, new.company, new.description, new.category);
+END;
+
+CREATE TABLE IF NOT EXISTS synced_pages (
+    country TEXT NOT NULL, keywords TEXT NOT NULL, location TEXT NOT NULL, page INTEGER NOT NULL,
+    synced_at REAL NOT NULL, total_results INTEGER NOT NULL, last_requested_at REAL NOT NULL,
+    PRIMARY KEY (country, keywords, location, page)
+);
+
+CREATE TABLE IF NOT EXISTS sync_lease (
+    name TEXT PRIMARY KEY, holder INTEGER NOT NULL, expires_at REAL NOT NULL
+);
+"""
+
+
+def _normalise(value):
+    return " ".join(str(value or "").lower().split())
+
+
+def _sql_value(value):
+    return value if value is None or isinstance(value, (str, int, float)) else str(value)
+
+
+def _fts_query(keywords):
+    """Turn free text into an FTS5 query: every token must match (implicit AND)."""
+    tokens = re.findall(r"\w+", _normalise(keywords))
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+class JobStore:
+    """
+    Local SQLite store of serialized Adzuna jobs with an FTS5 index over
+    title, company, description and category.
+
+    `synced_pages` records when each (country, keywords, location, page) was
+    last pulled from upstream, so callers can decide whether a local answer is
+    fresh enough. One connection is kept per thread; WAL mode lets gunicorn
+    workers read while another process writes.
+    """
+
+    def __init__(self, path, logger=None):
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ---- writes ----
+    def upsert_jobs(self, jobs, country):
+        """Insert or refresh serialized jobs; returns the number of ids not seen before."""
+        if not jobs:
+            return 0
+        now = time.time()
+        conn = self._conn()
+        ids = [str(job.get("id")) for job in jobs if job.get("id") is not None]
+        placeholders = ",".join("?" * len(ids))
+        existing = {
+            row["id"] for row in conn.execute(f"SELECT id FROM jobs WHERE id IN ({placeholders})", ids)
+        } if ids else set()
+
+        rows = []
+        for job in jobs:
+            if job.get("id") is None:
+                continue
+            values = [str(job.get("id"))] + [_sql_value(job.get(col)) for col in JOB_COLUMNS[1:]]
+            rows.append(values + [_normalise(country), now])
+
+        columns = ", ".join(JOB_COLUMNS + ["country", "fetched_at"])
+        updates = ", ".join(f"{col}=excluded.{col}" for col in JOB_COLUMNS[1:] + ["country", "fetched_at"])
+        with conn:
+            conn.executemany(
+                f"INSERT INTO jobs ({columns}) VALUES ({','.join('?' * (len(JOB_COLUMNS) + 2))}) "
+                f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                rows,
+            )
+        return len(set(ids) - existing)
+
+    def mark_synced(self, country, keywords, location, page, total_results):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO synced_pages VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(country, keywords, location, page) DO UPDATE SET "
+                "synced_at=excluded.synced_at, total_results=excluded.total_results, "
+                "last_requested_at=excluded.last_requested_at",
+                (_normalise(country), _normalise(keywords), _normalise(location), int(page),
+                 now, int(total_results or 0), now),
+            )
+
+    # ---- reads ----
+    def synced_page(self, country, keywords, location, page):
+        """Return the sync record for a page (and bump its last_requested_at), or None."""
+        key = (_normalise(country), _normalise(keywords), _normalise(location), int(page))
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT synced_at, total_results FROM synced_pages "
+            "WHERE country=? AND keywords=? AND location=? AND page=?", key,
+        ).fetchone()
+        if row is not None:
+            with conn:
+                conn.execute(
+                    "UPDATE synced_pages SET last_requested_at=? "
+                    "WHERE country=? AND keywords=? AND location=? AND page=?", (time.time(),) + key,
+                )
+        return row
+
+    def search(self, keywords, country, location=None, page=1, per_page=20, sort="date"):
+        """
+        Full-text search over stored jobs. Returns (jobs, local_total).
+        `location` narrows results only when it is not the country's default.
+        """
+        country = _normalise(country)
+        where, params = ["j.country = ?"], [country]
+        match = _fts_query(keywords)
+        join = ""
+        if match:
+            join = "JOIN jobs_fts ON jobs_fts.rowid = j.rowid"
+            where.append("jobs_fts MATCH ?")
+            params.append(match)
+        location = _normalise(location)
+        if location and location != DEFAULT_COUNTRY_LOCATIONS.get(country):
+            where.append("lower(j.location) LIKE ?")
+            params.append(f"%{location}%")
+
+        clause = " AND ".join(where)
+        order = "bm25(jobs_fts)" if (sort == "relevance" and match) else "j.created DESC"
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM jobs j {join} WHERE {clause}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join('j.' + c for c in JOB_COLUMNS)} FROM jobs j {join} "
+            f"WHERE {clause} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [int(per_page), (max(1, int(page)) - 1) * int(per_page)],
+        ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def tracked_searches(self, requested_within):
+        """Distinct searches requested within the last `requested_within` seconds."""
+        cutoff = time.time() - requested_within
+        return self._conn().execute(
+            "SELECT country, keywords, location, MIN(synced_at) AS oldest_sync "
+            "FROM synced_pages WHERE last_requested_at >= ? "
+            "GROUP BY country, keywords, location", (cutoff,),
+        ).fetchall()
+
+    def acquire_lease(self, name, ttl):
+        """Cross-process lease so only one worker runs a sync pass at a time."""
+        now = time.time()
+        with self._conn() as conn:
+            cur = conn.execute(
+                "INSERT INTO sync_lease VALUES (?, ?, ?) ON CONFLICT(name) DO UPDATE SET "
+                "holder=excluded.holder, expires_at=excluded.expires_at WHERE sync_lease.expires_at < ?",
+                (name, os.getpid(), now + ttl, now),
+            )
+            return cur.rowcount > 0
+
+    def stats(self):
+        conn = self._conn()
+        return {
+            "path": self.path,
+            "jobs": conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0],
+            "synced_pages": conn.execute("SELECT COUNT(*) FROM synced_pages").fetchone()[0],
+        }
+
+
+class JobSyncWorker:
+    """
+    Background incremental sync. Every `interval` seconds, for each search
+    requested within the last day, walks pages from 1 (Adzuna sorts by date)
+    and stops at the first page that adds no new job ids.
+    """
+
+    def __init__(self, store, fetch_page, logger=None, interval=DEFAULT_SYNC_INTERVAL, max_pages=DEFAULT_SYNC_PAGES):
+        self.store = store
+        self.fetch_page = fetch_page   # (country, page, keywords, location) -> (serialized_jobs, total, country or None)
+        self.logger = logger or logging.getLogger(__name__)
+        self.interval = interval
+        self.max_pages = max_pages
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        """Start the sync thread once per process (safe after fork)."""
+        if self.interval <= 0:
+            return
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name="job-store-sync", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                if self.store.acquire_lease("job_sync", ttl=self.interval * 0.9):
+                    self.sync_once()
+            except Exception as e:
+                self.logger.error(f"Job store sync failed: {e}", exc_info=True)
+
+    def sync_once(self):
+        synced = 0
+        for search in self.store.tracked_searches(requested_within=86400):
+            if time.time() - search["oldest_sync"] < self.interval:
+                continue
+            for page in range(1, self.max_pages + 1):
+                jobs, total, fetched_country = self.fetch_page(
+                    search["country"], page, search["keywords"], search["location"])
+                if fetched_country is None:
+                    break   # upstream failed; keep the old sync time so the page is retried
+                new_ids = self.store.upsert_jobs(jobs, fetched_country)
+                if fetched_country != search["country"]:
+                    break   # fallback country: its jobs are stored, but this search is not synced
+                self.store.mark_synced(search["country"], search["keywords"], search["location"], page, total)
+                synced += 1
+                if new_ids == 0:
+                    break
+        self.logger.info(f"Job store sync pass refreshed {synced} pages.")
+        return synced
@@ -0,0 +1,288 @@
+# backend/features/job_vector_index.py
+
+import os
+import json
+import fcntl
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_ANN_THRESHOLD = 20000   # switch from exact flat search to IVF above this many vectors
+DEFAULT_NPROBE = 8
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50000
+
+META_FIELDS = ("id", "title", "company", "location", "redirect_url", "created", "category")
+
+
+def job_embedding_text(job):
+    """Text embedded for a job: title plus description."""
+    return f"{job.get('title') or ''}\n{job.get('description') or ''}".strip()
+
+
+class JobVectorIndex:
+    """
+    Append-only index of L2-normalised float32 job embeddings.
+
+    Layout of `directory`:
+        vectors.f32  raw row-major float32 matrix, memory-mapped for search
+        meta.jsonl   one JSON object per row (job id + display fields)
+    Rows are appended under an fcntl lock so several gunicorn workers can
+    feed the same index; each process picks up rows written by others on its
+    next `refresh()`.
+
+    meta.jsonl is the source of truth: a row exists once its metadata line
+    is complete. Vectors are written first, and any rows or partial lines
+    left by a crashed writer are truncated before the next append.
+
+    Search is exact (one matrix-vector product) until the index grows past
+    `ann_threshold`, after which an IVF index (k-means centroids + inverted
+    lists, rebuilt when the index doubles) limits each query to the rows in
+    the `nprobe` nearest clusters. The IVF is built on a background thread
+    and swapped in; until then queries use the previous IVF or exact search.
+    """
+
+    def __init__(self, directory, dim, logger=None, ann_threshold=DEFAULT_ANN_THRESHOLD, nprobe=DEFAULT_NPROBE):
+        self.directory = directory
+        self.dim = int(dim)
+        self.logger = logger or logging.getLogger(__name__)
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.meta_path = os.path.join(directory, "meta.jsonl")
+        self.lock_path = os.path.join(directory, ".lock")
+
+        self._lock = threading.RLock()
+        self._matrix = np.empty((0, self.dim), dtype=np.float32)
+        self._meta = []
+        self._ids = {}
+        self._meta_offset = 0
+        self._ivf = None          # (centroids, lists, built_at_size)
+        self._ivf_thread = None
+        self.refresh()
+
+    # ---- loading ----
+    def refresh(self):
+        """Re-map the vector file and read any metadata rows appended since last time."""
+        with self._lock:
+            if os.path.exists(self.meta_path):
+                with open(self.meta_path, "rb") as fh:
+                    fh.seek(self._meta_offset)
+                    for line in fh:
+                        if not line.endswith(b"\n"):
+                            break  # partially written row; pick it up next time
+                        self._meta_offset += len(line)
+                        meta = json.loads(line)
+                        self._ids[meta["id"]] = len(self._meta)
+                        self._meta.append(meta)
+
+            rows = 0
+            if os.path.exists(self.vectors_path):
+                rows = os.path.getsize(self.vectors_path) // (4 * self.dim)
+            rows = min(rows, len(self._meta))
+            if rows != self._matrix.shape[0]:
+                self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)) \
+                    if rows else np.empty((0, self.dim), dtype=np.float32)
+            return rows
+
+    def __len__(self):
+        return self._matrix.shape[0]
+
+    def contains(self, job_id):
+        return str(job_id) in self._ids
+
+    # ---- writes ----
+    def add(self, jobs, embeddings):
+        """Append jobs not already indexed; returns the number of rows added."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._lock, open(self.lock_path, "a") as lock_fh:
+            fcntl.flock(lock_fh, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                self._truncate_to_meta()
+                new_meta, new_rows, seen = [], [], set()
+                for job, vector in zip(jobs, embeddings):
+                    job_id = str(job.get("id"))
+                    if job.get("id") is None or job_id in self._ids or job_id in seen:
+                        continue
+                    norm = np.linalg.norm(vector)
+                    if norm == 0:
+                        continue
+                    new_rows.append(vector / norm)
+                    new_meta.append({field: job.get(field) for field in META_FIELDS} | {"id": job_id})
+                    seen.add(job_id)
+                if not new_rows:
+                    return 0
+                with open(self.vectors_path, "ab") as fh:
+                    fh.write(np.vstack(new_rows).astype(np.float32).tobytes())
+                with open(self.meta_path, "a", encoding="utf-8") as fh:
+                    fh.write("".join(json.dumps(m) + "\n" for m in new_meta))
+                self.refresh()
+                return len(new_rows)
+            finally:
+                fcntl.flock(lock_fh, fcntl.LOCK_UN)
+
+    def _truncate_to_meta(self):
+        """Drop vector rows and partial metadata lines beyond the last complete row (caller holds the flock)."""
+        if os.path.exists(self.meta_path) and os.path.getsize(self.meta_path) > self._meta_offset:
+            os.truncate(self.meta_path, self._meta_offset)
+        expected = len(self._meta) * self.dim * 4
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) != expected:
+            if os.path.getsize(self.vectors_path) < expected:
+                raise RuntimeError(f"{self.vectors_path} has fewer rows than {self.meta_path}.")
+            self.logger.warning(f"Truncating {self.vectors_path}: rows without metadata from an interrupted write.")
+            os.truncate(self.vectors_path, expected)
+
+    # ---- IVF ----
+    def _build_ivf(self, matrix):
+        """k-means over `matrix` (a snapshot); returns (centroids, lists, built_at_size)."""
+        n = matrix.shape[0]
+        nlist = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(0)
+        sample = matrix[rng.choice(n, size=min(n, KMEANS_SAMPLE), replace=False)]
+        centroids = sample[rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, 8192):
+            assign[start:start + 8192] = np.argmax(matrix[start:start + 8192] @ centroids.T, axis=1)
+        lists = [np.flatnonzero(assign == c) for c in range(nlist)]
+        self.logger.info(f"Built IVF job index: {n} vectors, {nlist} lists.")
+        return centroids, lists, n
+
+    def _schedule_ivf_build(self):
+        """Start a background IVF rebuild unless one is running (caller holds self._lock)."""
+        if self._ivf_thread is not None and self._ivf_thread.is_alive():
+            return
+        matrix = self._matrix
+
+        def build():
+            try:
+                ivf = self._build_ivf(matrix)
+                with self._lock:
+                    self._ivf = ivf
+            except Exception as e:
+                self.logger.error(f"IVF build failed: {e}", exc_info=True)
+
+        self._ivf_thread = threading.Thread(target=build, name="job-ivf-build", daemon=True)
+        self._ivf_thread.start()
+
+    def _ivf_candidates(self, ivf, n, query):
+        """Candidate rows from an IVF snapshot, or None (exact search) while the first one builds."""
+        if ivf is None:
+            return None
+        centroids, lists, built_at = ivf
+        probe = np.argsort(-(centroids @ query))[:self.nprobe]
+        candidates = np.concatenate([lists[c] for c in probe])
+        # Rows appended since the last build are not clustered yet; scan them exactly.
+        if n > built_at:
+            candidates = np.concatenate([candidates, np.arange(built_at, n)])
+        return candidates
+
+    # ---- search ----
+    def search(self, query_vector, top_k=10):
+        """Return [(meta, cosine_score), ...] for the `top_k` nearest jobs."""
+        # Only the snapshot is taken under the lock; scoring runs concurrently with
+        # other queries and with add() (rows are append-only, old mappings stay valid).
+        with self._lock:
+            self.refresh()
+            matrix, meta, ivf = self._matrix, self._meta, self._ivf
+            n = matrix.shape[0]
+            if n > self.ann_threshold and (ivf is None or n >= 2 * ivf[2]):
+                self._schedule_ivf_build()
+        if n == 0 or top_k <= 0:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        query = query / max(np.linalg.norm(query), 1e-12)
+
+        candidates = self._ivf_candidates(ivf, n, query) if n > self.ann_threshold else None
+        if candidates is not None:
+            scores = matrix[candidates] @ query
+        else:
+            scores = matrix @ query
+
+        k = min(top_k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        rows = candidates[top] if candidates is not None else top
+        return [(meta[int(r)], float(scores[t])) for r, t in zip(rows, top)]
+
+    def stats(self):
+        return {
+            "directory": self.directory,
+            "vectors": len(self),
+            "dim": self.dim,
+            "mode": "ivf" if len(self) > self.ann_threshold else "flat",
+            "ivf_lists": len(self._ivf[1]) if self._ivf else 0,
+        }
+
+# -----------------------------
+# App wiring
+# -----------------------------
+_indexer = None
+_indexer_lock = threading.Lock()
+
+
+def get_job_index(app):
+    """Return the shared index, creating it once SBERT is loaded (dim is known)."""
+    index = app.config.get('JOB_VECTOR_INDEX')
+    if index is not None or not app.config.get('JOB_INDEX_DIR') or not app.config.get('SBERT_MODEL_LOADED'):
+        return index
+    with _indexer_lock:
+        index = app.config.get('JOB_VECTOR_INDEX')
+        if index is None:
+            dim = app.config['SBERT_MODEL'].get_sentence_embedding_dimension()
+            index = JobVectorIndex(
+                app.config['JOB_INDEX_DIR'], dim, logger=app.logger,
+                ann_threshold=int(app.config.get('JOB_INDEX_ANN_THRESHOLD') or DEFAULT_ANN_THRESHOLD),
+                nprobe=int(app.config.get('JOB_INDEX_NPROBE') or DEFAULT_NPROBE),
+            )
+            app.config['JOB_VECTOR_INDEX'] = index
+    return index
+
+
+def _index_jobs(app, jobs):
+    from .score_predict import get_background_encoder
+
+    index = get_job_index(app)
+    if index is None:
+        return
+    jobs = [job for job in jobs if job.get("id") is not None and not index.contains(job["id"])]
+    jobs = [job for job in jobs if job_embedding_text(job)]
+    if not jobs:
+        return
+    texts = [job_embedding_text(job) for job in jobs]
+    encoder = get_background_encoder(app)  # bulk indexing must not queue ahead of interactive encodes
+    cache = app.config.get('EMBEDDING_CACHE')
+    embeddings = cache.encode(encoder, texts) if cache is not None else encoder.encode(texts)
+    added = index.add(jobs, embeddings)
+    app.logger.info(f"Indexed {added} new job embeddings ({len(index)} total).")
+
+
+def index_jobs_async(app, jobs):
+    """Embed and index freshly fetched jobs on a single background thread."""
+    global _indexer
+    if not jobs or not app.config.get('JOB_INDEX_DIR') or not app.config.get('SBERT_MODEL_LOADED'):
+        return
+    if _indexer is None:
+        with _indexer_lock:
+            if _indexer is None:
+                _indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-indexer")
+
+    def run():
+        try:
+            _index_jobs(app, jobs)
+        except Exception as e:
+            app.logger.error(f"Job indexing failed: {e}", exc_info=True)
+
+    _indexer.submit(run)
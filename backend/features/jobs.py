@@ -1,11 +1,37 @@
 
 import requests
-import json
-from flask import Blueprint, request, jsonify, current_app
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+
+from .adzuna_client import get_adzuna_client, RESULTS_PER_PAGE
+from .job_vector_index import index_jobs_async
+from .prefetch import prefetch_jobs_async
+from .responses import conditional_json, dumps_bytes
+from .job_store import JobStore, JobSyncWorker, DEFAULT_MAX_AGE, DEFAULT_SYNC_INTERVAL
 
 # Blueprint: all routes here will start with /api
 jobs_bp = Blueprint('jobs', __name__, url_prefix='/api')
 
+MAX_FANOUT_PAGES = 10
+MAX_FANOUT_COUNTRIES = 5
+DEFAULT_FANOUT_WORKERS = 8
+
+_fanout_pool = None
+_fanout_pool_lock = threading.Lock()
+
+
+def _get_fanout_pool(app):
+    """Process-wide bounded pool shared by all fan-out requests."""
+    global _fanout_pool
+    if _fanout_pool is None:
+        with _fanout_pool_lock:
+            if _fanout_pool is None:
+                workers = int(app.config.get('ADZUNA_FANOUT_WORKERS') or DEFAULT_FANOUT_WORKERS)
+                _fanout_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="adzuna-fanout")
+    return _fanout_pool
+
 def _adzuna_job_serializer(job_data):
     """Serialize raw Adzuna job data into a clean JSON-friendly format."""
     return {
@@ -22,79 +48,249 @@ def _adzuna_job_serializer(job_data):
         "category": job_data.get('category', {}).get('label')
     }
 
-def _fetch_adzuna_jobs_internal(app_id, app_key, logger, country_code="in", page=1, keywords="software engineer", location="india"):
-    """Internal helper to fetch jobs from Adzuna API for India."""
-    if not app_id or not app_key:
+def _fetch_adzuna_jobs_internal(client, logger, country_code="in", page=1, keywords="software engineer", location="india"):
+    """
+    Internal helper to fetch jobs from Adzuna API for India.
+    Returns (jobs, total_results, country) where country is the one actually
+    served (India falls back to US) or None if the upstream call failed.
+    """
+    if not client.configured:
         logger.error("Error: ADZUNA_APP_ID and ADZUNA_APP_KEY must be provided.")
-        return [], 0
-
-    BASE_URL = "https://api.adzuna.com/v1/api/jobs"
-    url = f"{BASE_URL}/{country_code}/search/{page}"
-
-    search_params = {
-        "app_id": app_id,
-        "app_key": app_key,
-        "results_per_page": 20,
-        "what": keywords,
-        "where": location,
-        "sort_by": "date",
-        "content-type": "application/json"
-    }
-
-    logger.info(f"Fetching Adzuna jobs from: {url} with params: {search_params}")
+        return [], 0, None
 
     try:
-        response = requests.get(url, params=search_params)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("results", []), data.get("count", 0)
+        jobs, total = client.search(country_code=country_code, page=page, keywords=keywords, location=location)
+        return jobs, total, country_code
 
     except requests.exceptions.HTTPError as http_err:
         logger.warning(f"Adzuna India request failed ({http_err}). Trying fallback to US...")
         # fallback: use US data if India fails (Adzuna India sometimes unavailable on free plan)
         if country_code == "in":
-            return _fetch_adzuna_jobs_internal(app_id, app_key, logger, country_code="us", page=page, keywords=keywords, location="usa")
-        return [], 0
+            return _fetch_adzuna_jobs_internal(client, logger, country_code="us", page=page, keywords=keywords, location="usa")
+        return [], 0, None
+
+    except requests.exceptions.Timeout as timeout_err:
+        logger.warning(f"Adzuna request timed out ({timeout_err}).")
+        return [], 0, None
 
     except Exception as e:
         logger.error(f"Unexpected error fetching jobs: {e}", exc_info=True)
-        return [], 0
+        return [], 0, None
+
+
+def init_job_store(app):
+    """
+    Open the local job store (if JOB_STORE_PATH is set) and its background
+    sync worker, and keep both in app config.
+    """
+    path = app.config.get('JOB_STORE_PATH')
+    if not path:
+        return None
+    try:
+        store = JobStore(path, logger=app.logger)
+    except Exception as e:
+        app.logger.error(f"Local job store disabled (could not open {path}): {e}", exc_info=True)
+        return None
+
+    client = get_adzuna_client(app)
+
+    def fetch_page(country, page, keywords, location):
+        jobs_data_raw, total, fetched_country = _fetch_adzuna_jobs_internal(
+            client, app.logger, country_code=country, page=page, keywords=keywords, location=location
+        )
+        return [_adzuna_job_serializer(job) for job in jobs_data_raw], total, fetched_country
+
+    app.config['JOB_STORE'] = store
+    app.config['JOB_SYNC_WORKER'] = JobSyncWorker(
+        store, fetch_page, logger=app.logger,
+        interval=float(app.config.get('JOB_SYNC_INTERVAL') or DEFAULT_SYNC_INTERVAL),
+    )
+    app.logger.info(f"✅ Local job store at {path}")
+    return store
+
+
+def _answer_from_store(store, country, keywords, location, page, sort, synced):
+    jobs, local_total = store.search(keywords, country, location, page=page, per_page=RESULTS_PER_PAGE, sort=sort)
+    prefetch_jobs_async(current_app._get_current_object(), jobs)
+    return conditional_json({
+        "country": country,
+        "total_results": max(synced["total_results"], local_total),
+        "jobs": jobs,
+        "source": "local"
+    })
 
 
 @jobs_bp.route('/fetch_jobs', methods=['GET'])
 def fetch_jobs_route_handler():
-    """Route to fetch Adzuna India jobs, with automatic fallback to US."""
+    """
+    Route to fetch Adzuna India jobs, with automatic fallback to US.
+    With a local job store configured, recently synced pages are answered
+    from its full-text index (`sort=relevance` ranks by BM25).
+    """
     try:
         keywords = request.args.get('keywords', "software engineer")
         location = request.args.get('location', "india")
         page = request.args.get('page', 1, type=int)
         country = request.args.get('country', 'in')
 
-        # Load credentials from Flask config
-        app_id = current_app.config.get('ADZUNA_API_ID')
-        app_key = current_app.config.get('ADZUNA_API_KEY')
+        # Shared, pooled client built from Flask config
+        client = get_adzuna_client(current_app)
 
-        if not app_id or not app_key:
+        if not client.configured:
             current_app.logger.error("Adzuna API keys not configured. Please set ADZUNA_APP_ID and ADZUNA_APP_KEY in .env")
             return jsonify({"error": "Adzuna API keys not configured. Please contact the administrator."}), 500
 
+        # Answer from the local index when this page was synced recently
+        store = current_app.config.get('JOB_STORE')
+        synced = None
+        sort = request.args.get('sort', 'date')
+        if store is not None:
+            current_app.config['JOB_SYNC_WORKER'].ensure_running()
+            synced = store.synced_page(country, keywords, location, page)
+            max_age = float(current_app.config.get('JOB_STORE_MAX_AGE') or DEFAULT_MAX_AGE)
+            if synced is not None and time.time() - synced["synced_at"] <= max_age:
+                return _answer_from_store(store, country, keywords, location, page, sort, synced)
+
         current_app.logger.info(f"Fetching Adzuna jobs for country={country}, location={location}, page={page}")
 
         # Fetch job data
-        jobs_data_raw, total_results = _fetch_adzuna_jobs_internal(
-            app_id, app_key, current_app.logger,
+        jobs_data_raw, total_results, fetched_country = _fetch_adzuna_jobs_internal(
+            client, current_app.logger,
             country_code=country, page=page, keywords=keywords, location=location
         )
 
         serialized_jobs = [_adzuna_job_serializer(job) for job in jobs_data_raw]
+        index_jobs_async(current_app._get_current_object(), serialized_jobs)
+        prefetch_jobs_async(current_app._get_current_object(), serialized_jobs)
+
+        if store is not None:
+            if serialized_jobs:
+                # Store under the country actually served; a US fallback page
+                # does not count as a sync of the Indian search.
+                store.upsert_jobs(serialized_jobs, fetched_country)
+                if fetched_country == country:
+                    store.mark_synced(country, keywords, location, page, total_results)
+            elif synced is not None:
+                # Upstream failed or returned nothing: serve what we have locally.
+                return _answer_from_store(store, country, keywords, location, page, sort, synced)
 
-        return jsonify({
-            "country": country,
+        return conditional_json({
+            "country": fetched_country or country,
             "total_results": total_results,
-            "jobs": serialized_jobs
-        }), 200
+            "jobs": serialized_jobs,
+            "source": "upstream"
+        })
 
     except Exception as e:
         current_app.logger.error(f"Error in /fetch_jobs: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
+
+@jobs_bp.route('/fetch_jobs/cache_stats', methods=['GET'])
+def fetch_jobs_cache_stats_route_handler():
+    """GET /api/fetch_jobs/cache_stats - Adzuna client cache and coalescing counters."""
+    return jsonify(get_adzuna_client(current_app).cache_stats()), 200
+
+
+@jobs_bp.route('/fetch_jobs_stream', methods=['GET'])
+def fetch_jobs_stream_route_handler():
+    """
+    GET /api/fetch_jobs_stream
+    Query params:
+        - keywords, location: as for /api/fetch_jobs
+        - pages: number of pages to fetch (default 3, max 10)
+        - start_page: first page (default 1)
+        - countries: comma-separated country codes (default "in")
+    Fetches every (country, page) pair concurrently on a bounded pool and
+    streams newline-delimited JSON as each page arrives:
+        {"type": "job", "country": "in", "page": 2, "job": {...}}
+        ...
+        {"type": "done", "jobs": 57, "duplicates": 3, "failed_pages": 0, "total_results": {...}}
+    Jobs are de-duplicated by id across pages and countries. The location
+    filter applies to the first country only; other countries search nationwide.
+    """
+    keywords = request.args.get('keywords', "software engineer")
+    location = request.args.get('location', "india")
+    pages = max(1, min(request.args.get('pages', 3, type=int), MAX_FANOUT_PAGES))
+    start_page = max(1, request.args.get('start_page', 1, type=int))
+    countries = [c.strip().lower() for c in request.args.get('countries', 'in').split(',') if c.strip()]
+    countries = list(dict.fromkeys(countries))[:MAX_FANOUT_COUNTRIES] or ['in']
+
+    client = get_adzuna_client(current_app)
+    if not client.configured:
+        current_app.logger.error("Adzuna API keys not configured. Please set ADZUNA_APP_ID and ADZUNA_APP_KEY in .env")
+        return jsonify({"error": "Adzuna API keys not configured. Please contact the administrator."}), 500
+
+    app = current_app._get_current_object()
+    logger = current_app.logger
+    pool = _get_fanout_pool(current_app)
+    tasks = [
+        (country, page, location if i == 0 else "")
+        for i, country in enumerate(countries)
+        for page in range(start_page, start_page + pages)
+    ]
+    current_app.logger.info(f"Fan-out fetch of {len(tasks)} Adzuna pages for countries={countries}")
+
+    def generate():
+        futures = {
+            pool.submit(_fetch_adzuna_jobs_internal, client, logger,
+                        country_code=country, page=page, keywords=keywords, location=where): (country, page)
+            for country, page, where in tasks
+        }
+        seen_ids = set()
+        emitted = duplicates = failed = 0
+        totals = {}
+        try:
+            for future in as_completed(futures):
+                country, page = futures[future]
+                try:
+                    jobs_data_raw, total_results, fetched_country = future.result()
+                except Exception as e:
+                    logger.error(f"Fan-out page {country}/{page} failed: {e}")
+                    failed += 1
+                    continue
+                if fetched_country is None:
+                    # The helper logs and swallows upstream errors and timeouts.
+                    failed += 1
+                    continue
+                totals[country] = max(totals.get(country, 0), total_results)
+
+                lines, fresh_jobs = [], []
+                for job in jobs_data_raw:
+                    serialized = _adzuna_job_serializer(job)
+                    job_id = serialized.get("id")
+                    if job_id is not None and job_id in seen_ids:
+                        duplicates += 1
+                        continue
+                    seen_ids.add(job_id)
+                    fresh_jobs.append(serialized)
+                    lines.append(dumps_bytes({"type": "job", "country": fetched_country or country, "page": page,
+                                               "job": serialized}))
+                emitted += len(lines)
+                index_jobs_async(app, fresh_jobs)
+                prefetch_jobs_async(app, fresh_jobs)
+                if lines:
+                    yield b"\n".join(lines) + b"\n"
+
+            yield dumps_bytes({
+                "type": "done",
+                "jobs": emitted,
+                "duplicates": duplicates,
+                "failed_pages": failed,
+                "total_results": totals
+            }) + b"\n"
+        finally:
+            # Client went away (or we finished): drop pages nobody will read.
+            for future in futures:
+                future.cancel()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@jobs_bp.route('/job_store/stats', methods=['GET'])
+def job_store_stats_route_handler():
+    """GET /api/job_store/stats - row counts for the local job store."""
+    store = current_app.config.get('JOB_STORE')
+    if store is None:
+        return jsonify({"error": "Local job store not configured."}), 503
+    return jsonify(store.stats()), 200
@@ -0,0 +1,557 @@
+# backend/features/metrics.py
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import threading
+from collections import Counter as _Tally
+from contextlib import contextmanager
+
+# Seconds; covers cache hits (sub-ms) through slow upstream/LLM calls.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+DEFAULT_PROFILE_INTERVAL = 0.005   # seconds between stack samples
+PROFILE_MAX_STACK_DEPTH = 64
+DEFAULT_MULTIPROC_FLUSH_INTERVAL = 5.0   # seconds between a worker's snapshot writes
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# -----------------------------
+# Metric types
+# -----------------------------
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+    def samples(self):
+        """[(label values, value), ...] copied under the lock, for snapshots."""
+        with self._lock:
+            return [(list(key), self._copy_value(value)) for key, value in self._values.items()]
+
+    def _copy_value(self, value):
+        return value
+
+    def merge_sample(self, key, value):
+        """Fold another process's sample for `key` into this metric."""
+        with self._lock:
+            self._values[tuple(key)] = self._values.get(tuple(key), 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the `with` block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _copy_value(self, state):
+        return [list(state[0]), state[1], state[2]]
+
+    def merge_sample(self, key, state):
+        counts, total, count = state
+        if len(counts) != len(self.buckets):
+            return  # written by a build with other buckets
+        with self._lock:
+            current = self._values.get(tuple(key))
+            if current is None:
+                current = self._values[tuple(key)] = [[0] * len(self.buckets), 0.0, 0]
+            current[0] = [a + b for a, b in zip(current[0], counts)]
+            current[1] += total
+            current[2] += count
+
+    def _render_sample(self, key, state):
+        counts, total, count = state
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(float(total))}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-local collection of metrics rendered in the Prometheus text format.
+
+    Metrics are created on first use and shared afterwards, so library code
+    can declare them at import time. Each gunicorn worker keeps its own
+    values; see MultiprocessCollector for a view across workers.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels.")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self, kinds=("counter", "histogram")):
+        """Drop the samples of every metric of the given kinds (definitions stay)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            if metric.kind in kinds:
+                metric.reset()
+
+    def snapshot(self, kinds=None):
+        """JSON-serialisable copy of every metric's definition and samples."""
+        with self._lock:
+            metrics = [m for m in self._metrics.values() if kinds is None or m.kind in kinds]
+        return {
+            metric.name: {
+                "kind": metric.kind,
+                "documentation": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", ())),
+                "samples": metric.samples(),
+            }
+            for metric in metrics
+        }
+
+
+METRICS = MetricsRegistry()
+
+
+# -----------------------------
+# Multi-process aggregation
+# -----------------------------
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MultiprocessCollector:
+    """
+    Aggregates METRICS across gunicorn workers through a shared directory.
+
+    Each worker writes a snapshot of its registry to
+    `<directory>/metrics-<pid>-<token>.json` every `interval` seconds (and on
+    every scrape it serves), so whichever worker answers /metrics can merge
+    all of them: counters and histograms are summed, gauges are reported per
+    worker with a `pid` label. The token is drawn per process, so a worker
+    that reuses an exited worker's pid never overwrites its file. Snapshots
+    of exited workers keep contributing their counters and histograms (so
+    totals never go backwards) but their gauges are dropped, as are gauges
+    not refreshed for a few intervals. Other workers' values are at most
+    `interval` seconds old. Clear the directory when the server starts
+    (gunicorn.conf.py does).
+
+    With a preloaded app, counts recorded in the master before fork would be
+    inherited by every worker; gunicorn.conf.py writes them once as the
+    master's snapshot and resets each worker's counters after fork.
+    """
+
+    def __init__(self, directory, registry=None, interval=DEFAULT_MULTIPROC_FLUSH_INTERVAL, logger=None):
+        self.directory = directory
+        self.registry = registry or METRICS
+        self.interval = max(0.5, float(interval))
+        self.logger = logger or logging.getLogger(__name__)
+        self._thread = None
+        self._pid = None
+        self._token = None
+        self._token_pid = None
+        self._start_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self):
+        pid = os.getpid()
+        if self._token_pid != pid:
+            self._token_pid, self._token = pid, os.urandom(4).hex()
+        return os.path.join(self.directory, f"metrics-{pid}-{self._token}.json")
+
+    def ensure_flusher(self):
+        """Start this process's snapshot thread on first use (safe after fork)."""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.write()
+            except OSError as e:
+                self.logger.warning(f"Writing metrics snapshot failed: {e}")
+
+    def write(self, kinds=None):
+        """Atomically replace this process's snapshot file."""
+        path = self._path()
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.registry.snapshot(kinds), fh, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def _snapshots(self):
+        for name in os.listdir(self.directory):
+            if not (name.startswith("metrics-") and name.endswith(".json")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                pid = int(name[len("metrics-"):-len(".json")].split("-")[0])
+                mtime = os.path.getmtime(path)
+                with open(path, encoding="utf-8") as fh:
+                    yield pid, mtime, json.load(fh)
+            except (ValueError, OSError) as e:
+                self.logger.warning(f"Skipping metrics snapshot {name}: {e}")
+
+    def collect(self):
+        """A registry holding the merged metrics of every worker."""
+        self.write()
+        merged = MetricsRegistry()
+        stale_before = time.time() - 3 * self.interval
+        for pid, mtime, snapshot in self._snapshots():
+            alive = mtime >= stale_before and _pid_alive(pid)
+            for name, data in snapshot.items():
+                labelnames = tuple(data["labelnames"])
+                try:
+                    if data["kind"] == "counter":
+                        metric = merged.counter(name, data["documentation"], labelnames)
+                    elif data["kind"] == "histogram":
+                        metric = merged.histogram(name, data["documentation"], labelnames, buckets=data["buckets"])
+                    elif alive:
+                        per_worker = "pid" not in labelnames
+                        metric = merged.gauge(name, data["documentation"], labelnames + (("pid",) if per_worker else ()))
+                        for key, value in data["samples"]:
+                            metric.merge_sample(key + [str(pid)] if per_worker else key, value)
+                        continue
+                    else:
+                        continue
+                except ValueError as e:
+                    self.logger.warning(f"Skipping metric {name} from worker {pid}: {e}")
+                    continue
+                for key, value in data["samples"]:
+                    metric.merge_sample(key, value)
+        return merged
+
+    def render(self):
+        return self.collect().render()
+
+
+_collector = None
+
+
+def flush_worker_metrics():
+    """Write this worker's final snapshot (gunicorn worker_exit hook); no-op without a collector."""
+    if _collector is not None:
+        try:
+            _collector.write()
+        except OSError:
+            pass
+
+
+def write_master_metrics():
+    """
+    Write the counts recorded in the master so far as its own snapshot
+    (gunicorn pre_fork hook, preload only). Gauges are left out: they
+    describe the workers. No-op without a collector.
+    """
+    if _collector is not None:
+        try:
+            _collector.write(kinds=("counter", "histogram"))
+        except OSError:
+            pass
+
+
+def reset_worker_metrics():
+    """
+    Zero the counters and histograms a worker inherited from the master
+    (gunicorn post_fork hook, preload only), which write_master_metrics
+    already reported once. No-op without a collector.
+    """
+    if _collector is not None:
+        _collector.registry.reset()
+
+# -----------------------------
+# Shared stage metrics
+# -----------------------------
+HTTP_REQUESTS_IN_FLIGHT = METRICS.gauge(
+    "http_requests_in_flight", "Requests currently being served.", ["endpoint"])
+HTTP_REQUEST_SECONDS = METRICS.histogram(
+    "http_request_duration_seconds", "Request latency by endpoint.", ["endpoint", "method", "status"])
+ADZUNA_UPSTREAM_SECONDS = METRICS.histogram(
+    "adzuna_upstream_seconds", "Adzuna API call latency.", ["country", "status"])
+ADZUNA_CACHE_LOOKUPS = METRICS.counter(
+    "adzuna_cache_lookups_total", "Adzuna client cache lookups by result.", ["result"])
+PDF_EXTRACT_SECONDS = METRICS.histogram(
+    "pdf_extract_seconds", "Resume PDF text extraction latency.", ["outcome"])
+SBERT_ENCODE_SECONDS = METRICS.histogram(
+    "sbert_encode_seconds", "SBERT forward pass latency per batch.", ["path"])
+SBERT_BATCH_SIZE = METRICS.histogram(
+    "sbert_encode_batch_size", "Texts per SBERT forward pass.", ["path"], buckets=SIZE_BUCKETS)
+EMBEDDING_CACHE_LOOKUPS = METRICS.counter(
+    "embedding_cache_lookups_total", "Embedding cache lookups by result.", ["result"])
+COURSE_SEARCH_SECONDS = METRICS.histogram(
+    "course_search_seconds", "Course recommendation stage latency.", ["stage"])
+LLM_CALL_SECONDS = METRICS.histogram(
+    "llm_call_seconds", "Interview evaluation/generation backend latency.", ["operation", "outcome"])
+
+
+@contextmanager
+def stage_timer(histogram, **labels):
+    """
+    Time a block into `histogram`; an `outcome` label, if the histogram has
+    one and it is not given, is set to "ok", "timeout" (TimeoutError) or "error".
+    """
+    if "outcome" in histogram.labelnames and "outcome" not in labels:
+        start = time.perf_counter()
+        try:
+            yield
+        except TimeoutError:
+            histogram.observe(time.perf_counter() - start, outcome="timeout", **labels)
+            raise
+        except BaseException:
+            histogram.observe(time.perf_counter() - start, outcome="error", **labels)
+            raise
+        histogram.observe(time.perf_counter() - start, outcome="ok", **labels)
+    else:
+        with histogram.time(**labels):
+            yield
+
+
+# -----------------------------
+# Sampling profiler
+# -----------------------------
+class StackSampler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a helper
+    thread, tallying collapsed stacks ("mod:func;mod:func" -> count) that can
+    be fed to flamegraph tools.
+    """
+
+    def __init__(self, thread_id, interval=DEFAULT_PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = _Tally()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < PROFILE_MAX_STACK_DEPTH:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+
+# -----------------------------
+# Flask wiring
+# -----------------------------
+def init_metrics(app):
+    """
+    Track in-flight requests and latency for every endpoint, serve /metrics,
+    and (if PROFILE_SAMPLE_RATE > 0) stack-sample a fraction of requests,
+    logging the hottest stacks of those slower than PROFILE_SLOW_MS.
+
+    With METRICS_MULTIPROC_DIR set, /metrics merges every worker's metrics
+    through that directory (see MultiprocessCollector); without it, /metrics
+    shows only the worker that answered, identified by `process_info{pid}`.
+    """
+    global _collector
+    from flask import Response, g, request
+
+    logger = app.logger or logging.getLogger(__name__)
+    sample_rate = float(app.config.get('PROFILE_SAMPLE_RATE') or 0)
+    slow_seconds = float(app.config.get('PROFILE_SLOW_MS', 1000)) / 1000.0
+    profile_dir = app.config.get('PROFILE_DIR')
+    process_info = METRICS.gauge("process_info", "Worker process identity.", ["pid"])
+    collector = None
+    if app.config.get('METRICS_MULTIPROC_DIR'):
+        collector = _collector = MultiprocessCollector(
+            app.config['METRICS_MULTIPROC_DIR'],
+            interval=float(app.config.get('METRICS_FLUSH_INTERVAL') or DEFAULT_MULTIPROC_FLUSH_INTERVAL),
+            logger=logger,
+        )
+
+    @app.before_request
+    def _start_request_metrics():
+        if collector is not None:
+            collector.ensure_flusher()
+        g.metrics_endpoint = request.endpoint or "unmatched"
+        g.metrics_started = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc(endpoint=g.metrics_endpoint)
+        g.metrics_sampler = None
+        if sample_rate > 0 and random.random() < sample_rate:
+            g.metrics_sampler = StackSampler(threading.get_ident()).start()
+
+    @app.teardown_request
+    def _finish_request_metrics(error=None):
+        endpoint = g.pop("metrics_endpoint", None)
+        if endpoint is None:
+            return
+        elapsed = time.perf_counter() - g.pop("metrics_started")
+        HTTP_REQUESTS_IN_FLIGHT.dec(endpoint=endpoint)
+        status = g.pop("metrics_status", 500 if error is not None else 200)
+        HTTP_REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method, status=status)
+
+        sampler = g.pop("metrics_sampler", None)
+        if sampler is not None:
+            stacks = sampler.stop()
+            if elapsed >= slow_seconds and stacks:
+                _report_slow_request(logger, profile_dir, endpoint, elapsed, stacks)
+
+    @app.after_request
+    def _record_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus text exposition of this worker's metrics, or of all workers' merged."""
+        # Set here rather than at start-up: with preload, init runs in the gunicorn master.
+        process_info.set(1, pid=os.getpid())
+        body = collector.render() if collector is not None else METRICS.render()
+        return Response(body, mimetype="text/plain; version=0.0.4")
+
+    return METRICS
+
+
+def _report_slow_request(logger, profile_dir, endpoint, elapsed, stacks):
+    top = stacks.most_common(5)
+    summary = "; ".join(f"{count}x {stack.rsplit(';', 3)[-1]}" for stack, count in top)
+    logger.warning(f"Slow request {endpoint} took {elapsed * 1000:.0f} ms; hottest stacks: {summary}")
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"{endpoint}-{int(time.time() * 1000)}-{os.getpid()}.folded")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.writelines(f"{stack} {count}\n" for stack, count in stacks.items())
@@ -0,0 +1,192 @@
+# backend/features/model_registry.py
+
+import os
+import time
+import logging
+import threading
+
+DEFAULT_RETRY_COOLDOWN = 60.0   # seconds before a failed loader is run again
+
+# -----------------------------
+# Memory helpers
+# -----------------------------
+def current_rss_bytes():
+    """Return the resident set size of this process in bytes (0 if unknown)."""
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm") as fh:
+            resident_pages = int(fh.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+# -----------------------------
+# Registry
+# -----------------------------
+class ModelRegistry:
+    """
+    Loads heavy model artifacts once per process and hands out shared references.
+
+    Each entry is registered with a zero-argument loader. The loader runs at most
+    once (guarded by a per-entry lock); later calls to `get()` return the cached
+    object. A failed loader is retried at most every `retry_cooldown` seconds,
+    and the entry keeps reporting `failed` while the retry runs. Load time and
+    the RSS delta observed around the load are recorded so they can be
+    inspected through `stats()`.
+    """
+
+    def __init__(self, logger=None, retry_cooldown=DEFAULT_RETRY_COOLDOWN):
+        self.logger = logger or logging.getLogger(__name__)
+        self.retry_cooldown = retry_cooldown
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """Register a loader under `name`. Re-registering replaces the entry."""
+        with self._lock:
+            self._entries[name] = {
+                "loader": loader,
+                "lock": threading.Lock(),
+                "state": "pending",
+                "value": None,
+                "error": None,
+                "load_seconds": None,
+                "rss_delta_bytes": None,
+                "loaded_at": None,
+                "failed_at": None,
+            }
+
+    def load(self, name, wait=True):
+        """
+        Run the loader for `name` if it has not run yet and return its value.
+        With `wait=False`, returns None immediately if another thread (e.g.
+        the background warm-up) is currently loading it.
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"No model registered under '{name}'.")
+
+        if entry["state"] == "ready":
+            return entry["value"]
+        if self._cooling_down(entry):
+            return None
+
+        if not entry["lock"].acquire(blocking=wait):
+            return None
+        try:
+            if entry["state"] == "ready":
+                return entry["value"]
+            if self._cooling_down(entry):
+                return None
+
+            if entry["state"] != "failed":
+                entry["state"] = "loading"   # a retry keeps reporting failed until it succeeds
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            try:
+                value = entry["loader"]()
+            except Exception as e:
+                first_failure = entry["error"] is None
+                entry["state"] = "failed"
+                entry["error"] = str(e)
+                entry["failed_at"] = time.monotonic()
+                self.logger.error(f"Failed to load model '{name}': {e}", exc_info=first_failure)
+                return None
+
+            entry["load_seconds"] = round(time.perf_counter() - start, 4)
+            entry["rss_delta_bytes"] = current_rss_bytes() - rss_before
+            entry["loaded_at"] = time.time()
+            entry["value"] = value
+            entry["error"] = None
+            entry["state"] = "ready" if value is not None else "failed"
+            entry["failed_at"] = time.monotonic() if value is None else None
+            self.logger.info(
+                f"Model '{name}' {entry['state']} in {entry['load_seconds']}s "
+                f"(RSS delta {entry['rss_delta_bytes'] / 1e6:.1f} MB)."
+            )
+            return value
+        finally:
+            entry["lock"].release()
+
+    def _cooling_down(self, entry):
+        return entry["state"] == "failed" and entry["failed_at"] is not None \
+            and time.monotonic() - entry["failed_at"] < self.retry_cooldown
+
+    def swap(self, name, value):
+        """
+        Replace the value served under `name` (e.g. a newly built index version)
+        and return the previous one. Callers already holding the old value keep
+        using it until they drop their reference.
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"No model registered under '{name}'.")
+        with entry["lock"]:
+            previous = entry["value"]
+            entry["value"] = value
+            entry["error"] = None
+            entry["failed_at"] = None
+            entry["loaded_at"] = time.time()
+            entry["state"] = "ready"
+        return previous
+
+    def get(self, name, wait=True):
+        """Return the loaded value for `name`, loading it on first use."""
+        return self.load(name, wait=wait)
+
+    def state(self, name):
+        entry = self._entries.get(name)
+        return entry["state"] if entry else None
+
+    def load_all(self):
+        """Eagerly load every registered entry."""
+        for name in list(self._entries):
+            self.load(name)
+
+    def warm_up_async(self):
+        """Load every registered entry on a background daemon thread."""
+        thread = threading.Thread(target=self.load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self):
+        """True once no entry is still pending or loading (failed entries count as settled)."""
+        return all(entry["state"] in ("ready", "failed") for entry in self._entries.values())
+
+    def stats(self):
+        """Return a JSON-friendly snapshot of every entry plus process RSS."""
+        return {
+            "process_rss_bytes": current_rss_bytes(),
+            "models": {
+                name: {
+                    "state": entry["state"],
+                    "error": entry["error"],
+                    "load_seconds": entry["load_seconds"],
+                    "rss_delta_bytes": entry["rss_delta_bytes"],
+                    "loaded_at": entry["loaded_at"],
+                }
+                for name, entry in self._entries.items()
+            },
+        }
+
+
+def init_model_registry(app):
+    """Create the per-process registry and store it in app config."""
+    registry = ModelRegistry(
+        app.logger,
+        retry_cooldown=float(app.config.get('MODEL_RETRY_COOLDOWN', DEFAULT_RETRY_COOLDOWN)),
+    )
+    app.config['MODEL_REGISTRY'] = registry
+    return registry
+
+
+def get_registry(app):
+    """Return the registry stored on `app`, creating it if needed."""
+    registry = app.config.get('MODEL_REGISTRY')
+    if registry is None:
+        registry = init_model_registry(app)
+    return registry
@@ -0,0 +1,248 @@
+# backend/features/pdf_extract.py
+
+import io
+import os
+import time
+import hashlib
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+
+from .metrics import PDF_EXTRACT_SECONDS
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_MAX_PAGES = 20
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_WORKERS = 2
+DEFAULT_CACHE_ENTRIES = 256
+DEFAULT_MAX_TASKS_PER_WORKER = 200   # recycle parsers so PyPDF2 garbage can't pile up
+
+
+class PdfExtractionError(ValueError):
+    """Raised when a PDF is rejected or cannot be parsed."""
+
+    def __init__(self, message, outcome="error"):
+        super().__init__(message)
+        self.outcome = outcome
+
+
+def extract_pages(data, max_pages=DEFAULT_MAX_PAGES):
+    """
+    Extract text from the first `max_pages` pages of PDF bytes.
+    Each page is parsed exactly once. Returns (text, pages_read, total_pages).
+    """
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    total_pages = len(reader.pages)
+    parts = []
+    for i in range(min(total_pages, max_pages)):
+        text = reader.pages[i].extract_text()
+        if text:
+            parts.append(text)
+    return "\n".join(parts).strip(), min(total_pages, max_pages), total_pages
+
+
+def _parser_main(conn):
+    """Worker-process loop: receive (data, max_pages), send back ("ok", result) or ("error", message)."""
+    while True:
+        try:
+            data, max_pages = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            result = ("ok", extract_pages(data, max_pages))
+        except Exception as e:
+            result = ("error", f"{type(e).__name__}: {e}")
+        conn.send(result)
+
+
+class _ParserProcess:
+    """One persistent parser process and the parent's end of its pipe."""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_parser_main, args=(child,), name="pdf-extract", daemon=True)
+        self.process.start()
+        child.close()
+        self.pid = os.getpid()      # owning process; workers are not shared across fork
+        self.tasks = 0
+
+    def stop(self):
+        self.conn.close()
+        self.process.terminate()
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class PdfTextExtractor:
+    """
+    Bounded, cached resume text extraction.
+
+    - Uploads over `max_bytes` are rejected before parsing; only the first
+      `max_pages` pages are read.
+    - Uploads are parsed in a small pool of persistent parser processes,
+      at most `workers` at once, so a pathological PDF cannot hold the GIL
+      or a request thread past `timeout` seconds. The timeout starts when the
+      parse starts (not while waiting for a slot); a parser that times out
+      or dies is killed and replaced on its own, never affecting other
+      uploads, and each parser is recycled after `max_tasks` parses.
+    - Text is cached by the SHA-256 of the uploaded bytes, so re-uploading
+      the same resume skips parsing entirely.
+    With `workers=0` extraction runs inline (no child process, no timeout).
+    """
+
+    def __init__(self, logger=None, max_bytes=DEFAULT_MAX_BYTES, max_pages=DEFAULT_MAX_PAGES,
+                 timeout=DEFAULT_TIMEOUT, workers=DEFAULT_WORKERS, cache_entries=DEFAULT_CACHE_ENTRIES,
+                 max_tasks=DEFAULT_MAX_TASKS_PER_WORKER):
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.workers = workers
+        self.cache_entries = cache_entries
+        self.max_tasks = max_tasks
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, workers))
+        self._context = None
+        self._idle = []                 # parked _ParserProcess instances
+        self.stats = {"cache_hits": 0, "cache_misses": 0, "timeouts": 0, "rejected": 0}
+
+    # ---- isolated parsing ----
+    def _get_context(self):
+        with self._lock:
+            if self._context is None:
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    self._context = multiprocessing.get_context("forkserver")
+                    # The default preload is __main__, which under `python app.py` would
+                    # build the whole app (and start model warm-up) inside the forkserver.
+                    self._context.set_forkserver_preload(["features.pdf_extract", "PyPDF2"])
+                else:
+                    self._context = multiprocessing.get_context("spawn")
+            return self._context
+
+    def _checkout(self):
+        """An idle parser owned by this process, or a new one."""
+        with self._lock:
+            while self._idle:
+                parser = self._idle.pop()
+                if parser.pid == os.getpid() and parser.process.is_alive():
+                    return parser
+                if parser.pid == os.getpid():
+                    parser.stop()
+                # else: inherited across fork; the parent still owns it
+        return _ParserProcess(self._get_context())
+
+    def _checkin(self, parser):
+        if parser.tasks >= self.max_tasks:
+            parser.stop()
+            return
+        with self._lock:
+            self._idle.append(parser)
+
+    def _extract_isolated(self, data):
+        """Parse `data` in a pooled parser process; returns extract_pages' result."""
+        with self._slots:
+            parser = self._checkout()
+            healthy = False
+            try:
+                parser.conn.send((data, self.max_pages))
+                parser.tasks += 1
+                if not parser.conn.poll(self.timeout):
+                    with self._lock:
+                        self.stats["timeouts"] += 1
+                    raise PdfExtractionError(f"PDF extraction timed out after {self.timeout}s.", outcome="timeout")
+                try:
+                    status, payload = parser.conn.recv()
+                except EOFError:
+                    raise PdfExtractionError("PDF parser exited unexpectedly.")
+                healthy = True
+            except (BrokenPipeError, ConnectionResetError):
+                raise PdfExtractionError("PDF parser exited unexpectedly.")
+            finally:
+                if healthy:
+                    self._checkin(parser)
+                else:
+                    parser.stop()   # only this upload's parser is killed and later replaced
+        if status == "error":
+            raise ValueError(payload)
+        return payload
+
+    # ---- cache ----
+    def _cache_get(self, digest):
+        with self._lock:
+            text = self._cache.get(digest)
+            if text is not None:
+                self._cache.move_to_end(digest)
+                self.stats["cache_hits"] += 1
+            else:
+                self.stats["cache_misses"] += 1
+            return text
+
+    def _cache_put(self, digest, text):
+        with self._lock:
+            self._cache[digest] = text
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    # ---- public API ----
+    def extract(self, data):
+        """Return the text of PDF bytes `data`, raising PdfExtractionError if rejected."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            text, outcome = self._extract(data)
+            return text
+        except PdfExtractionError as e:
+            outcome = getattr(e, "outcome", "error")
+            raise
+        finally:
+            PDF_EXTRACT_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+
+    def _extract(self, data):
+        """Returns (text, outcome) where outcome is cache_hit or parsed."""
+        if len(data) > self.max_bytes:
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise PdfExtractionError(f"PDF is larger than the {self.max_bytes / 1e6:.1f} MB limit.", outcome="rejected")
+
+        digest = hashlib.sha256(data).hexdigest()
+        cached = self._cache_get(digest)
+        if cached is not None:
+            return cached, "cache_hit"
+
+        if self.workers > 0:
+            text, pages_read, total_pages = self._extract_isolated(data)
+        else:
+            text, pages_read, total_pages = extract_pages(data, self.max_pages)
+
+        if total_pages > pages_read:
+            self.logger.info(f"PDF has {total_pages} pages; extracted the first {pages_read}.")
+        self._cache_put(digest, text)
+        return text, "parsed"
+
+    def cache_stats(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._cache))
+
+
+def get_pdf_extractor(app):
+    """Return the shared extractor from app config, creating it on first use."""
+    extractor = app.config.get('PDF_EXTRACTOR')
+    if extractor is None:
+        extractor = PdfTextExtractor(
+            logger=app.logger,
+            max_bytes=int(app.config.get('PDF_MAX_BYTES') or DEFAULT_MAX_BYTES),
+            max_pages=int(app.config.get('PDF_MAX_PAGES') or DEFAULT_MAX_PAGES),
+            timeout=float(app.config.get('PDF_EXTRACT_TIMEOUT') or DEFAULT_TIMEOUT),
+            workers=int(app.config.get('PDF_EXTRACT_WORKERS', DEFAULT_WORKERS)),
+            cache_entries=int(app.config.get('PDF_TEXT_CACHE_ENTRIES') or DEFAULT_CACHE_ENTRIES),
+        )
+        app.config['PDF_EXTRACTOR'] = extractor
+    return extractor
@@ -1,9 +1,13 @@
 import os
 import re
-import joblib
+import logging
 import numpy as np
 from flask import Blueprint, jsonify, request, current_app
-from sklearn.metrics.pairwise import cosine_similarity
+
+from .model_registry import get_registry
+from .score_predict import sbert_ready, get_sbert_encoder, get_background_encoder
+from .prefetch import get_recommendation_cache, get_prefetcher, recommendation_key
+from .course_index import IndexWatcher, current_version, list_versions, DEFAULT_RELOAD_INTERVAL
 
 # -----------------------------
 # Blueprint setup
@@ -20,6 +24,11 @@ MODEL_DIR = os.path.join(PROJECT_ROOT, "ML prediction")
 VECTORIZER_PATH = os.path.join(MODEL_DIR, "tfidf_vectorizer.joblib")
 COURSE_MATRIX_PATH = os.path.join(MODEL_DIR, "course_tfidf_matrix.joblib")
 COURSE_METADATA_PATH = os.path.join(MODEL_DIR, "course_metadata.joblib")
+COURSE_INDEX_DIR = os.path.join(MODEL_DIR, "course_index")   # versioned builds (features/course_index.py)
+
+COURSE_MODEL_NAME = "course_recommender"
+MAX_BATCH_QUERIES = 100
+MAX_TOP_N = 50
 
 # -----------------------------
 # Utility functions
@@ -33,21 +42,190 @@ def clean_text(text):
     return text
 
 
-def load_model():
-    """Load model components from the ML prediction directory."""
+class CourseModelUnavailable(RuntimeError):
+    """Raised when the course recommender artifacts are missing."""
+
+
+def load_model(logger=None):
+    """
+    Load model components from the ML prediction directory.
+
+    The TF-IDF matrix is opened with `mmap_mode="r"` so its data/indices/indptr
+    arrays are backed by the page cache and shared between forked workers.
+    """
+    import joblib
+
+    logger = logger or logging.getLogger(__name__)
+    if not all(os.path.exists(p) for p in [VECTORIZER_PATH, COURSE_MATRIX_PATH, COURSE_METADATA_PATH]):
+        logger.error("❌ Missing one or more .joblib files in 'ML prediction' directory.")
+        raise CourseModelUnavailable("Missing one or more .joblib files in 'ML prediction' directory.")
+
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    tfidf_matrix = joblib.load(COURSE_MATRIX_PATH, mmap_mode="r")
+    metadata_df = joblib.load(COURSE_METADATA_PATH)
+    logger.info("✅ Course recommender model loaded successfully.")
+    return vectorizer, tfidf_matrix, metadata_df
+
+
+def load_search_engine(logger=None):
+    """Load the course artifacts and wrap them in a batched search engine."""
+    from .course_search import CourseSearchEngine  # scipy/sklearn imported on first load only
+    vectorizer, tfidf_matrix, metadata_df = load_model(logger)
+    return CourseSearchEngine(vectorizer, tfidf_matrix, metadata_df, clean_fn=clean_text)
+
+
+def get_index_watcher(app):
+    """Return the per-app watcher that hot-swaps the course index when CURRENT moves."""
+    watcher = app.config.get('COURSE_INDEX_WATCHER')
+    if watcher is None:
+        registry = get_registry(app)
+        watcher = IndexWatcher(
+            app.config.get('COURSE_INDEX_DIR') or COURSE_INDEX_DIR,
+            on_load=lambda engine: registry.swap(COURSE_MODEL_NAME, engine),
+            interval=float(app.config.get('COURSE_INDEX_RELOAD_INTERVAL', DEFAULT_RELOAD_INTERVAL)),
+            verify=bool(app.config.get('COURSE_INDEX_VERIFY', True)),
+            clean_fn=clean_text,
+            logger=app.logger,
+        )
+        app.config['COURSE_INDEX_WATCHER'] = watcher
+    return watcher
+
+
+def load_course_engine(app):
+    """Serve the active versioned index if one exists and loads, else the legacy .joblib artifacts."""
     try:
-        if not all(os.path.exists(p) for p in [VECTORIZER_PATH, COURSE_MATRIX_PATH, COURSE_METADATA_PATH]):
-            current_app.logger.error("❌ Missing one or more .joblib files in 'ML prediction' directory.")
-            return None, None, None
-
-        vectorizer = joblib.load(VECTORIZER_PATH)
-        tfidf_matrix = joblib.load(COURSE_MATRIX_PATH)
-        metadata_df = joblib.load(COURSE_METADATA_PATH)
-        current_app.logger.info("✅ Course recommender model loaded successfully.")
-        return vectorizer, tfidf_matrix, metadata_df
+        engine = get_index_watcher(app).load_current()
     except Exception as e:
-        current_app.logger.error(f"Error loading course model: {e}", exc_info=True)
-        return None, None, None
+        # Bad manifest, checksum mismatch or truncated file: still serve from joblib if we can.
+        app.logger.error(f"❌ Course index under CURRENT is unusable, falling back to .joblib artifacts: {e}")
+        engine = None
+    if engine is not None:
+        app.logger.info(f"✅ Course index {engine.version} mapped ({engine.num_courses} courses).")
+        return engine
+    return load_search_engine(app.logger)
+
+
+def register_course_model(app):
+    """Register the course recommender with the app's model registry."""
+    registry = get_registry(app)
+    registry.register(COURSE_MODEL_NAME, lambda: load_course_engine(app))
+    return registry
+
+def _get_engine():
+    """Return (engine, error message); never blocks on a background warm-up."""
+    registry = get_registry(current_app)
+    engine = registry.get(COURSE_MODEL_NAME, wait=False)
+    if engine is not None or registry.state(COURSE_MODEL_NAME) == "failed":
+        # Cheap, throttled check of CURRENT; a new version loads in the background.
+        get_index_watcher(current_app).check(getattr(engine, "version", None))
+    if engine is not None:
+        return engine, None
+    if registry.state(COURSE_MODEL_NAME) == "loading":
+        return None, "Course model is warming up. Please retry shortly."
+    return None, "Model not loaded. Build a course index or ensure .joblib files exist."
+
+def _search_options(data):
+    """Return (mode, alpha) from the request body, defaulting to app config."""
+    from .course_search import SEARCH_MODES, DEFAULT_HYBRID_ALPHA  # keeps scipy/sklearn out of app start-up
+    mode = data.get("mode") or current_app.config.get('COURSE_SEARCH_MODE') or "tfidf"
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown mode '{mode}'; expected one of {list(SEARCH_MODES)}.")
+    alpha = float(data.get("hybrid_alpha", current_app.config.get('COURSE_HYBRID_ALPHA', DEFAULT_HYBRID_ALPHA)))
+    return mode, min(1.0, max(0.0, alpha))
+
+
+def _top_n(data):
+    """Return the requested result count; ValueError unless it is an integer in 1..MAX_TOP_N."""
+    top_n = data.get("top_n", 5)
+    try:
+        top_n = int(top_n) if isinstance(top_n, (int, str)) and not isinstance(top_n, bool) else 0
+    except ValueError:
+        top_n = 0
+    if not 1 <= top_n <= MAX_TOP_N:
+        raise ValueError(f"'top_n' must be an integer between 1 and {MAX_TOP_N}.")
+    return top_n
+
+
+def _query_vectors(engine, query_texts, encoder=None):
+    """Encode queries with SBERT for dense ranking; None if the index or model can't do it."""
+    if not engine.has_embeddings or not sbert_ready(current_app):
+        return None
+    encoder = encoder or get_sbert_encoder(current_app)
+    cache = current_app.config.get('EMBEDDING_CACHE')
+    vectors = cache.encode(encoder, query_texts) if cache is not None else encoder.encode(query_texts)
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(len(query_texts), -1)
+    if vectors.shape[1] != engine.embeddings.shape[1]:
+        current_app.logger.warning(
+            f"Course embeddings ({engine.embedding_model}) have dim {engine.embeddings.shape[1]}, "
+            f"SBERT produces {vectors.shape[1]}; using TF-IDF."
+        )
+        return None
+    return vectors
+
+
+def _effective_mode(engine, mode):
+    """Dense/hybrid only when the index has embeddings and SBERT is loaded."""
+    if mode == "tfidf" or (engine.has_embeddings and sbert_ready(current_app)):
+        return mode
+    return "tfidf"
+
+
+def _run_search(engine, query_texts, top_n, mode, alpha, encoder=None):
+    """Search in `mode`, falling back to TF-IDF when dense scoring is unavailable. Returns (results, mode)."""
+    vectors = None
+    if mode != "tfidf":
+        vectors = _query_vectors(engine, query_texts, encoder)
+        if vectors is None:
+            mode = "tfidf"
+    return engine.search(query_texts, top_n=top_n, mode=mode, query_vectors=vectors, alpha=alpha), mode
+
+def _cached_search(engine, query_texts, top_n, mode, alpha):
+    """
+    Like _run_search, but answers from the recommendation cache (filled by
+    earlier requests and the job prefetcher) and only computes the misses.
+    """
+    cache = get_recommendation_cache(current_app)
+    mode = _effective_mode(engine, mode)
+    keys = [recommendation_key(engine.version, mode, alpha, text) for text in query_texts]
+    results = [cache.get(key, top_n) for key in keys]
+    missing = [i for i, rows in enumerate(results) if rows is None]
+    used_mode = mode
+    if missing:
+        computed, used_mode = _run_search(engine, [query_texts[i] for i in missing], top_n, mode, alpha)
+        for i, rows in zip(missing, computed):
+            results[i] = rows
+            if used_mode == mode:  # a TF-IDF fallback must not answer later dense/hybrid lookups
+                cache.put(keys[i], top_n, rows)
+    return results, used_mode
+
+
+def prefetch_recommendations(jobs, top_k):
+    """
+    Warm the recommendation cache for [(title, description), ...] in the
+    default mode. Runs inside an app context on the prefetch thread; returns
+    how many queries were computed (cached ones are skipped). Nothing is
+    stored when dense scoring falls back to TF-IDF.
+    """
+    registry = get_registry(current_app)
+    engine = registry.get(COURSE_MODEL_NAME, wait=False)
+    if engine is None:
+        return 0
+    mode, alpha = _search_options({})
+    mode = _effective_mode(engine, mode)
+    cache = get_recommendation_cache(current_app)
+    texts = [clean_text(f"{title} {description}") for title, description in jobs]
+    texts = [
+        text for text in dict.fromkeys(texts)
+        if text and not cache.contains(recommendation_key(engine.version, mode, alpha, text), top_k)
+    ]
+    if texts:
+        computed, used_mode = _run_search(engine, texts, top_k, mode, alpha,
+                                          encoder=get_background_encoder(current_app))
+        if used_mode != mode:
+            return 0
+        for text, rows in zip(texts, computed):
+            cache.put(recommendation_key(engine.version, mode, alpha, text), top_k, rows)
+    return len(texts)
 
 # -----------------------------
 # Prediction Route
@@ -60,8 +238,13 @@ def predict_courses():
         {
             "job_title": "Data Scientist",
             "job_description": "We are hiring a data scientist...",
-            "top_n": 5
+            "job_id": "123",                        (optional; alone, uses a prefetched job's text)
+            "top_n": 5,                             (1..MAX_TOP_N)
+            "mode": "tfidf" | "dense" | "hybrid",   (optional, default COURSE_SEARCH_MODE)
+            "hybrid_alpha": 0.5                     (optional, weight of the dense score)
         }
+    Dense and hybrid modes need an index built with --embed-model and a loaded
+    SBERT model; otherwise the response falls back to (and reports) "tfidf".
     """
     try:
         data = request.get_json()
@@ -70,43 +253,131 @@ def predict_courses():
 
         job_title = data.get("job_title", "")
         job_description = data.get("job_description", "")
-        top_n = int(data.get("top_n", 5))
+        if not job_title and not job_description and data.get("job_id") is not None:
+            job_title, job_description = get_recommendation_cache(current_app).job_text(data["job_id"]) or ("", "")
+        try:
+            top_n = _top_n(data)
+            mode, alpha = _search_options(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         if not job_title and not job_description:
             return jsonify({"error": "Both job_title and job_description are empty"}), 400
 
-        vectorizer, tfidf_matrix, metadata_df = load_model()
-        if vectorizer is None:
-            return jsonify({"error": "Model not loaded. Please ensure .joblib files exist."}), 503
+        engine, error = _get_engine()
+        if engine is None:
+            return jsonify({"error": error}), 503
 
         query_text = clean_text(f"{job_title} {job_description}")
         if not query_text.strip():
             return jsonify({"courses": [], "message": "Query text is empty after cleaning."}), 200
 
-        query_vector = vectorizer.transform([query_text])
-        cosine_sim = cosine_similarity(query_vector, tfidf_matrix).flatten()
+        results, mode = _cached_search(engine, [query_text], top_n, mode, alpha)
+        return jsonify({"courses": results[0], "mode": mode}), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error during course prediction: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+# -----------------------------
+# Batch Prediction Route
+# -----------------------------
+@courses_bp.route("/predict_courses_batch", methods=["POST"])
+def predict_courses_batch():
+    """
+    POST /api/predict_courses_batch
+    JSON:
+        {
+            "jobs": [
+                {"id": "123", "job_title": "Data Scientist", "job_description": "..."},
+                ...
+            ],
+            "top_n": 5,                             (1..MAX_TOP_N)
+            "mode": "tfidf" | "dense" | "hybrid"
+        }
+    Returns:
+        {"results": [{"job_id": "123", "courses": [...]}, ...], "mode": "tfidf"}
+    All queries are scored with a single sparse (or dense) matrix product.
+    """
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get("jobs"), list):
+            return jsonify({"error": "Missing 'jobs' list in JSON body"}), 400
+
+        jobs = data["jobs"]
+        if len(jobs) > MAX_BATCH_QUERIES:
+            return jsonify({"error": f"At most {MAX_BATCH_QUERIES} jobs per batch."}), 400
+        if not all(isinstance(job, dict) for job in jobs):
+            return jsonify({"error": "Each entry in 'jobs' must be an object."}), 400
+        try:
+            top_n = _top_n(data)
+            mode, alpha = _search_options(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        top_indices = cosine_sim.argsort()[-top_n:][::-1]
-        recommendations = []
+        engine, error = _get_engine()
+        if engine is None:
+            return jsonify({"error": error}), 503
 
-        for idx in top_indices:
-            score = float(cosine_sim[idx])
-            if score < 0.01:
-                continue
+        query_texts = [
+            clean_text(f"{job.get('job_title', '')} {job.get('job_description', '')}")
+            for job in jobs
+        ]
+        results = [{"job_id": job.get("id", i), "courses": []} for i, job in enumerate(jobs)]
 
-            course_info = metadata_df.iloc[idx]
-            recommendations.append({
-                "id": f"course_{idx}",
-                "name": course_info.get("course_title", "N/A"),
-                "url": course_info.get("Course URL", "#"),
-                "skills_taught": course_info.get("course_skills", "N/A"),
-                "description_snippet": (course_info.get("course_description", "")[:200] + "..."),
-                "relevance": f"{round(score * 100, 2)}%",
-                "similarity_score": round(score, 4)
-            })
+        # Only non-empty queries go through the vectorizer.
+        active = [i for i, text in enumerate(query_texts) if text]
+        if active:
+            batch, mode = _cached_search(engine, [query_texts[i] for i in active], top_n, mode, alpha)
+            for i, courses in zip(active, batch):
+                results[i]["courses"] = courses
 
-        return jsonify({"courses": recommendations}), 200
+        return jsonify({"results": results, "mode": mode}), 200
 
     except Exception as e:
-        current_app.logger.error(f"Error during course prediction: {e}", exc_info=True)
+        current_app.logger.error(f"Error during batch course prediction: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+# -----------------------------
+# Index version routes
+# -----------------------------
+@courses_bp.route("/course_index", methods=["GET"])
+def course_index_info():
+    """GET /api/course_index - version served by this worker and versions on disk."""
+    watcher = get_index_watcher(current_app)
+    engine = get_registry(current_app).get(COURSE_MODEL_NAME, wait=False)
+    return jsonify({
+        "served_version": getattr(engine, "version", None),
+        "num_courses": engine.num_courses if engine is not None else 0,
+        "dense": bool(engine is not None and engine.has_embeddings),
+        "active_version": current_version(watcher.root),
+        "available_versions": list_versions(watcher.root),
+    }), 200
+
+
+@courses_bp.route("/course_index/reload", methods=["POST"])
+def course_index_reload():
+    """
+    POST /api/course_index/reload - switch this worker to the active version now.
+    Other workers pick it up on their next check (COURSE_INDEX_RELOAD_INTERVAL).
+    """
+    try:
+        engine = get_registry(current_app).get(COURSE_MODEL_NAME, wait=False)
+        get_index_watcher(current_app).check(getattr(engine, "version", None), force=True)
+        return course_index_info()
+    except Exception as e:
+        current_app.logger.error(f"Error reloading course index: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
+
+
+@courses_bp.route("/prefetch/stats", methods=["GET"])
+def prefetch_stats():
+    """GET /api/prefetch/stats - prefetch queue and recommendation cache counters."""
+    prefetcher = get_prefetcher(current_app)
+    return jsonify({
+        "enabled": prefetcher is not None,
+        "prefetcher": prefetcher.stats() if prefetcher is not None else None,
+        "recommendation_cache": get_recommendation_cache(current_app).stats(),
+    }), 200
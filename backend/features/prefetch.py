@@ -0,0 +1,261 @@
+# backend/features/prefetch.py
+
+import os
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict
+
+from .metrics import METRICS
+
+DEFAULT_TOP_K = 10                 # courses precomputed per job
+DEFAULT_QUEUE_PAGES = 32           # fetched pages waiting for prefetch
+DEFAULT_WORKERS = 1
+DEFAULT_CACHE_ENTRIES = 4096
+DEFAULT_CACHE_TTL = 3600
+PREFETCH_CHUNK = 8                 # jobs encoded/searched per step
+BUSY_BACKOFF = 0.05                # seconds to yield while interactive ML requests run
+MAX_BUSY_WAIT = 5.0
+PREFETCH_NICENESS = 10
+
+PREFETCH_JOBS = METRICS.counter(
+    "prefetch_jobs_total", "Jobs handled by the recommendation prefetcher.", ["result"])
+RECOMMENDATION_CACHE_LOOKUPS = METRICS.counter(
+    "recommendation_cache_lookups_total", "Course recommendation cache lookups by result.", ["result"])
+
+
+def recommendation_key(version, mode, alpha, query_text):
+    return (version, mode, round(float(alpha), 3) if mode == "hybrid" else None, query_text)
+
+
+class RecommendationCache:
+    """
+    LRU/TTL cache of course recommendation rows keyed by index version,
+    search mode and cleaned query text. Each entry remembers the `top_n` it
+    was computed for, so it serves any request asking for that many or fewer.
+    Also maps job ids to their query text for id-only lookups.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES, ttl=DEFAULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()    # key -> (stored_at, top_n, rows)
+        self._job_texts = OrderedDict()  # job id -> (title, description)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, top_n):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None or entry[1] < top_n:
+                self.misses += 1
+                RECOMMENDATION_CACHE_LOOKUPS.inc(result="miss")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            RECOMMENDATION_CACHE_LOOKUPS.inc(result="hit")
+            return entry[2][:top_n]
+
+    def contains(self, key, top_n):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[1] >= top_n and time.monotonic() - entry[0] <= self.ttl
+
+    def put(self, key, top_n, rows):
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current[1] > top_n and time.monotonic() - current[0] <= self.ttl:
+                return  # keep the deeper result
+            self._entries[key] = (time.monotonic(), top_n, rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def remember_job(self, job_id, title, description):
+        with self._lock:
+            self._job_texts[str(job_id)] = (title or "", description or "")
+            self._job_texts.move_to_end(str(job_id))
+            while len(self._job_texts) > self.max_entries:
+                self._job_texts.popitem(last=False)
+
+    def job_text(self, job_id):
+        with self._lock:
+            return self._job_texts.get(str(job_id))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "jobs": len(self._job_texts),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def get_recommendation_cache(app):
+    cache = app.config.get('RECOMMENDATION_CACHE')
+    if cache is None:
+        cache = RecommendationCache(
+            max_entries=int(app.config.get('RECOMMENDATION_CACHE_SIZE') or DEFAULT_CACHE_ENTRIES),
+            ttl=float(app.config.get('RECOMMENDATION_CACHE_TTL') or DEFAULT_CACHE_TTL),
+        )
+        app.config['RECOMMENDATION_CACHE'] = cache
+    return cache
+
+
+class JobPrefetcher:
+    """
+    Background warm-up for jobs that were just shown to a user.
+
+    Fetched pages are queued (bounded; pages are dropped when it is full) and
+    a low-priority worker thread, per process, embeds each job description
+    into the embedding cache (what /api/match_score encodes) and stores the
+    top-k course recommendations for it. The worker runs at a higher nice
+    value and pauses between chunks while interactive ML requests hold an
+    admission slot or the SBERT scheduler has work, so prefetch never
+    competes with a waiting user. It encodes with the model directly rather
+    than through the scheduler, whose shared thread would otherwise run
+    prefetch texts at normal priority inside interactive batches.
+    """
+
+    def __init__(self, app, workers=DEFAULT_WORKERS, queue_pages=DEFAULT_QUEUE_PAGES, top_k=DEFAULT_TOP_K,
+                 logger=None):
+        self.app = app
+        self.workers = max(1, int(workers))
+        self.queue_pages = max(1, int(queue_pages))
+        self.top_k = int(top_k)
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._queue = None
+        self._threads = []
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats_counts = {"pages_queued": 0, "pages_dropped": 0, "jobs_prefetched": 0,
+                             "jobs_skipped": 0, "errors": 0}
+
+    def _ensure_workers(self):
+        """Start the worker threads on first use in this process (safe after fork)."""
+        if self._pid == os.getpid() and all(t.is_alive() for t in self._threads):
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and all(t.is_alive() for t in self._threads):
+                return
+            self._queue = queue.Queue(maxsize=self.queue_pages)
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._run, args=(self._queue,), name=f"job-prefetch-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def submit(self, jobs):
+        """Queue a page of serialized jobs; returns False if the queue is full."""
+        jobs = [job for job in jobs if job.get("id") is not None and (job.get("title") or job.get("description"))]
+        if not jobs:
+            return True
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait(jobs)
+        except queue.Full:
+            self._count("pages_dropped")
+            return False
+        self._count("pages_queued")
+        return True
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self.stats_counts[name] += amount
+
+    # ---- worker ----
+    def _interactive_busy(self):
+        limiters = self.app.config.get('ADMISSION_LIMITERS') or {}
+        if any(limiter.active or limiter.waiting for limiter in list(limiters.values())):
+            return True
+        return bool(getattr(self.app.config.get('SBERT_ENCODER'), "busy", False))
+
+    def _yield_to_requests(self):
+        deadline = time.monotonic() + MAX_BUSY_WAIT
+        while self._interactive_busy() and time.monotonic() < deadline:
+            time.sleep(BUSY_BACKOFF)
+
+    def _run(self, work_queue):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PREFETCH_NICENESS)
+        except (AttributeError, OSError):
+            pass  # per-thread niceness is Linux-only
+        while True:
+            jobs = work_queue.get()
+            for start in range(0, len(jobs), PREFETCH_CHUNK):
+                self._yield_to_requests()
+                try:
+                    with self.app.app_context():
+                        self._prefetch(jobs[start:start + PREFETCH_CHUNK])
+                except Exception as e:
+                    self._count("errors")
+                    PREFETCH_JOBS.inc(result="error")
+                    self.logger.warning(f"Prefetch of {len(jobs[start:start + PREFETCH_CHUNK])} jobs failed: {e}")
+
+    def _prefetch(self, jobs):
+        from .predict_courses import prefetch_recommendations
+        from .score_predict import get_background_encoder, sbert_ready
+
+        cache = get_recommendation_cache(self.app)
+        for job in jobs:
+            cache.remember_job(job["id"], job.get("title"), job.get("description"))
+
+        # Job description embeddings, as encoded by /api/match_score(s).
+        embedding_cache = self.app.config.get('EMBEDDING_CACHE')
+        if embedding_cache is not None and sbert_ready(self.app):
+            descriptions = [job["description"] for job in jobs if job.get("description")]
+            if descriptions:
+                embedding_cache.encode(get_background_encoder(self.app), descriptions)
+
+        computed = prefetch_recommendations(
+            [(job.get("title") or "", job.get("description") or "") for job in jobs], self.top_k
+        )
+        self._count("jobs_prefetched", computed)
+        self._count("jobs_skipped", len(jobs) - computed)
+        PREFETCH_JOBS.inc(computed, result="prefetched")
+        PREFETCH_JOBS.inc(len(jobs) - computed, result="skipped")
+
+    def stats(self):
+        with self._stats_lock:
+            counts = dict(self.stats_counts)
+        return dict(
+            counts,
+            queue_depth=self._queue.qsize() if self._queue is not None else 0,
+            top_k=self.top_k,
+        )
+
+
+def get_prefetcher(app):
+    """Return the app's prefetcher, or None if PREFETCH_ENABLED is off."""
+    if not app.config.get('PREFETCH_ENABLED'):
+        return None
+    prefetcher = app.config.get('JOB_PREFETCHER')
+    if prefetcher is None:
+        prefetcher = JobPrefetcher(
+            app,
+            workers=int(app.config.get('PREFETCH_WORKERS') or DEFAULT_WORKERS),
+            queue_pages=int(app.config.get('PREFETCH_QUEUE_PAGES') or DEFAULT_QUEUE_PAGES),
+            top_k=int(app.config.get('PREFETCH_TOP_K') or DEFAULT_TOP_K),
+            logger=app.logger,
+        )
+        app.config['JOB_PREFETCHER'] = prefetcher
+    return prefetcher
+
+
+def prefetch_jobs_async(app, jobs):
+    """Hand a fetched page to the prefetcher (no-op when disabled)."""
+    prefetcher = get_prefetcher(app)
+    if prefetcher is not None and jobs:
+        prefetcher.submit(jobs)
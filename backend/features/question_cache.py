@@ -0,0 +1,206 @@
+# backend/features/question_cache.py
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import Counter, OrderedDict, deque
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))        # backend/features
+DEFAULT_BANK_PATH = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "question_bank.json"))
+
+DEFAULT_TTL = 6 * 3600
+DEFAULT_MAX_ENTRIES = 1024
+MAX_KEYWORDS = 16
+MAX_QUESTIONS_PER_CATEGORY = 10
+CATEGORIES = {
+    "technical_questions": "num_technical",
+    "behavioral_questions": "num_behavioral",
+    "situational_questions": "num_situational",
+}
+
+_STOPWORDS = {
+    "the", "and", "for", "with", "you", "your", "our", "are", "will", "this", "that", "from",
+    "have", "has", "who", "what", "all", "can", "able", "work", "team", "role", "job",
+    "experience", "years", "year", "strong", "skills", "knowledge", "including", "such", "etc",
+    "into", "about", "their", "they", "them", "more", "than", "not", "but", "also", "any",
+    "looking", "join", "we", "us", "an", "in", "of", "to", "as", "on", "or", "be", "is", "at",
+}
+_SENIORITY = re.compile(r"^(senior|sr|junior|jr|lead|principal|staff|associate|entry level)\s+")
+
+
+def normalise_role(role):
+    return " ".join(re.sub(r"[^\w\s]", " ", str(role or "").lower()).split())
+
+
+_TOKEN = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*")   # "node.js" stays whole, "java." loses its dot
+
+
+def _tokens(text):
+    return _TOKEN.findall(str(text or "").lower())
+
+
+def _significant_tokens(text):
+    return [t for t in _tokens(text) if len(t) > 2 and t not in _STOPWORDS]
+
+
+def normalise_keywords(context):
+    """
+    Reduce free-text context (often a whole job description) to its most
+    frequent significant tokens, sorted, so near-identical contexts share a key.
+    """
+    top = [token for token, _ in Counter(_significant_tokens(context)).most_common(MAX_KEYWORDS)]
+    return tuple(sorted(top))
+
+
+def validate_counts(counts, maximum=MAX_QUESTIONS_PER_CATEGORY):
+    """
+    Check (num_technical, num_behavioral, num_situational) are integers in
+    0..maximum and return them as a tuple; raises ValueError otherwise.
+    """
+    counts = tuple(counts)
+    if len(counts) != len(CATEGORIES):
+        raise ValueError(f"Expected {len(CATEGORIES)} question counts.")
+    validated = []
+    for field, count in zip(CATEGORIES.values(), counts):
+        try:
+            value = int(count)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be an integer.")
+        if not 0 <= value <= maximum:
+            raise ValueError(f"{field} must be between 0 and {maximum}.")
+        validated.append(value)
+    return tuple(validated)
+
+
+def question_cache_key(role, context, counts):
+    """counts: (num_technical, num_behavioral, num_situational)."""
+    return (normalise_role(role), normalise_keywords(context), tuple(int(c) for c in counts))
+
+
+class QuestionCache:
+    """LRU cache of generated question sets with a TTL per entry."""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (stored_at, questions)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, questions):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), questions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class QuestionBank:
+    """
+    Precomputed question sets for common roles, loaded from JSON. Titles are
+    matched after dropping seniority prefixes and resolving aliases. Each set
+    lists the technologies (`keywords`) its questions suit; a context, usually
+    a whole job description, that names a known tech term (`tech_terms`) outside
+    that list goes to the generator instead of getting generic questions.
+    """
+
+    def __init__(self, path=DEFAULT_BANK_PATH, logger=None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.roles, self.aliases, self.tech_terms = {}, {}, frozenset()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                data = json.load(fh)
+            self.roles = {normalise_role(k): v for k, v in data.get("roles", {}).items()}
+            self.aliases = {normalise_role(k): normalise_role(v) for k, v in data.get("aliases", {}).items()}
+            self.tech_terms = frozenset(term.lower() for term in data.get("tech_terms", []))
+            for entry in self.roles.values():
+                entry["keywords"] = frozenset(term.lower() for term in entry.get("keywords", []))
+        elif path:
+            self.logger.warning(f"Question bank not found at {path}; every request will call the generator.")
+
+    def lookup(self, role, context, counts):
+        """Return a question set sliced to `counts`, or None if the bank can't satisfy it."""
+        counts = validate_counts(counts)
+        name = _SENIORITY.sub("", normalise_role(role))
+        entry = self.roles.get(self.aliases.get(name, name))
+        if entry is None:
+            return None
+        named = self.tech_terms.intersection(_tokens(context))
+        if not named <= entry["keywords"]:
+            return None
+        questions = {}
+        for (category, _), count in zip(CATEGORIES.items(), counts):
+            available = entry.get(category, [])
+            if len(available) < count:
+                return None
+            questions[category] = available[:count]
+        return questions
+
+
+class QuestionService:
+    """Bank -> cache -> generator, with hit-rate and generator latency stats."""
+
+    def __init__(self, generator, cache, bank):
+        self.generator = generator
+        self.cache = cache
+        self.bank = bank
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1024)
+        self.counts = {"bank_hits": 0, "cache_hits": 0, "misses": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def get_questions(self, role, context, counts, prompt):
+        """Return (questions, source) where source is bank, cache or generator."""
+        questions = self.bank.lookup(role, context, counts)
+        if questions is not None:
+            self._count("bank_hits")
+            return questions, "bank"
+
+        key = question_cache_key(role, context, counts)
+        questions = self.cache.get(key)
+        if questions is not None:
+            self._count("cache_hits")
+            return questions, "cache"
+
+        self._count("misses")
+        started = time.perf_counter()
+        questions = self.generator(prompt)
+        with self._lock:
+            self._latencies.append((time.perf_counter() - started) * 1000.0)
+        self.cache.put(key, questions)
+        return questions, "generator"
+
+    def stats(self):
+        with self._lock:
+            total = sum(self.counts.values())
+            latencies = np.fromiter(self._latencies, dtype=np.float64)
+            return dict(
+                self.counts,
+                requests=total,
+                hit_rate=round((self.counts["bank_hits"] + self.counts["cache_hits"]) / total, 4) if total else 0.0,
+                cache_entries=len(self.cache),
+                generator_calls=int(latencies.size),
+                generator_ms_avg=round(float(latencies.mean()), 3) if latencies.size else 0.0,
+                generator_ms_p95=round(float(np.percentile(latencies, 95)), 3) if latencies.size else 0.0,
+            )
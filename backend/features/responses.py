@@ -0,0 +1,208 @@
+# backend/features/responses.py
+
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask.json.provider import DefaultJSONProvider
+
+from .metrics import METRICS
+
+try:  # optional: several times faster than the json module, native numpy support
+    import orjson
+except ImportError:
+    orjson = None
+
+try:  # optional: smaller than gzip for JSON at similar CPU cost
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_COMPRESS_MIN_BYTES = 1024      # below this, compression costs more than it saves
+DEFAULT_GZIP_LEVEL = 5
+DEFAULT_BROTLI_QUALITY = 4
+DEFAULT_COMPRESSED_CACHE_ENTRIES = 256
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html"}
+
+RESPONSE_BYTES = METRICS.counter(
+    "response_bytes_total", "Response body bytes before and after content encoding.", ["encoding", "stage"])
+CONDITIONAL_RESPONSES = METRICS.counter(
+    "conditional_responses_total", "ETag-tagged responses by result.", ["result"])
+
+
+# -----------------------------
+# JSON encoding
+# -----------------------------
+def _default(o):
+    if hasattr(o, "tolist"):          # numpy scalars and arrays
+        return o.tolist()
+    return DefaultJSONProvider.default(o)
+
+
+def dumps_bytes(obj):
+    """Serialize `obj` to compact UTF-8 JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by `dumps_bytes`, so every `jsonify` in the
+    blueprints gets the fast encoder. Keys keep insertion order (no
+    `sort_keys`) and output is compact even in debug mode.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+def content_etag(body):
+    """Strong validator for a response body: a 128-bit content hash."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def conditional_json(payload, status=200):
+    """
+    Like `jsonify(payload), status`, but tagged with a strong ETag of the
+    body. `init_responses` answers a matching If-None-Match with 304 and
+    compresses the rest, so unchanged job pages cost the client neither
+    bytes nor parsing. For GET/HEAD routes only: a POST response is not a
+    cacheable representation of the target resource, so 304 is meaningless there.
+    """
+    from flask import current_app
+
+    response = current_app.response_class(dumps_bytes(payload) + b"\n", status=status, mimetype="application/json")
+    if status == 200:
+        response.set_etag(content_etag(response.get_data()))
+        response.headers["Cache-Control"] = "no-cache"   # cacheable, but revalidate every time
+    return response
+
+
+# -----------------------------
+# Content encoding
+# -----------------------------
+def choose_encoding(accept_encodings, size, min_bytes=DEFAULT_COMPRESS_MIN_BYTES):
+    """Pick "br", "gzip" or None for a body of `size` bytes."""
+    if size < min_bytes:
+        return None
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+class ResponseCompressor:
+    """
+    Compresses response bodies, keeping recent results for ETag-tagged
+    bodies (which repeat by design) so popular pages are encoded once.
+    """
+
+    def __init__(self, min_bytes=DEFAULT_COMPRESS_MIN_BYTES, gzip_level=DEFAULT_GZIP_LEVEL,
+                 brotli_quality=DEFAULT_BROTLI_QUALITY, cache_entries=DEFAULT_COMPRESSED_CACHE_ENTRIES):
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_entries = cache_entries
+        self._cache = OrderedDict()   # (etag, encoding) -> compressed bytes
+        self._lock = threading.Lock()
+
+    def _encode(self, body, encoding):
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def compress(self, body, encoding, etag=None):
+        if etag is None or self.cache_entries <= 0:
+            return self._encode(body, encoding)
+        key = (etag, encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        compressed = self._encode(body, encoding)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return compressed
+
+
+def _not_modified(if_none_match, etag):
+    """If-None-Match uses weak comparison; any encoding of the same content matches."""
+    if if_none_match.star_tag:
+        return True
+    return any(tag.split("-", 1)[0] == etag for tag in if_none_match.as_set(include_weak=True))
+
+
+# -----------------------------
+# Flask wiring
+# -----------------------------
+def init_responses(app):
+    """
+    Install the fast JSON provider and an after-request hook that answers
+    conditional GET/HEAD requests for ETag-tagged responses with 304 and compresses
+    JSON/text bodies above RESPONSE_COMPRESS_MIN_BYTES (brotli if installed
+    and accepted, else gzip). Compressed variants get the coding appended to
+    their ETag ("<hash>-gzip") so validators stay strong per representation.
+    """
+    from flask import request
+
+    app.json = FastJSONProvider(app)
+    compressor = None
+    if app.config.get('RESPONSE_COMPRESSION', True):
+        compressor = ResponseCompressor(
+            min_bytes=int(app.config.get('RESPONSE_COMPRESS_MIN_BYTES', DEFAULT_COMPRESS_MIN_BYTES)),
+            gzip_level=int(app.config.get('RESPONSE_GZIP_LEVEL') or DEFAULT_GZIP_LEVEL),
+            brotli_quality=int(app.config.get('RESPONSE_BROTLI_QUALITY') or DEFAULT_BROTLI_QUALITY),
+            cache_entries=int(app.config.get('RESPONSE_COMPRESSED_CACHE', DEFAULT_COMPRESSED_CACHE_ENTRIES)),
+        )
+
+    @app.after_request
+    def _encode_response(response):
+        if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+            return response
+        if "Content-Encoding" in response.headers:
+            return response
+
+        etag, _ = response.get_etag()
+        size = response.content_length or 0
+        encoding = None
+        if compressor is not None and response.mimetype in COMPRESSIBLE_MIMETYPES:
+            response.vary.add("Accept-Encoding")
+            encoding = choose_encoding(request.accept_encodings, size, compressor.min_bytes)
+        if etag is not None and encoding is not None:
+            response.set_etag(f"{etag}-{encoding}")
+
+        if etag is not None and request.method in ("GET", "HEAD"):
+            if _not_modified(request.if_none_match, etag):
+                CONDITIONAL_RESPONSES.inc(result="not_modified")
+                response.status_code = 304
+                response.set_data(b"")
+                return response
+            CONDITIONAL_RESPONSES.inc(result="full")
+
+        if encoding is not None:
+            body = compressor.compress(response.get_data(), encoding, etag=etag)
+            response.set_data(body)
+            response.headers["Content-Encoding"] = encoding
+            RESPONSE_BYTES.inc(size, encoding=encoding, stage="identity")
+            RESPONSE_BYTES.inc(len(body), encoding=encoding, stage="encoded")
+        return response
+
+    return compressor
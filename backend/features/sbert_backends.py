@@ -0,0 +1,126 @@
+# backend/features/sbert_backends.py
+
+import argparse
+import logging
+
+import numpy as np
+
+# -----------------------------
+# Backends
+# -----------------------------
+SUPPORTED_BACKENDS = ("fp32", "int8", "onnx")
+DEFAULT_PARITY_TOLERANCE = 2.0  # max allowed difference in match-score points (0-100 scale)
+
+PARITY_SAMPLE_PAIRS = [
+    ("Experienced Python developer with Flask, SQL and AWS deployments.",
+     "We are hiring a backend engineer to build REST APIs in Python and Flask."),
+    ("Data analyst skilled in Excel, Tableau dashboards and statistics.",
+     "Looking for a data scientist with machine learning and Python experience."),
+    ("Frontend developer building React and TypeScript single page apps.",
+     "Senior Java engineer for Spring Boot microservices and Kafka."),
+    ("Registered nurse with five years of ICU experience.",
+     "Hiring a DevOps engineer familiar with Kubernetes and Terraform."),
+    ("Machine learning engineer: PyTorch, model serving, feature pipelines.",
+     "ML engineer to train and deploy deep learning models in production."),
+]
+
+
+def _load_fp32(model_path):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_path, device="cpu")
+
+
+def _load_int8(model_path):
+    """Dynamic int8 quantization of every nn.Linear layer (weights int8, activations fp32)."""
+    import torch
+    model = _load_fp32(model_path)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(model_path):
+    """ONNX Runtime backend (requires `optimum[onnxruntime]`); exports on first load if needed."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_path, device="cpu", backend="onnx")
+
+
+_LOADERS = {"fp32": _load_fp32, "int8": _load_int8, "onnx": _load_onnx}
+
+
+def load_sbert_backend(backend, model_path, logger=None):
+    """Build a SentenceTransformer-compatible encoder for the selected backend."""
+    logger = logger or logging.getLogger(__name__)
+    if backend not in _LOADERS:
+        raise ValueError(f"Unknown SBERT backend '{backend}'. Expected one of {SUPPORTED_BACKENDS}.")
+    logger.info(f"Loading SBERT backend '{backend}' from {model_path}...")
+    return _LOADERS[backend](model_path)
+
+# -----------------------------
+# Parity check
+# -----------------------------
+def _pair_scores(model, pairs):
+    left = np.asarray(model.encode([a for a, _ in pairs]), dtype=np.float32)
+    right = np.asarray(model.encode([b for _, b in pairs]), dtype=np.float32)
+    left /= np.maximum(np.linalg.norm(left, axis=1, keepdims=True), 1e-12)
+    right /= np.maximum(np.linalg.norm(right, axis=1, keepdims=True), 1e-12)
+    return np.clip(np.sum(left * right, axis=1), 0.0, 1.0) * 100
+
+
+def check_backend_parity(candidate, reference, pairs=None, tolerance=DEFAULT_PARITY_TOLERANCE):
+    """
+    Compare match scores produced by `candidate` against the fp32 `reference`.
+    Returns a report dict; `report["passed"]` is False if any pair differs by
+    more than `tolerance` score points.
+    """
+    pairs = pairs or PARITY_SAMPLE_PAIRS
+    candidate_scores = _pair_scores(candidate, pairs)
+    reference_scores = _pair_scores(reference, pairs)
+    diffs = np.abs(candidate_scores - reference_scores)
+    return {
+        "pairs": len(pairs),
+        "max_abs_diff": round(float(diffs.max()), 4),
+        "mean_abs_diff": round(float(diffs.mean()), 4),
+        "tolerance": tolerance,
+        "passed": bool(diffs.max() <= tolerance),
+    }
+
+
+def load_checked_backend(backend, model_path, logger=None, parity_check=False, tolerance=DEFAULT_PARITY_TOLERANCE):
+    """
+    Load `backend`, optionally verifying it against fp32.
+    Falls back to fp32 if the parity check fails. Returns (model, backend, report).
+    """
+    logger = logger or logging.getLogger(__name__)
+    model = load_sbert_backend(backend, model_path, logger)
+    if backend == "fp32" or not parity_check:
+        return model, backend, None
+
+    reference = _load_fp32(model_path)
+    report = check_backend_parity(model, reference, tolerance=tolerance)
+    if report["passed"]:
+        logger.info(f"SBERT backend '{backend}' passed parity check: {report}")
+        return model, backend, report
+
+    logger.error(f"SBERT backend '{backend}' failed parity check {report}; falling back to fp32.")
+    return reference, "fp32", report
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare an SBERT inference backend against fp32.")
+    parser.add_argument("--backend", choices=SUPPORTED_BACKENDS, required=True)
+    parser.add_argument("--model-path", default="paraphrase-MiniLM-L6-v2",
+                        help="Local model directory or hub model name.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_PARITY_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    candidate = load_sbert_backend(args.backend, args.model_path)
+    reference = _load_fp32(args.model_path)
+    report = check_backend_parity(candidate, reference, tolerance=args.tolerance)
+    print(report)
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,22 @@
 # backend/features/score_predict.py
 
 import os
-import PyPDF2
+import json
+import numpy as np
 from flask import Blueprint, request, jsonify, current_app
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+
+from .embedding_cache import init_embedding_cache
+from .inference_scheduler import EncodeScheduler, TimedEncoder
+from .model_registry import get_registry
+from .job_vector_index import get_job_index
+from .pdf_extract import PdfTextExtractor, PdfExtractionError, get_pdf_extractor
+from .sbert_backends import load_checked_backend
+
+SBERT_MODEL_NAME = 'paraphrase-MiniLM-L6-v2'
+SBERT_REGISTRY_NAME = 'sbert'
+ENCODE_BATCH_SIZE = 32
+MAX_BATCH_JOBS = 100
+MAX_SEMANTIC_TOP_K = 100
 
 # Create a Blueprint
 resume_tools_bp = Blueprint('resume_tools', __name__, url_prefix='/api')
@@ -12,15 +24,21 @@ resume_tools_bp = Blueprint('resume_tools', __name__, url_prefix='/api')
 # -------------------------------
 # PDF TEXT EXTRACTION
 # -------------------------------
-def extract_text_from_pdf(file_stream, logger):
-    """Extract text content from a PDF file."""
+def extract_text_from_pdf(file_stream, logger, extractor=None):
+    """
+    Extract text content from a PDF file.
+    With an extractor (see pdf_extract), size/page limits, the process pool
+    timeout and the SHA-256 text cache apply; otherwise it parses inline.
+    """
     try:
-        pdf_reader = PyPDF2.PdfReader(file_stream)
-        text_parts = [page.extract_text() for page in pdf_reader.pages if page.extract_text()]
-        if not text_parts:
+        data = file_stream.read()
+        text = (extractor or PdfTextExtractor(logger=logger, workers=0, cache_entries=0)).extract(data)
+        if not text:
             logger.warning("No text extracted from PDF (possibly scanned document).")
             return ""
-        return "\n".join(text_parts).strip()
+        return text
+    except PdfExtractionError:
+        raise
     except Exception as e:
         logger.error(f"Error reading PDF: {e}", exc_info=True)
         raise ValueError(f"Could not process PDF: {e}")
@@ -28,20 +46,79 @@ def extract_text_from_pdf(file_stream, logger):
 # -------------------------------
 # COSINE SIMILARITY CALCULATION
 # -------------------------------
-def calculate_similarity(text1, text2, sbert_model, logger):
-    """Calculate cosine similarity between two texts using SBERT."""
+def calculate_similarity(text1, text2, sbert_model, logger, cache=None):
+    """
+    Calculate cosine similarity between two texts using SBERT.
+    If an EmbeddingCache is given, previously seen texts are not re-encoded.
+    """
     if not sbert_model:
         raise RuntimeError("SBERT model not provided for similarity calculation.")
     try:
         logger.info("Generating embeddings for resume and job description...")
-        emb1 = sbert_model.encode(text1).reshape(1, -1)
-        emb2 = sbert_model.encode(text2).reshape(1, -1)
-        score = cosine_similarity(emb1, emb2)[0][0]
+        if cache is not None:
+            embeddings = cache.encode(sbert_model, [text1, text2])
+            emb1, emb2 = embeddings[0:1], embeddings[1:2]
+        else:
+            emb1 = np.asarray(sbert_model.encode(text1), dtype=np.float32).reshape(1, -1)
+            emb2 = np.asarray(sbert_model.encode(text2), dtype=np.float32).reshape(1, -1)
+        norms = max(np.linalg.norm(emb1) * np.linalg.norm(emb2), 1e-12)
+        score = float(emb1[0] @ emb2[0]) / norms
         return round(max(0.0, min(1.0, float(score))) * 100, 2)
     except Exception as e:
         logger.error(f"Error calculating similarity: {e}", exc_info=True)
         raise RuntimeError(f"Similarity calculation failed: {e}")
 
+def calculate_similarities(resume_text, job_texts, sbert_model, logger, cache=None, batch_size=ENCODE_BATCH_SIZE):
+    """
+    Score one resume against many job descriptions.
+    The resume is encoded once, job descriptions are encoded in batches of
+    `batch_size`, and all scores come from a single matrix-vector product.
+    Returns a list of percentage scores in the order of `job_texts`.
+    """
+    if not sbert_model:
+        raise RuntimeError("SBERT model not provided for similarity calculation.")
+    if not job_texts:
+        return []
+    try:
+        logger.info(f"Generating embeddings for resume and {len(job_texts)} job descriptions...")
+        if cache is not None:
+            resume_emb = cache.encode(sbert_model, [resume_text])[0]
+            job_embs = cache.encode(sbert_model, job_texts, batch_size=batch_size)
+        else:
+            resume_emb = np.asarray(sbert_model.encode(resume_text), dtype=np.float32)
+            job_embs = np.asarray(sbert_model.encode(job_texts, batch_size=batch_size), dtype=np.float32)
+
+        resume_emb = resume_emb / max(np.linalg.norm(resume_emb), 1e-12)
+        job_norms = np.maximum(np.linalg.norm(job_embs, axis=1, keepdims=True), 1e-12)
+        scores = (job_embs / job_norms) @ resume_emb
+        return [round(float(s) * 100, 2) for s in np.clip(scores, 0.0, 1.0)]
+    except Exception as e:
+        logger.error(f"Error calculating similarities: {e}", exc_info=True)
+        raise RuntimeError(f"Similarity calculation failed: {e}")
+
+def sbert_ready(app):
+    """True once SBERT is loaded; triggers a lazy load if no warm-up has started one."""
+    if app.config.get('SBERT_MODEL_LOADED'):
+        return True
+    registry = get_registry(app)
+    if registry.state(SBERT_REGISTRY_NAME) == 'pending':
+        registry.get(SBERT_REGISTRY_NAME, wait=False)
+    return bool(app.config.get('SBERT_MODEL_LOADED'))
+
+
+def get_sbert_encoder(app):
+    """Return the micro-batching scheduler if enabled, else the raw SBERT model."""
+    return app.config.get('SBERT_ENCODER') or app.config.get('SBERT_MODEL')
+
+
+def get_background_encoder(app):
+    """
+    Encoder for background work (job prefetch): calls the model directly on
+    the caller's thread, so low-priority texts are never merged into the
+    scheduler's interactive batches and run at the caller's niceness.
+    """
+    return app.config.get('SBERT_BACKGROUND_ENCODER') or app.config.get('SBERT_MODEL')
+
 # -------------------------------
 # MATCH SCORE ENDPOINT
 # -------------------------------
@@ -54,7 +131,7 @@ def match_score_route_handler():
     Returns:
         - JSON: {"match_score": float}
     """
-    if not current_app.config.get('SBERT_MODEL_LOADED'):
+    if not sbert_ready(current_app):
         current_app.logger.error("Match score: SBERT model not loaded.")
         return jsonify({"error": "Scoring engine unavailable."}), 503
 
@@ -68,25 +145,198 @@ def match_score_route_handler():
         return jsonify({"error": "Job description text missing."}), 400
 
     try:
-        resume_text = extract_text_from_pdf(resume_file, current_app.logger)
-        sbert_model = current_app.config.get('SBERT_MODEL')
-        score = calculate_similarity(resume_text, job_desc, sbert_model, current_app.logger)
+        resume_text = extract_text_from_pdf(resume_file, current_app.logger, get_pdf_extractor(current_app))
+        sbert_model = get_sbert_encoder(current_app)
+        cache = current_app.config.get('EMBEDDING_CACHE')
+        score = calculate_similarity(resume_text, job_desc, sbert_model, current_app.logger, cache=cache)
         return jsonify({"match_score": score})
+    except PdfExtractionError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error in /match_score: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
+# -------------------------------
+# BATCH MATCH SCORE ENDPOINT
+# -------------------------------
+@resume_tools_bp.route('/match_scores', methods=['POST'])
+def match_scores_route_handler():
+    """POST /api/match_scores
+    FormData:
+        - resume_file: uploaded PDF file
+        - jobs: JSON list of {"id": ..., "description": ...}
+    Returns:
+        - JSON: {"results": [{"job_id": ..., "match_score": float}, ...]}
+          ranked by match_score, highest first.
+    """
+    if not sbert_ready(current_app):
+        current_app.logger.error("Match scores: SBERT model not loaded.")
+        return jsonify({"error": "Scoring engine unavailable."}), 503
+
+    if 'resume_file' not in request.files:
+        return jsonify({"error": "No resume file uploaded."}), 400
+
+    try:
+        jobs = json.loads(request.form.get('jobs') or "[]")
+    except ValueError:
+        return jsonify({"error": "'jobs' must be a JSON list."}), 400
+
+    if not isinstance(jobs, list) or not jobs:
+        return jsonify({"error": "At least one job is required."}), 400
+    if len(jobs) > MAX_BATCH_JOBS:
+        return jsonify({"error": f"At most {MAX_BATCH_JOBS} jobs per request."}), 400
+
+    jobs = [job for job in jobs if isinstance(job, dict) and job.get('description')]
+    if not jobs:
+        return jsonify({"error": "Every job is missing its description."}), 400
+
+    try:
+        resume_text = extract_text_from_pdf(request.files['resume_file'], current_app.logger, get_pdf_extractor(current_app))
+        sbert_model = get_sbert_encoder(current_app)
+        cache = current_app.config.get('EMBEDDING_CACHE')
+        scores = calculate_similarities(
+            resume_text, [job['description'] for job in jobs],
+            sbert_model, current_app.logger, cache=cache
+        )
+        results = [
+            {"job_id": job.get('id'), "match_score": score}
+            for job, score in zip(jobs, scores)
+        ]
+        results.sort(key=lambda r: r["match_score"], reverse=True)
+        return jsonify({"results": results})
+    except PdfExtractionError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error in /match_scores: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+# -------------------------------
+# SEMANTIC JOB SEARCH ENDPOINT
+# -------------------------------
+@resume_tools_bp.route('/semantic_job_search', methods=['POST'])
+def semantic_job_search_route_handler():
+    """POST /api/semantic_job_search
+    FormData:
+        - resume_file: uploaded PDF file
+        - top_k: number of jobs to return (default 10)
+    Returns:
+        - JSON: {"results": [{"job": {...}, "match_score": float}, ...], "indexed_jobs": int}
+    Ranks every job embedded so far (see job_vector_index) against the resume.
+    """
+    if not sbert_ready(current_app):
+        current_app.logger.error("Semantic search: SBERT model not loaded.")
+        return jsonify({"error": "Scoring engine unavailable."}), 503
+
+    index = get_job_index(current_app)
+    if index is None:
+        return jsonify({"error": "Job vector index not configured."}), 503
+
+    if 'resume_file' not in request.files:
+        return jsonify({"error": "No resume file uploaded."}), 400
+
+    top_k = max(1, min(request.form.get('top_k', 10, type=int), MAX_SEMANTIC_TOP_K))
+
+    try:
+        resume_text = extract_text_from_pdf(request.files['resume_file'], current_app.logger, get_pdf_extractor(current_app))
+        if not resume_text:
+            return jsonify({"error": "No text could be extracted from the resume."}), 400
+        encoder = get_sbert_encoder(current_app)
+        cache = current_app.config.get('EMBEDDING_CACHE')
+        resume_emb = cache.encode(encoder, [resume_text])[0] if cache is not None else encoder.encode(resume_text)
+        hits = index.search(resume_emb, top_k=top_k)
+        results = [
+            {"job": meta, "match_score": round(max(0.0, min(1.0, score)) * 100, 2)}
+            for meta, score in hits
+        ]
+        return jsonify({"results": results, "indexed_jobs": len(index)})
+    except PdfExtractionError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error in /semantic_job_search: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+# -------------------------------
+# EMBEDDING CACHE STATS
+# -------------------------------
+@resume_tools_bp.route('/embedding_cache/stats', methods=['GET'])
+def embedding_cache_stats_route_handler():
+    """GET /api/embedding_cache/stats - hit/miss counters and memory use."""
+    cache = current_app.config.get('EMBEDDING_CACHE')
+    if cache is None:
+        return jsonify({"error": "Embedding cache not initialized."}), 503
+    return jsonify(cache.stats())
+
+@resume_tools_bp.route('/pdf_extract/stats', methods=['GET'])
+def pdf_extract_stats_route_handler():
+    """GET /api/pdf_extract/stats - text cache hits, timeouts and rejected uploads."""
+    return jsonify(get_pdf_extractor(current_app).cache_stats())
+
+
+@resume_tools_bp.route('/sbert_scheduler/stats', methods=['GET'])
+def sbert_scheduler_stats_route_handler():
+    """GET /api/sbert_scheduler/stats - queue depth, batch size and wait-time stats."""
+    scheduler = current_app.config.get('SBERT_ENCODER')
+    if not isinstance(scheduler, EncodeScheduler):
+        return jsonify({"error": "Micro-batching scheduler disabled."}), 503
+    return jsonify(scheduler.stats())
+
 # -------------------------------
 # MODEL INITIALIZATION
 # -------------------------------
+def _build_sbert(app):
+    """
+    Load SBERT and its helpers into app config; raises on failure.
+    SBERT_BACKEND selects fp32, int8 (dynamic quantization) or onnx; the model
+    is read from SBERT_MODEL_PATH (a local directory) when set.
+    """
+    backend = app.config.get('SBERT_BACKEND') or 'fp32'
+    model_path = app.config.get('SBERT_MODEL_PATH') or SBERT_MODEL_NAME
+    app.logger.info(f"Loading SBERT model ({SBERT_MODEL_NAME}, backend={backend})...")
+    model, backend, parity_report = load_checked_backend(
+        backend, model_path, app.logger,
+        parity_check=bool(app.config.get('SBERT_PARITY_CHECK')),
+        tolerance=float(app.config.get('SBERT_PARITY_TOLERANCE') or 2.0),
+    )
+    app.config['SBERT_MODEL'] = model
+    app.config['SBERT_BACKEND_ACTIVE'] = backend
+    app.config['SBERT_PARITY_REPORT'] = parity_report
+    # Quantized embeddings differ slightly, so they get their own cache keys.
+    init_embedding_cache(app, f"{SBERT_MODEL_NAME}:{backend}")
+
+    window_ms = float(app.config.get('SBERT_BATCH_WINDOW_MS') or 0)
+    if window_ms > 0:
+        app.config['SBERT_ENCODER'] = EncodeScheduler(
+            model,
+            max_batch_size=int(app.config.get('SBERT_MAX_BATCH_SIZE') or ENCODE_BATCH_SIZE),
+            max_wait_ms=window_ms,
+            logger=app.logger,
+        )
+        app.logger.info(f"SBERT micro-batching enabled ({window_ms} ms window).")
+    else:
+        app.config['SBERT_ENCODER'] = TimedEncoder(model)
+    app.config['SBERT_BACKGROUND_ENCODER'] = TimedEncoder(model)
+
+    app.config['SBERT_MODEL_LOADED'] = True
+    app.logger.info("SBERT model loaded successfully.")
+    return model
+
+
+def register_sbert_model(app):
+    """
+    Register SBERT with the model registry without loading it.
+    torch/transformers are only imported when the registry runs the loader
+    (eagerly, in the background warm-up, or on first use).
+    """
+    app.config['SBERT_MODEL_LOADED'] = False
+    registry = get_registry(app)
+    registry.register(SBERT_REGISTRY_NAME, lambda: _build_sbert(app))
+    return registry
+
+
 def load_sbert_model(app):
     """Load SBERT model once and store in app config."""
     try:
-        app.logger.info("Loading SBERT model (paraphrase-MiniLM-L6-v2)...")
-        model = SentenceTransformer('paraphrase-MiniLM-L6-v2')
-        app.config['SBERT_MODEL'] = model
-        app.config['SBERT_MODEL_LOADED'] = True
-        app.logger.info("SBERT model loaded successfully.")
+        _build_sbert(app)
     except Exception as e:
         app.logger.error(f"Error loading SBERT model: {e}", exc_info=True)
         app.config['SBERT_MODEL_LOADED'] = False
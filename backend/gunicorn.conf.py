@@ -0,0 +1,76 @@
+# backend/gunicorn.conf.py
+#
+# Usage:
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# Preload mode (GUNICORN_PRELOAD=1):
+#   The app (and, via MODEL_WARMUP=eager, every model in the registry) is
+#   loaded once in the gunicorn master before workers are forked. Workers then
+#   share the model weights and the memory-mapped course index copy-on-write,
+#   so N workers cost roughly one model's worth of RSS and restart instantly.
+#   gc.freeze() moves everything loaded so far out of the collector's reach,
+#   which keeps GC passes in the workers from dirtying (and copying) those pages.
+#   Per-process threads (SBERT micro-batching scheduler) start lazily after fork.
+#
+# Default mode (GUNICORN_PRELOAD=0):
+#   Each worker imports the app itself and warms models on a background thread
+#   (MODEL_WARMUP=background); /readyz returns 503 until they are loaded.
+#
+# Metrics:
+#   Every worker keeps its own metrics and /metrics is answered by whichever
+#   worker gets the scrape. Set METRICS_MULTIPROC_DIR to a directory private
+#   to this server (e.g. /tmp/jobportal-metrics) and /metrics reports all
+#   workers merged; it is emptied when the server starts. In preload mode the
+#   counts recorded while the master loaded the app are written once as the
+#   master's snapshot and zeroed in each worker, so they are not summed N times.
+
+import gc
+import os
+import glob
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv("GUNICORN_WORKERS", 2))
+# Keep above the admission limits (concurrency + queue) of the ML blueprints so
+# cheap routes always get a thread; see features/admission.py.
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+if preload_app:
+    # Background warm-up threads do not survive fork, so load synchronously in the master.
+    os.environ.setdefault("MODEL_WARMUP", "eager")
+
+
+def on_starting(server):
+    # Snapshots from a previous run would otherwise be summed into the new totals.
+    metrics_dir = os.getenv("METRICS_MULTIPROC_DIR")
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, "metrics-*.json")):
+            os.remove(path)
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        from features.metrics import write_master_metrics
+        write_master_metrics()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from features.metrics import reset_worker_metrics
+        reset_worker_metrics()
+    # Keep each worker's torch intra-op pool small so workers don't oversubscribe cores.
+    torch_threads = os.getenv("TORCH_NUM_THREADS")
+    if torch_threads:
+        try:
+            import torch
+            torch.set_num_threads(int(torch_threads))
+        except ImportError:
+            pass
+
+
+def worker_exit(server, worker):
+    # Keep the counts recorded since this worker's last periodic snapshot.
+    from features.metrics import flush_worker_metrics
+    flush_worker_metrics()